@@ -1,58 +1,23 @@
 import os
-import sys
+import asyncio
 import logging
-import json
-from logging.handlers import RotatingFileHandler
+import weakref
 from dotenv import load_dotenv
 import google.generativeai as genai
-from django.db import transaction
-from songs.models import Song, Genres
+from songs.models import Song
 from artists.models import Artist
 from django.db.models import Count, Sum
+from django.conf import settings
+from asgiref.sync import sync_to_async
+from .catalog import catalog, render_context
+from .retrieval import retriever
+from .response_cache import normalize_query, prediction_cache
+from backend.tracing import span
 
-# Configure logging
-try:
-    log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-
-    log_file = os.path.join(log_dir, 'a2a_server.txt')
-    max_bytes = 5 * 1024 * 1024  # 5MB
-    backup_count = 3
-    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', mode='a')
-    file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
-    file_handler.setFormatter(file_formatter)
-
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
-    console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(console_formatter)
-
-    logging.basicConfig(
-        level=logging.DEBUG,
-        handlers=[console_handler, file_handler]
-    )
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.DEBUG)
-
-    logger.info("="*50)
-    logger.info("A2A Server Starting")
-    logger.info(f"Python version: {sys.version}")
-    logger.info(f"Current working directory: {os.getcwd()}")
-    logger.info(f"Log file location: {log_file}")
-    logger.info("="*50)
-
-except Exception as e:
-    print(f"Error configuring logging: {str(e)}")
-    print(traceback.format_exc())
-    logger.error(f"Error configuring logging: {str(e)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
-    raise
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
-logger.info("Environment variables loaded")
 
 # Configure Gemini API
 api_key = os.getenv('GOOGLE_API_KEY')
@@ -62,16 +27,32 @@ if not api_key:
 genai.configure(api_key=api_key)
 logger.info("Gemini API configured successfully")
 
+class EmptyModelResponse(Exception):
+    pass
+
+# Semaphore giới hạn số lời gọi Gemini đồng thời, mỗi event loop một semaphore
+_upstream_semaphores = weakref.WeakKeyDictionary()
+
+def upstream_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _upstream_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(getattr(settings, 'A2A_MAX_CONCURRENT_CALLS', 8))
+        _upstream_semaphores[loop] = semaphore
+    return semaphore
+
+CANDIDATES_TITLE = 'Các bài hát liên quan nhất tới mô tả (id, tên bài hát, giá, nghệ sĩ, thể loại)'
+
 class A2AServer:
-    def __init__(self):
-        self.model = genai.GenerativeModel(model_name='gemini-1.5-flash')
+    def __init__(self, model=None):
+        # Có thể truyền model giả lập (có phương thức generate_content) khi test
+        self.model = model or genai.GenerativeModel(model_name='gemini-1.5-flash')
         logger.info("A2A Server initialized")
 
     def get_songs(self):
         """Lấy danh sách bài hát"""
         try:
-            songs = Song.objects.filter(is_deleted=False).select_related('artist').prefetch_related('genres')
-            return [(s.id, s.song_name, s.price, s.artist.artist_name, [g.genre_name for g in s.genres.all()]) for s in songs]
+            return catalog.songs()
         except Exception as e:
             logger.error(f"Error getting songs: {str(e)}")
             return []
@@ -88,7 +69,7 @@ class A2AServer:
     def get_genres(self):
         """Lấy danh sách thể loại"""
         try:
-            return list(Genres.objects.values_list('genre_name', flat=True))
+            return catalog.genres()
         except Exception as e:
             logger.error(f"Error getting genres: {str(e)}")
             return []
@@ -109,24 +90,19 @@ class A2AServer:
             logger.error(f"Error getting total artists: {str(e)}")
             return 0
 
-    def process_song_prediction_request(self, input_text, user_id):
-        """Xử lý yêu cầu dự đoán tên bài hát"""
-        try:
-            # Lấy dữ liệu từ database
-            songs_data = self.get_songs()
-            genres = self.get_genres()
-            # Tạo prompt cho Gemini
-            context = f"""
-            Danh sách các bài hát hiện có (mẫu - id, tên bài hát, giá, nghệ sĩ, thể loại):
-            {json.dumps(songs_data[:100], ensure_ascii=False, indent=2, default=str)}
-
-            Các thể loại nhạc hiện có:
-            {json.dumps(genres, ensure_ascii=False, indent=2)}
-
-            Dựa vào thông tin này, hãy cố gắng dự đoán tên bài hát mà người dùng đang mô tả.
-            """
-
-            prompt = f"""
+    def build_context(self, input_text):
+        """Tạo context chỉ gồm các bài hát liên quan nhất tới mô tả của người dùng"""
+        candidates = retriever.top_k(input_text)
+        if not candidates:
+            # Không có bài nào khớp: dùng context mẫu đã cache theo version
+            _, context = catalog.prompt_context()
+            return context
+        return render_context(candidates, catalog.genres(), title=CANDIDATES_TITLE)
+
+    def build_prompt(self, input_text):
+        """Tạo prompt gửi cho Gemini"""
+        context = self.build_context(input_text)
+        return f"""
             Context: {context}
 
             User keywords/description: {input_text}
@@ -139,15 +115,81 @@ class A2AServer:
             - Phần sau (nếu không chắc chắn): Danh sách các bài hát gợi ý (tên bài hát - nghệ sĩ - thể loại)
             """
 
+    def predict(self, input_text):
+        """Gọi Gemini để dự đoán, raise EmptyModelResponse nếu model không trả về nội dung"""
+        with span('prompt_build'):
+            prompt = self.build_prompt(input_text)
 
-            # Gọi Gemini API
+        # Gọi Gemini API
+        with span('model_call'):
             response = self.model.generate_content(prompt)
 
-            if not response or not hasattr(response, 'text') or not response.text:
-                logger.error("Empty or invalid response from Gemini")
-                return "Xin lỗi, không thể dự đoán tên bài hát lúc này. Vui lòng thử lại sau."
+        if not response or not hasattr(response, 'text') or not response.text:
+            raise EmptyModelResponse()
+
+        return response.text
+
+    async def abuild_prompt(self, input_text):
+        """Tạo prompt từ code async; build_prompt đọc database nên chạy qua sync_to_async"""
+        with span('prompt_build'):
+            return await sync_to_async(self.build_prompt)(input_text)
+
+    async def agenerate(self, prompt):
+        """Gọi Gemini với prompt đã tạo, số lời gọi đồng thời bị giới hạn bởi semaphore"""
+        async with upstream_semaphore():
+            with span('model_call'):
+                if hasattr(self.model, 'generate_content_async'):
+                    response = await self.model.generate_content_async(prompt)
+                else:
+                    response = await sync_to_async(self.model.generate_content, thread_sensitive=False)(prompt)
+
+        if not response or not hasattr(response, 'text') or not response.text:
+            raise EmptyModelResponse()
+
+        return response.text
+
+    async def aprocess_song_prediction_request(self, input_text, user_id, timeout=None):
+        """
+        Xử lý yêu cầu dự đoán tên bài hát không chặn worker.
+
+        Raise asyncio.TimeoutError nếu quá `timeout` giây (mặc định A2A_CALL_TIMEOUT).
+        """
+        timeout = timeout or getattr(settings, 'A2A_CALL_TIMEOUT', 20)
+        try:
+            with span('db'):
+                version = await sync_to_async(catalog.current_version)()
+            key = (normalize_query(input_text), version)
+            return await prediction_cache.aget_or_compute(
+                key, self.agenerate, prepare=lambda: self.abuild_prompt(input_text), timeout=timeout,
+            )
+
+        except EmptyModelResponse:
+            logger.error("Empty or invalid response from Gemini")
+            return "Xin lỗi, không thể dự đoán tên bài hát lúc này. Vui lòng thử lại sau."
+
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            raise
+
+        except Exception as e:
+            logger.error(f"Error processing song prediction request: {str(e)}")
+            return "Xin lỗi, có lỗi xảy ra khi xử lý yêu cầu của bạn. Vui lòng thử lại sau."
+
+    def predict_cached(self, input_text):
+        """Dự đoán qua cache kết quả; lỗi được ném ra cho nơi gọi (dùng bởi task queue)."""
+        # Kết quả được cache theo câu truy vấn đã chuẩn hóa và version của danh mục
+        with span('db'):
+            version = catalog.current_version()
+        key = (normalize_query(input_text), version)
+        return prediction_cache.get_or_compute(key, lambda: self.predict(input_text))
+
+    def process_song_prediction_request(self, input_text, user_id):
+        """Xử lý yêu cầu dự đoán tên bài hát"""
+        try:
+            return self.predict_cached(input_text)
 
-            return response.text
+        except EmptyModelResponse:
+            logger.error("Empty or invalid response from Gemini")
+            return "Xin lỗi, không thể dự đoán tên bài hát lúc này. Vui lòng thử lại sau."
 
         except Exception as e:
             logger.error(f"Error processing song prediction request: {str(e)}")
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class A2AServerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'a2a_server' 
\ No newline at end of file
+    name = 'a2a_server'
+
+    def ready(self):
+        from . import signals  # noqa: F401
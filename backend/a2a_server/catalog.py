@@ -0,0 +1,204 @@
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from songs.models import Song, Genres
+
+logger = logging.getLogger(__name__)
+
+# Số bài hát đưa vào prompt
+PROMPT_SONG_LIMIT = 100
+# Độ dài lời bài hát tối đa giữ trong snapshot (dùng cho bước retrieval)
+LYRICS_LIMIT = 2000
+
+
+def _song_row(song):
+    return (song.id, song.song_name, song.price, song.artist.artist_name, [g.genre_name for g in song.genres.all()])
+
+
+def _song_lyrics(song):
+    return (song.lyrics_text or '')[:LYRICS_LIMIT]
+
+
+def _live_songs():
+    return Song.objects.filter(is_deleted=False).select_related('artist').prefetch_related('genres')
+
+
+def _genre_names():
+    return list(Genres.objects.order_by('id').values_list('genre_name', flat=True))
+
+
+def _load():
+    """Đọc toàn bộ danh mục từ database: (dòng bài hát theo id, lời bài hát theo id, tên thể loại)."""
+    songs, lyrics = {}, {}
+    for song in _live_songs():
+        songs[song.id] = _song_row(song)
+        lyrics[song.id] = _song_lyrics(song)
+    return songs, lyrics, _genre_names()
+
+
+SAMPLE_TITLE = 'Danh sách các bài hát hiện có (mẫu - id, tên bài hát, giá, nghệ sĩ, thể loại)'
+
+
+def render_context(songs, genres, title=SAMPLE_TITLE):
+    return f"""
+            {title}:
+            {json.dumps(songs, ensure_ascii=False, indent=2, default=str)}
+
+            Các thể loại nhạc hiện có:
+            {json.dumps(genres, ensure_ascii=False, indent=2)}
+
+            Dựa vào thông tin này, hãy cố gắng dự đoán tên bài hát mà người dùng đang mô tả.
+            """
+
+
+class CatalogSnapshot:
+    """
+    Bản chụp danh mục bài hát/thể loại trong bộ nhớ cho agent dự đoán bài hát.
+
+    Snapshot được xây một lần khi cần, sau đó cập nhật từng dòng qua signal
+    của Song/Artist/Genres. Mỗi lần thay đổi tăng `version`; context của prompt
+    được cache theo version nên mỗi request chỉ tốn chi phí cố định.
+
+    Signal chỉ chạy trong process ghi dữ liệu, vì vậy snapshot cũng được xây lại
+    toàn bộ sau `max_age` giây để các process khác không bị lệch quá lâu. Với
+    `background` (mặc định A2A_CATALOG_BACKGROUND_BUILD), lần xây lại này chạy trong
+    một thread nền, ngoài khóa: người đọc tiếp tục dùng snapshot cũ cho tới khi snapshot
+    mới được thay vào. Chỉ lần xây đầu tiên (chưa có snapshot nào) chạy trong request.
+    """
+
+    def __init__(self, max_age=None, background=None):
+        self.max_age = max_age if max_age is not None else getattr(settings, 'A2A_CATALOG_MAX_AGE', 600)
+        self.background = (
+            background if background is not None
+            else getattr(settings, 'A2A_CATALOG_BACKGROUND_BUILD', True)
+        )
+        self.version = 0
+        self._songs = None
+        self._lyrics = None
+        self._genres = None
+        self._built_at = 0
+        self._context = None
+        # Thay đổi nhận được trong lúc thread nền đang đọc database, áp dụng lại sau khi thay snapshot
+        self._pending = None
+        self._lock = threading.RLock()
+
+    def _install(self, loaded):
+        self._songs, self._lyrics, self._genres = loaded
+        self._built_at = time.monotonic()
+        self.version += 1
+
+    def _ensure_built(self):
+        if self._songs is None:
+            self._install(_load())
+            return
+        if time.monotonic() - self._built_at < self.max_age or self._pending is not None:
+            return
+        if not self.background:
+            self._install(_load())
+            return
+        self._pending = {'songs': set(), 'genres': False, 'invalidated': False}
+        threading.Thread(target=self._rebuild, name='catalog-snapshot-build', daemon=True).start()
+
+    def _rebuild(self):
+        """Thread nền: đọc danh mục ngoài khóa rồi thay snapshot trong một bước."""
+        try:
+            try:
+                loaded = _load()
+            except Exception:
+                logger.exception('Failed to rebuild catalog snapshot')
+                loaded = None
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if loaded is None:
+                    # Giữ snapshot cũ, thử lại sau max_age giây
+                    self._built_at = time.monotonic()
+                    return
+                self._install(loaded)
+                if pending['invalidated']:
+                    self._built_at = float('-inf')
+                    return
+                if pending['songs']:
+                    self._apply_songs(pending['songs'])
+                if pending['genres']:
+                    self._genres = _genre_names()
+        finally:
+            # Thread nền có kết nối database riêng, đóng lại khi xong
+            connection.close()
+
+    def _apply_songs(self, song_ids):
+        for song_id in song_ids:
+            self._songs.pop(song_id, None)
+            self._lyrics.pop(song_id, None)
+        for song in _live_songs().filter(id__in=song_ids):
+            self._songs[song.id] = _song_row(song)
+            self._lyrics[song.id] = _song_lyrics(song)
+
+    def songs(self):
+        with self._lock:
+            self._ensure_built()
+            return [self._songs[song_id] for song_id in sorted(self._songs)]
+
+    def current_version(self):
+        with self._lock:
+            self._ensure_built()
+            return self.version
+
+    def snapshot(self):
+        """Trả về (version, các dòng bài hát theo id, dict id -> lời bài hát)."""
+        with self._lock:
+            self._ensure_built()
+            rows = [self._songs[song_id] for song_id in sorted(self._songs)]
+            return self.version, rows, dict(self._lyrics)
+
+    def genres(self):
+        with self._lock:
+            self._ensure_built()
+            return list(self._genres)
+
+    def prompt_context(self):
+        """Trả về (version, context) — context chỉ được tạo lại khi version thay đổi."""
+        with self._lock:
+            self._ensure_built()
+            if self._context is None or self._context[0] != self.version:
+                sample = [self._songs[song_id] for song_id in sorted(self._songs)[:PROMPT_SONG_LIMIT]]
+                self._context = (self.version, render_context(sample, self._genres))
+            return self._context
+
+    def refresh_songs(self, song_ids):
+        """Đọc lại các bài hát `song_ids` từ database (bài đã xóa sẽ bị bỏ khỏi snapshot)."""
+        with self._lock:
+            song_ids = set(song_ids)
+            if self._pending is not None:
+                self._pending['songs'].update(song_ids)
+            if self._songs is None:
+                return
+            self._apply_songs(song_ids)
+            self.version += 1
+
+    def refresh_genres(self):
+        with self._lock:
+            if self._pending is not None:
+                self._pending['genres'] = True
+            if self._genres is None:
+                return
+            self._genres = _genre_names()
+            self.version += 1
+
+    def invalidate(self):
+        """
+        Đánh dấu snapshot hiện tại đã cũ: lần đọc sau xây lại toàn bộ (trong thread nền nếu
+        `background`, trong lúc đó vẫn dùng snapshot cũ).
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending['invalidated'] = True
+            self._built_at = float('-inf')
+            self.version += 1
+
+
+catalog = CatalogSnapshot()
@@ -0,0 +1,50 @@
+import asyncio
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    ASGI middleware hủy việc xử lý request khi client ngắt kết nối.
+
+    Django 4.2 không theo dõi `http.disconnect` sau khi đã đọc xong body, nên một
+    lời gọi Gemini chậm vẫn tiếp tục chạy dù client đã bỏ đi. Middleware này chạy
+    view trong một task riêng và hủy task đó khi nhận được `http.disconnect`.
+    Chỉ áp dụng cho các đường dẫn bắt đầu bằng `path_prefixes`.
+    """
+
+    def __init__(self, app, path_prefixes=('/a2a/',)):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith(self.path_prefixes):
+            return await self.app(scope, receive, send)
+
+        body_done = asyncio.Event()
+
+        async def receive_body():
+            message = await receive()
+            if message['type'] == 'http.disconnect' or not message.get('more_body', False):
+                body_done.set()
+            return message
+
+        app_task = asyncio.ensure_future(self.app(scope, receive_body, send))
+        disconnected = False
+
+        async def watch_disconnect():
+            nonlocal disconnected
+            await body_done.wait()
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    disconnected = True
+                    app_task.cancel()
+                    return
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+        finally:
+            watcher.cancel()
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+
+from django.conf import settings
+
+from backend.cache import TTLCache
+from search.text import tokenize
+
+
+def normalize_query(text):
+    """Chuẩn hóa mô tả của người dùng để các câu gần giống nhau dùng chung cache."""
+    return ' '.join(tokenize(text))
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PredictionCache:
+    """
+    Cache kết quả dự đoán theo key (câu truy vấn đã chuẩn hóa, version danh mục).
+
+    Các request giống nhau đến cùng lúc được gộp lại: chỉ request đầu tiên gọi
+    model, các request còn lại chờ và dùng chung kết quả (hoặc lỗi) của nó.
+    Lỗi không được cache.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self._results = TTLCache(
+            maxsize=maxsize or getattr(settings, 'A2A_RESPONSE_CACHE_SIZE', 512),
+            ttl=ttl or getattr(settings, 'A2A_RESPONSE_CACHE_TTL', 600),
+        )
+        self._inflight = {}
+        self._async_inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key, compute):
+        result = self._results.get(key)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+            self._results.set(key, call.result)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    async def aget_or_compute(self, key, compute, prepare=None, timeout=None):
+        """
+        Phiên bản async: `compute` là hàm trả về coroutine.
+
+        Nếu có `prepare` (hàm trả về coroutine), request dẫn đầu chờ nó ngay trong coroutine
+        của chính request rồi mới tạo task `compute(kết quả prepare)`. Phần chuẩn bị thường
+        gọi sync_to_async (thread_sensitive) để đọc database; chạy nó trong task tách rời
+        khỏi request có thể bị treo khi thread sync của request đang bị chặn.
+
+        Lời gọi model chạy trong một task riêng, mỗi request chỉ chờ kết quả chung: khi một
+        request bị hủy (hết hạn, client ngắt kết nối) chỉ request đó dừng chờ; task chỉ bị
+        hủy khi không còn request nào chờ. Nếu request dẫn đầu bỏ đi trước khi kịp tạo
+        task, các request đang chờ thử lại từ đầu.
+
+        `timeout` (giây) giới hạn thời gian chờ kết quả, hết hạn thì raise asyncio.TimeoutError.
+        Không dùng asyncio.wait_for vì nó chạy coroutine trong một task mới, gặp lại đúng vấn
+        đề của phần chuẩn bị nêu trên.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            result = self._results.get(key)
+            if result is not None:
+                with self._lock:
+                    self.hits += 1
+                return result
+
+            entry = self._async_inflight.get(key)
+            leader = entry is None
+            with self._lock:
+                if leader:
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                entry = {'future': loop.create_future(), 'task': None, 'waiters': 0}
+                self._async_inflight[key] = entry
+
+            future = entry['future']
+            entry['waiters'] += 1
+            try:
+                if leader:
+                    await self._start_async(key, entry, compute, prepare)
+                remaining = None if deadline is None else max(deadline - loop.time(), 0)
+                # asyncio.wait không hủy future khi request này bị hủy hay hết hạn
+                await asyncio.wait({future}, timeout=remaining)
+                if not future.done():
+                    raise asyncio.TimeoutError()
+            finally:
+                entry['waiters'] -= 1
+                if not future.done() and (entry['waiters'] == 0 or entry['task'] is None):
+                    self._abandon_async(key, entry)
+
+            if not future.cancelled():
+                return future.result()
+
+    async def _start_async(self, key, entry, compute, prepare):
+        try:
+            args = (await prepare(),) if prepare is not None else ()
+        except Exception as e:
+            self._pop_async(key, entry)
+            entry['future'].set_exception(e)
+            return
+        task = entry['task'] = asyncio.ensure_future(compute(*args))
+        task.add_done_callback(lambda done: self._finish_async(key, entry, done))
+
+    def _finish_async(self, key, entry, task):
+        self._pop_async(key, entry)
+        future = entry['future']
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            self._results.set(key, task.result())
+            future.set_result(task.result())
+
+    def _abandon_async(self, key, entry):
+        self._pop_async(key, entry)
+        if entry['task'] is not None:
+            entry['task'].cancel()
+        entry['future'].cancel()
+
+    def _pop_async(self, key, entry):
+        if self._async_inflight.get(key) is entry:
+            del self._async_inflight[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'size': len(self._results),
+                'in_flight': len(self._inflight) + len(self._async_inflight),
+            }
+
+    def clear(self):
+        self._results.clear()
+        with self._lock:
+            self.hits = self.misses = self.coalesced = 0
+
+
+prediction_cache = PredictionCache()
@@ -0,0 +1,187 @@
+import logging
+import math
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from search.text import fold, tokenize
+from .catalog import catalog
+
+logger = logging.getLogger(__name__)
+
+# Số lần lặp lại mỗi trường khi tính tần suất từ (tên bài hát quan trọng nhất)
+FIELD_REPEATS = {
+    'name': 3,
+    'artist': 2,
+    'genres': 1,
+    'lyrics': 1,
+}
+
+# Tỉ trọng giữa điểm theo từ và điểm theo n-gram ký tự
+WORD_WEIGHT = 0.6
+CHAR_WEIGHT = 0.4
+CHAR_NGRAM = 3
+
+
+def char_ngrams(text, n=CHAR_NGRAM):
+    grams = []
+    for word in tokenize(text):
+        padded = f' {word} '
+        grams.extend(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+    return grams
+
+
+class _TfidfSpace:
+    """
+    Không gian TF-IDF thưa lưu theo posting list: feature -> (chỉ số bài hát, trọng số).
+
+    Vector của mỗi bài hát được chuẩn hóa L2, nên điểm của một truy vấn là
+    cosine similarity, tính bằng cách cộng dồn posting của các feature trong
+    truy vấn với `np.bincount` — chỉ chạm tới những bài hát có chung feature.
+    """
+
+    def __init__(self, documents):
+        self.size = len(documents)
+        counts = [Counter(features) for features in documents]
+        df = Counter()
+        for counter in counts:
+            df.update(counter.keys())
+        self.idf = {feature: math.log((1 + self.size) / (1 + n)) + 1 for feature, n in df.items()}
+
+        postings = {}
+        for doc_index, counter in enumerate(counts):
+            weights = {f: (1 + math.log(tf)) * self.idf[f] for f, tf in counter.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for feature, weight in weights.items():
+                postings.setdefault(feature, ([], []))
+                postings[feature][0].append(doc_index)
+                postings[feature][1].append(weight / norm)
+        self.postings = {
+            feature: (np.asarray(indices, dtype=np.int64), np.asarray(values, dtype=np.float64))
+            for feature, (indices, values) in postings.items()
+        }
+
+    def scores(self, features):
+        result = np.zeros(self.size, dtype=np.float64)
+        counter = Counter(f for f in features if f in self.postings)
+        if not counter or not self.size:
+            return result
+        query = {f: (1 + math.log(tf)) * self.idf[f] for f, tf in counter.items()}
+        norm = math.sqrt(sum(w * w for w in query.values()))
+        indices = np.concatenate([self.postings[f][0] for f in query])
+        values = np.concatenate([self.postings[f][1] * (query[f] / norm) for f in query])
+        return np.bincount(indices, weights=values, minlength=self.size)
+
+
+class SongRetriever:
+    """
+    Bước retrieval cục bộ: chọn top-k bài hát liên quan tới mô tả của người dùng
+    trước khi gọi model, thay vì luôn gửi 100 bài đầu tiên của danh mục.
+
+    Kết hợp TF-IDF theo từ (khớp chính xác, đã bỏ dấu) và TF-IDF theo n-gram ký tự
+    (chịu được lỗi chính tả, viết dính). Index được xây từ snapshot danh mục và
+    chỉ xây lại khi version thay đổi, tối đa một lần mỗi `min_rebuild_interval` giây.
+
+    Với `background` (mặc định A2A_RETRIEVER_BACKGROUND_BUILD), index được xây trong một
+    thread nền: request không bao giờ chờ xây index mà dùng index trước đó cho tới khi
+    index mới được thay vào. Trước khi có index đầu tiên, top_k trả về danh sách rỗng.
+    """
+
+    def __init__(self, source=catalog, min_rebuild_interval=None, background=None):
+        self.source = source
+        self.min_rebuild_interval = (
+            min_rebuild_interval if min_rebuild_interval is not None
+            else getattr(settings, 'A2A_RETRIEVER_REBUILD_INTERVAL', 60)
+        )
+        self.background = (
+            background if background is not None
+            else getattr(settings, 'A2A_RETRIEVER_BACKGROUND_BUILD', True)
+        )
+        # (version, các dòng bài hát, không gian theo từ, không gian theo n-gram ký tự)
+        self._index = None
+        self._built_at = 0
+        self._building = None
+        self._lock = threading.Lock()
+
+    def _document(self, row, lyrics):
+        _, name, _, artist, genres = row
+        fields = {'name': name, 'artist': artist, 'genres': ' '.join(genres), 'lyrics': lyrics}
+        words, chars = [], []
+        for field, text in fields.items():
+            repeats = FIELD_REPEATS[field]
+            words.extend(tokenize(text) * repeats)
+            if field != 'lyrics':
+                chars.extend(char_ngrams(text) * repeats)
+        return words, chars
+
+    def _is_fresh(self):
+        return self._index is not None and (
+            self.source.version == self._index[0]
+            or time.monotonic() - self._built_at < self.min_rebuild_interval
+        )
+
+    def _build(self):
+        try:
+            version, rows, lyrics = self.source.snapshot()
+            documents = [self._document(row, lyrics.get(row[0], '')) for row in rows]
+            index = (
+                version,
+                rows,
+                _TfidfSpace([words for words, _ in documents]),
+                _TfidfSpace([chars for _, chars in documents]),
+            )
+            with self._lock:
+                self._index = index
+        except Exception:
+            logger.exception('Failed to build song retrieval index')
+        finally:
+            with self._lock:
+                self._built_at = time.monotonic()
+                self._building = None
+            if self.background:
+                # Thread nền có kết nối database riêng, đóng lại khi xong
+                connection.close()
+
+    def refresh(self):
+        """
+        Xây lại index nếu danh mục đã đổi. Ở chế độ nền chỉ khởi động thread xây index
+        (nếu chưa có thread nào đang chạy) rồi trả về ngay. Trả về thread đang xây, hoặc None.
+        """
+        with self._lock:
+            if self._building is not None or self._is_fresh():
+                return self._building
+            if self.background:
+                thread = threading.Thread(target=self._build, name='song-retriever-build', daemon=True)
+            else:
+                thread = threading.current_thread()
+            self._building = thread
+        if not self.background:
+            self._build()
+            return None
+        thread.start()
+        return thread
+
+    def top_k(self, query, k=None):
+        """Trả về tối đa k dòng bài hát (id, tên, giá, nghệ sĩ, thể loại) có điểm > 0, điểm cao trước."""
+        k = k or getattr(settings, 'A2A_RETRIEVAL_TOP_K', 30)
+        self.refresh()
+        index = self._index
+        if index is None or not fold(query).strip():
+            return []
+        _, rows, words, chars = index
+        if not rows:
+            return []
+
+        scores = WORD_WEIGHT * words.scores(tokenize(query)) + CHAR_WEIGHT * chars.scores(char_ngrams(query))
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ordered = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [rows[i] for i in ordered]
+
+
+retriever = SongRetriever()
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from artists.models import Artist
+from songs.models import Song, Genres
+from .catalog import catalog
+
+
+@receiver(post_save, sender=Song)
+@receiver(post_delete, sender=Song)
+def refresh_song(sender, instance, **kwargs):
+    catalog.refresh_songs([instance.id])
+
+
+@receiver(m2m_changed, sender=Song.genres.through)
+def refresh_song_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        catalog.refresh_songs([instance.id])
+    elif pk_set:
+        catalog.refresh_songs(pk_set)
+    else:
+        catalog.invalidate()
+
+
+@receiver(post_save, sender=Artist)
+def refresh_artist_songs(sender, instance, **kwargs):
+    catalog.refresh_songs(Song.objects.filter(artist=instance).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Genres)
+def refresh_genre(sender, instance, created, **kwargs):
+    catalog.refresh_genres()
+    if not created:
+        catalog.refresh_songs(Song.objects.filter(genres=instance).values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Genres)
+def remove_genre(sender, instance, **kwargs):
+    # Liên kết M2M bị xóa theo cascade mà không có signal, xây lại toàn bộ
+    catalog.invalidate()
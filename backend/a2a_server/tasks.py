@@ -0,0 +1,8 @@
+from tasks.queue import task
+from .a2a_server import a2a_server
+
+
+@task('a2a.predict', priority=10, max_attempts=3)
+def predict(input_text, user_id):
+    """Dự đoán bài hát ngoài request (phương thức JSON-RPC tasks/send)."""
+    return a2a_server.predict_cached(input_text)
@@ -0,0 +1,483 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from artists.models import Artist
+from backend.asgi import application
+from songs.models import Song, Genres
+from tasks.models import Task
+from tasks.worker import Worker
+from .a2a_server import A2AServer
+from . import tasks, views
+from .catalog import CatalogSnapshot, catalog
+from .response_cache import PredictionCache, normalize_query, prediction_cache
+from .retrieval import SongRetriever, retriever
+
+
+class CatalogSnapshotTest(TestCase):
+    def setUp(self):
+        catalog.invalidate()
+        self.pop = Genres.objects.create(genre_name='Pop')
+        self.artist = Artist.objects.create(artist_name='Artist')
+        self.song = Song.objects.create(artist=self.artist, song_name='First')
+        self.song.genres.add(self.pop)
+
+    def tearDown(self):
+        catalog.invalidate()
+
+    def test_prompt_context_is_cached_per_version(self):
+        version, context = catalog.prompt_context()
+        self.assertIn('First', context)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.prompt_context(), (version, context))
+
+    def test_song_changes_are_applied_incrementally(self):
+        version, _ = catalog.prompt_context()
+
+        self.song.song_name = 'Renamed'
+        self.song.save()
+        second = Song.objects.create(artist=self.artist, song_name='Second')
+
+        new_version, context = catalog.prompt_context()
+        self.assertGreater(new_version, version)
+        self.assertIn('Renamed', context)
+        self.assertIn('Second', context)
+        self.assertEqual([row[0] for row in catalog.songs()], [self.song.id, second.id])
+
+        second.is_deleted = True
+        second.save()
+        self.assertEqual([row[0] for row in catalog.songs()], [self.song.id])
+
+    def test_artist_and_genre_changes_update_song_rows(self):
+        catalog.songs()
+
+        self.artist.artist_name = 'New Artist'
+        self.artist.save()
+        self.pop.genre_name = 'K-Pop'
+        self.pop.save()
+
+        self.assertEqual(catalog.songs()[0][3:], ('New Artist', ['K-Pop']))
+        self.assertEqual(catalog.genres(), ['K-Pop'])
+
+    def test_snapshot_is_rebuilt_after_max_age(self):
+        catalog.songs()
+        Song.objects.filter(id=self.song.id).update(song_name='Updated behind signals')
+
+        catalog.max_age, original = 0, catalog.max_age
+        try:
+            self.assertEqual(catalog.songs()[0][1], 'Updated behind signals')
+        finally:
+            catalog.max_age = original
+
+    def test_background_rebuild_keeps_serving_the_previous_snapshot(self):
+        background = CatalogSnapshot(background=True)
+        self.assertEqual([row[1] for row in background.songs()], ['First'])
+        version = background.current_version()
+        background.max_age = 0
+
+        gate = threading.Event()
+        rebuilt = ({self.song.id: (self.song.id, 'Rebuilt', 0, 'Artist', ['Pop'])}, {self.song.id: ''}, ['Pop'])
+
+        def load():
+            gate.wait(5)
+            return rebuilt
+
+        with mock.patch('a2a_server.catalog._load', load):
+            # Snapshot đã cũ: request khởi động thread nền và trả ngay snapshot cũ
+            self.assertEqual([row[1] for row in background.songs()], ['First'])
+            building = next(t for t in threading.enumerate() if t.name == 'catalog-snapshot-build')
+            self.assertEqual(background.current_version(), version)
+            gate.set()
+            building.join(5)
+
+        self.assertFalse(building.is_alive())
+        self.assertEqual(background.version, version + 1)
+        self.assertEqual(background._songs[self.song.id][1], 'Rebuilt')
+
+
+class StubModel:
+    def __init__(self, text='Hãy Trao Cho Anh'):
+        self.text = text
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=self.text)
+
+
+class SongRetrieverTest(TestCase):
+    def setUp(self):
+        catalog.invalidate()
+        ballad = Genres.objects.create(genre_name='Ballad')
+        rap = Genres.objects.create(genre_name='Rap')
+        son_tung = Artist.objects.create(artist_name='Sơn Tùng M-TP')
+        den = Artist.objects.create(artist_name='Đen Vâu')
+        filler = Artist.objects.create(artist_name='Filler')
+        Song.objects.bulk_create([Song(artist=filler, song_name=f'Filler {i}') for i in range(150)])
+        self.trao = Song.objects.create(artist=son_tung, song_name='Hãy Trao Cho Anh', lyrics_text='bóng ai đó nhẹ nhàng vụt qua nơi đây')
+        self.trao.genres.add(ballad)
+        self.mua = Song.objects.create(artist=den, song_name='Mang Tiền Về Cho Mẹ', lyrics_text='mang tiền về cho mẹ đừng mang ưu phiền')
+        self.mua.genres.add(rap)
+        self.retriever = SongRetriever(min_rebuild_interval=0)
+
+    def tearDown(self):
+        catalog.invalidate()
+
+    def ids(self, query, k=5):
+        return [row[0] for row in self.retriever.top_k(query, k=k)]
+
+    def test_songs_beyond_first_hundred_are_reachable(self):
+        self.assertEqual(self.ids('hay trao cho anh')[0], self.trao.id)
+        self.assertEqual(self.ids('bài rap của đen vâu')[0], self.mua.id)
+
+    def test_lyrics_and_typos_are_matched(self):
+        self.assertEqual(self.ids('nhe nhang vut qua')[0], self.trao.id)
+        self.assertEqual(self.ids('son tugn')[0], self.trao.id)
+
+    def test_top_k_is_bounded_and_empty_query_returns_nothing(self):
+        self.assertEqual(len(self.ids('filler', k=10)), 10)
+        self.assertEqual(self.ids('   '), [])
+
+    def test_index_follows_catalog_changes(self):
+        self.ids('trao')
+        self.trao.song_name = 'Chúng Ta Của Hiện Tại'
+        self.trao.save()
+        self.assertEqual(self.ids('hien tai')[0], self.trao.id)
+
+    def test_background_build_keeps_serving_the_previous_index(self):
+        class Source:
+            version = 1
+            rows = [(1, 'Hãy Trao Cho Anh', 0, 'Sơn Tùng M-TP', [])]
+            gate = threading.Event()
+
+            def snapshot(self):
+                self.gate.wait(5)
+                return self.version, list(self.rows), {}
+
+        def build(rows):
+            source.version += 1
+            source.rows = rows
+            self.assertEqual(background.top_k('trao'), served)
+            building = background.refresh()
+            self.assertTrue(building.is_alive())
+            source.gate.set()
+            building.join(5)
+            source.gate.clear()
+
+        source = Source()
+        background = SongRetriever(source=source, min_rebuild_interval=0, background=True)
+        # Chưa có index: request không chờ xây index
+        served = []
+        build(Source.rows)
+        served = background.top_k('trao')
+        self.assertEqual([row[0] for row in served], [1])
+
+        # Trong lúc xây index mới, request vẫn dùng index cũ
+        build([(2, 'Chúng Ta Của Hiện Tại', 0, 'Sơn Tùng M-TP', [])])
+        self.assertEqual([row[0] for row in background.top_k('hien tai')], [2])
+
+    def test_prompt_contains_only_retrieved_candidates(self):
+        prediction_cache.clear()
+        model = StubModel()
+        server = A2AServer(model=model)
+
+        with mock.patch.object(retriever, 'min_rebuild_interval', 0):
+            result = server.process_song_prediction_request('trao cho anh', user_id=1)
+
+        self.assertEqual(result, 'Hãy Trao Cho Anh')
+        prompt = model.prompts[0]
+        self.assertIn('Hãy Trao Cho Anh', prompt)
+        self.assertNotIn('Filler 0', prompt)
+
+
+class PredictionCacheTest(TestCase):
+    def test_normalize_query_ignores_case_diacritics_and_punctuation(self):
+        self.assertEqual(normalize_query('  Hãy TRAO cho anh!! '), normalize_query('hay trao cho anh'))
+
+    def test_concurrent_identical_requests_share_one_call(self):
+        cache = PredictionCache(maxsize=10, ttl=60)
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return 'answer'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while cache.stats()['coalesced'] < 7:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['answer'] * 8)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.get_or_compute('k', compute), 'answer')
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_errors_are_shared_but_not_cached(self):
+        cache = PredictionCache(maxsize=10, ttl=60)
+
+        def fail():
+            raise RuntimeError('upstream down')
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute('k', fail)
+        self.assertEqual(cache.get_or_compute('k', lambda: 'ok'), 'ok')
+
+    def test_waiters_retry_when_leader_leaves_during_prepare(self):
+        cache = PredictionCache(maxsize=10, ttl=60)
+        prepared = []
+
+        async def prepare():
+            prepared.append(1)
+            await asyncio.sleep(0.05)
+            return 'prompt'
+
+        async def compute(prompt):
+            return f'answer to {prompt}'
+
+        async def run():
+            leader = asyncio.ensure_future(cache.aget_or_compute('k', compute, prepare=prepare))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.ensure_future(cache.aget_or_compute('k', compute, prepare=prepare, timeout=1))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter
+
+        self.assertEqual(async_to_sync(run)(), 'answer to prompt')
+        self.assertEqual(len(prepared), 2)
+        self.assertEqual(cache.stats()['in_flight'], 0)
+
+
+class CachedPredictionTest(TestCase):
+    def setUp(self):
+        catalog.invalidate()
+        prediction_cache.clear()
+        artist = Artist.objects.create(artist_name='Artist')
+        self.song = Song.objects.create(artist=artist, song_name='Mưa Rơi')
+        self.model = StubModel('Mưa Rơi')
+        self.server = A2AServer(model=self.model)
+
+    def tearDown(self):
+        catalog.invalidate()
+        prediction_cache.clear()
+
+    def test_near_identical_queries_hit_the_cache(self):
+        self.server.process_song_prediction_request('mưa rơi', user_id=1)
+        self.server.process_song_prediction_request('Mua roi!', user_id=2)
+
+        self.assertEqual(len(self.model.prompts), 1)
+        self.assertEqual(prediction_cache.stats()['hits'], 1)
+
+    def test_catalog_change_invalidates_cached_answers(self):
+        self.server.process_song_prediction_request('mưa rơi', user_id=1)
+        Song.objects.create(artist=self.song.artist, song_name='Mưa Rơi Remix')
+        self.server.process_song_prediction_request('mưa rơi', user_id=1)
+
+        self.assertEqual(len(self.model.prompts), 2)
+
+    def test_empty_model_response_is_not_cached(self):
+        self.model.text = ''
+        first = self.server.process_song_prediction_request('mưa rơi', user_id=1)
+        self.model.text = 'Mưa Rơi'
+        second = self.server.process_song_prediction_request('mưa rơi', user_id=1)
+
+        self.assertIn('Xin lỗi', first)
+        self.assertEqual(second, 'Mưa Rơi')
+
+
+class AsyncStubModel:
+    """Model giả lập bất đồng bộ, ghi lại số lời gọi chạy đồng thời tối đa."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return SimpleNamespace(text=f'answer {self.calls}')
+
+
+class JsonRpcViewTest(TestCase):
+    def setUp(self):
+        catalog.invalidate()
+        prediction_cache.clear()
+        Song.objects.create(artist=Artist.objects.create(artist_name='Artist'), song_name='Song')
+        self.model = AsyncStubModel()
+        patcher = mock.patch.object(views.a2a_server, 'model', self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        catalog.invalidate()
+        prediction_cache.clear()
+
+    def call(self, payload):
+        return self.client.post('/a2a/jsonrpc/', json.dumps(payload), content_type='application/json')
+
+    def request(self, request_id, text):
+        return {'jsonrpc': '2.0', 'method': 'predict', 'id': request_id, 'params': {'input_text': text, 'user_id': 1}}
+
+    def test_single_request(self):
+        response = self.call(self.request(7, 'song'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'jsonrpc': '2.0', 'result': 'answer 1', 'id': 7})
+
+    def test_batch_requests_are_answered_in_order(self):
+        response = self.call([self.request(1, 'first'), self.request(2, ''), self.request(3, 'third')])
+
+        body = response.json()
+        self.assertEqual([item['id'] for item in body], [1, 2, 3])
+        self.assertIn('result', body[0])
+        self.assertEqual(body[1]['error']['code'], -32602)
+        self.assertIn('result', body[2])
+
+    @override_settings(A2A_MAX_CONCURRENT_CALLS=2)
+    def test_upstream_concurrency_is_bounded(self):
+        response = self.call([self.request(i, f'query {i}') for i in range(6)])
+
+        self.assertEqual(len(response.json()), 6)
+        self.assertEqual(self.model.calls, 6)
+        self.assertLessEqual(self.model.max_running, 2)
+
+    @override_settings(A2A_CALL_TIMEOUT=0.05)
+    def test_slow_upstream_call_times_out(self):
+        self.model.delay = 1
+
+        response = self.call(self.request(5, 'slow'))
+
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(response.json()['error']['code'], -32001)
+        self.assertEqual(prediction_cache.stats()['in_flight'], 0)
+
+    @override_settings(TRACE_SAMPLE_RATE=1)
+    def test_sampled_request_logs_one_record_with_spans(self):
+        with self.assertLogs('a2a_server.views', level='INFO') as logs:
+            self.call(self.request(1, 'traced'))
+
+        record = logs.records[-1]
+        self.assertEqual(record.getMessage(), 'a2a.jsonrpc')
+        self.assertEqual(record.fields['status'], 200)
+        self.assertTrue({'db', 'prompt_build', 'model_call'} <= set(record.fields['spans']))
+
+    @override_settings(TRACE_SAMPLE_RATE=0)
+    def test_unsampled_fast_request_is_not_logged(self):
+        with self.assertNoLogs('a2a_server.views', level='INFO'):
+            self.call(self.request(1, 'quiet'))
+
+    @override_settings(TRACE_SAMPLE_RATE=0)
+    def test_unsampled_error_response_is_logged(self):
+        with self.assertLogs('a2a_server.views', level='WARNING') as logs:
+            response = self.client.post('/a2a/jsonrpc/', '{bad', content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(logs.records[-1].fields['status'], 400)
+
+    def test_tasks_send_and_get(self):
+        sent = self.call({'jsonrpc': '2.0', 'method': 'tasks/send', 'id': 1, 'params': {'input_text': 'song', 'user_id': 1}})
+        task = sent.json()['result']
+        self.assertEqual(task['status'], 'queued')
+        self.assertEqual(self.model.calls, 0)
+
+        get = {'jsonrpc': '2.0', 'method': 'tasks/get', 'id': 2, 'params': {'id': task['id']}}
+        self.assertEqual(self.call(get).json()['result']['status'], 'queued')
+
+        server = A2AServer(model=StubModel('Song'))
+        with mock.patch.object(tasks.a2a_server, 'model', server.model):
+            Worker().run(burst=True)
+
+        self.assertEqual(self.call(get).json()['result'], {'id': task['id'], 'status': 'done', 'result': 'Song'})
+        for guessed in (999, str(Task.objects.get().id), task['id'][:-1]):
+            missing = {'jsonrpc': '2.0', 'method': 'tasks/get', 'id': 3, 'params': {'id': guessed}}
+            self.assertEqual(self.call(missing).status_code, 404)
+
+    def test_invalid_payloads(self):
+        self.assertEqual(self.client.get('/a2a/jsonrpc/').status_code, 405)
+        self.assertEqual(self.call([]).status_code, 400)
+        response = self.client.post('/a2a/jsonrpc/', '{bad', content_type='application/json')
+        self.assertEqual(response.json()['error']['code'], -32700)
+
+
+class AsgiJsonRpcTest(TransactionTestCase):
+    """
+    Chạy jsonrpc qua backend.asgi.application như daphne, kể cả chuỗi middleware thật.
+    ASGIHandler chạy code sync của mỗi request trong thread riêng (ThreadSensitiveContext)
+    nên dữ liệu phải được commit thật, không nằm trong transaction của TestCase.
+    """
+
+    def setUp(self):
+        catalog.invalidate()
+        prediction_cache.clear()
+        Song.objects.create(artist=Artist.objects.create(artist_name='Artist'), song_name='Song')
+        self.model = AsyncStubModel()
+        patcher = mock.patch.object(views.a2a_server, 'model', self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        catalog.invalidate()
+        prediction_cache.clear()
+
+    def communicator(self, text):
+        body = json.dumps({'jsonrpc': '2.0', 'method': 'predict', 'id': 1, 'params': {'input_text': text, 'user_id': 1}})
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+            'scheme': 'http', 'path': '/a2a/jsonrpc/', 'raw_path': b'/a2a/jsonrpc/', 'query_string': b'',
+            'headers': [(b'host', b'testserver'), (b'content-type', b'application/json')],
+            'client': ('127.0.0.1', 1234), 'server': ('testserver', 80),
+        }
+        communicator = ApplicationCommunicator(application, scope)
+        return communicator, body.encode()
+
+    @override_settings(A2A_CALL_TIMEOUT=2)
+    def test_uncached_call_is_answered(self):
+        async def run():
+            communicator, body = self.communicator('song')
+            await communicator.send_input({'type': 'http.request', 'body': body, 'more_body': False})
+            start = await communicator.receive_output(3)
+            content = await communicator.receive_output(3)
+            return start, content
+
+        start, content = async_to_sync(run)()
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(json.loads(content['body']), {'jsonrpc': '2.0', 'result': 'answer 1', 'id': 1})
+
+    def test_view_is_cancelled_when_client_disconnects(self):
+        self.model.delay = 10
+
+        async def run():
+            communicator, body = self.communicator('slow')
+            await communicator.send_input({'type': 'http.request', 'body': body, 'more_body': False})
+            async def model_started():
+                while self.model.running == 0:
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(model_started(), 3)
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait(1)
+
+        async_to_sync(run)()
+        self.assertEqual(self.model.running, 0)
+        self.assertEqual(prediction_cache.stats()['in_flight'], 0)
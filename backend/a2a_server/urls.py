@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('jsonrpc/', views.jsonrpc, name='jsonrpc'),
+    path('stats/', views.stats, name='a2a-stats'),
 ] 
\ No newline at end of file
@@ -1,120 +1,131 @@
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from django.core import signing
+from django.http import JsonResponse, HttpResponseNotAllowed
 from django.views.decorators.http import require_http_methods
+import asyncio
 import json
 import logging
-import os
-import sys
-import traceback
-from dotenv import load_dotenv
-from logging.handlers import RotatingFileHandler
+from asgiref.sync import sync_to_async
 from .a2a_server import a2a_server
+from .response_cache import prediction_cache
+from .tasks import predict as predict_task
+from backend.tracing import start_trace
+from tasks.models import Task
 
-# Configure logging
-try:
-    log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-
-    log_file = os.path.join(log_dir, 'a2a_server.txt')
-    max_bytes = 5 * 1024 * 1024  # 5MB
-    backup_count = 3
-    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', mode='a')
-    file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
-    file_handler.setFormatter(file_formatter)
-
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
-    console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(console_formatter)
-
-    logging.basicConfig(
-        level=logging.DEBUG,
-        handlers=[console_handler, file_handler]
-    )
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.DEBUG)
-
-    logger.info("="*50)
-    logger.info("A2A Server Starting")
-    logger.info(f"Python version: {sys.version}")
-    logger.info(f"Current working directory: {os.getcwd()}")
-    logger.info(f"Log file location: {log_file}")
-    logger.info("="*50)
-
-except Exception as e:
-    print(f"Error configuring logging: {str(e)}")
-    print(f"Traceback: {traceback.format_exc()}")
-    logger.error(f"Error configuring logging: {str(e)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
-    raise
-
-# Load environment variables
-load_dotenv()
-logger.info("Environment variables loaded")
-
-@csrf_exempt
-@require_http_methods(["POST"])
-def jsonrpc(request):
-    try:
-        logger.info("="*50)
-        logger.info(f"New request received at {request.path}")
-        logger.info(f"Request method: {request.method}")
-        logger.info(f"Request headers: {dict(request.headers)}")
-
-        body = request.body.decode('utf-8')
-        logger.info(f"Request body: {body}")
-
-        if request.content_type == 'application/json':
-            try:
-                data = json.loads(body)
-                logger.info(f"Request JSON data: {data}")
-                input_text = data.get('params', {}).get('input_text', '')
-                user_id = data.get('params', {}).get('user_id')
-            except json.JSONDecodeError:
-                logger.error("Invalid JSON format")
-                error_response = {
-                    'jsonrpc': '2.0',
-                    'error': {'code': -32700, 'message': 'Parse error'},
-                    'id': None
-                }
-                return JsonResponse(error_response, status=400)
-        else:
-            logger.info(f"Request POST data: {request.POST}")
-            input_text = request.POST.get('input_text', '')
-            user_id = request.POST.get('user_id')
-        
-        logger.info(f"Extracted parameters - Input text: {input_text}, User ID: {user_id}")
-        
-        if not input_text or not user_id:
-            error_response = {
-                'jsonrpc': '2.0',
-                'error': {'code': -32602, 'message': 'Tham số không hợp lệ'},
-                'id': 1
-            }
-            logger.error(f"Invalid parameters: {error_response}")
-            return JsonResponse(error_response, status=400)
+logger = logging.getLogger(__name__)
+
+TASK_HANDLE_SALT = 'a2a_server.tasks'
+
+def _error(code, message, request_id):
+    return {
+        'jsonrpc': '2.0',
+        'error': {'code': code, 'message': message},
+        'id': request_id
+    }
 
+async def _predict(input_text, user_id, request_id):
+    """Xử lý một yêu cầu dự đoán, trả về (response, HTTP status)"""
+    if not input_text or not user_id:
+        return _error(-32602, 'Tham số không hợp lệ', request_id), 400
+
+    try:
         # Xử lý yêu cầu đề xuất nhạc
-        response = a2a_server.process_song_prediction_request(input_text, user_id)
-        
-        result = {
-            'jsonrpc': "2.0",
-            'result': response,
-            'id': 1
-        }
-        
-        logger.info(f"Sending response: {result}")
-        logger.info("="*50)
-        return JsonResponse(result)
-            
-    except Exception as e:
-        logger.error(f"Server error: {str(e)}")
-        logger.error(f"Traceback (first 1000 chars): {traceback.format_exc()[:1000]}")
-        error_response = {
-            'jsonrpc': '2.0',
-            'error': {'code': -32000, 'message': str(e)},
-            'id': None
-        }
-        return JsonResponse(error_response, status=500) 
\ No newline at end of file
+        response = await a2a_server.aprocess_song_prediction_request(input_text, user_id)
+    except asyncio.TimeoutError:
+        logger.warning("Upstream call timed out", extra={'fields': {'request_id': request_id}})
+        return _error(-32001, 'Hết thời gian chờ phản hồi từ model', request_id), 504
+
+    return {'jsonrpc': "2.0", 'result': response, 'id': request_id}, 200
+
+async def _send_task(input_text, user_id, request_id):
+    """
+    tasks/send: đưa yêu cầu vào task queue và trả về id ngay, kết quả lấy bằng tasks/get.
+    Id trả về là id của Task đã ký, không đoán được, nên chỉ người gửi đọc được kết quả.
+    """
+    if not input_text or not user_id:
+        return _error(-32602, 'Tham số không hợp lệ', request_id), 400
+    task = await sync_to_async(predict_task.delay)(input_text, user_id)
+    handle = signing.dumps(task.id, salt=TASK_HANDLE_SALT)
+    return {'jsonrpc': '2.0', 'result': {'id': handle, 'status': task.status}, 'id': request_id}, 200
+
+async def _get_task(handle, request_id):
+    """tasks/get: trạng thái và kết quả của một yêu cầu đã gửi bằng tasks/send"""
+    try:
+        task_id = signing.loads(handle, salt=TASK_HANDLE_SALT) if isinstance(handle, str) else None
+    except signing.BadSignature:
+        task_id = None
+    task = await Task.objects.filter(pk=task_id, name=predict_task.name).afirst() if task_id is not None else None
+    if task is None:
+        return _error(-32602, 'Không tìm thấy task', request_id), 404
+    result = {'id': handle, 'status': task.status}
+    if task.status == 'done':
+        result['result'] = task.result
+    elif task.status == 'failed':
+        result['error'] = 'Xin lỗi, không thể dự đoán tên bài hát lúc này. Vui lòng thử lại sau.'
+    return {'jsonrpc': '2.0', 'result': result, 'id': request_id}, 200
+
+async def _handle_call(call):
+    if not isinstance(call, dict):
+        return _error(-32600, 'Invalid Request', None), 400
+    params = call.get('params')
+    if not isinstance(params, dict):
+        params = {}
+    method = call.get('method')
+    request_id = call.get('id', 1)
+    if method == 'tasks/send':
+        return await _send_task(params.get('input_text', ''), params.get('user_id'), request_id)
+    if method == 'tasks/get':
+        return await _get_task(params.get('id'), request_id)
+    return await _predict(params.get('input_text', ''), params.get('user_id'), request_id)
+
+async def jsonrpc(request):
+    """
+    Endpoint JSON-RPC 2.0 của A2A agent (async, không chặn worker khi chờ Gemini).
+
+    Hỗ trợ batch: body là một mảng request, các request được xử lý đồng thời và
+    kết quả trả về theo đúng thứ tự. Mỗi lời gọi có thời hạn A2A_CALL_TIMEOUT giây.
+    Phương thức tasks/send đưa yêu cầu vào task queue để gọi Gemini ngoài request,
+    client lấy kết quả bằng tasks/get với id nhận được.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    with start_trace('a2a.jsonrpc', logger, path=request.path) as trace:
+        try:
+            if request.content_type == 'application/json':
+                try:
+                    data = json.loads(request.body)
+                except json.JSONDecodeError:
+                    trace.fields['status'] = 400
+                    return JsonResponse(_error(-32700, 'Parse error', None), status=400)
+
+                if isinstance(data, list):
+                    trace.fields['batch_size'] = len(data)
+                    max_batch = getattr(settings, 'A2A_MAX_BATCH_SIZE', 20)
+                    if not data or len(data) > max_batch:
+                        trace.fields['status'] = 400
+                        return JsonResponse(_error(-32600, 'Invalid Request', None), status=400)
+                    results = await asyncio.gather(*(_handle_call(call) for call in data))
+                    trace.fields['status'] = 200
+                    return JsonResponse([result for result, _ in results], safe=False)
+
+                result, status = await _handle_call(data)
+            else:
+                result, status = await _predict(request.POST.get('input_text', ''), request.POST.get('user_id'), 1)
+
+            trace.fields['status'] = status
+            return JsonResponse(result, status=status)
+
+        except Exception as e:
+            logger.exception("Server error")
+            trace.error = repr(e)
+            trace.fields['status'] = 500
+            return JsonResponse(_error(-32000, str(e), None), status=500)
+
+# csrf_exempt của Django 4.2 chưa hỗ trợ async view, đánh dấu trực tiếp
+jsonrpc.csrf_exempt = True
+
+@require_http_methods(["GET"])
+def stats(request):
+    """Số liệu hit/miss của cache kết quả dự đoán"""
+    return JsonResponse({'prediction_cache': prediction_cache.stats()})
@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from .models import Album
+from images.fields import ImageVariantsField
 
 class AlbumSerializer(serializers.ModelSerializer):
+    album_cover_variants = ImageVariantsField(source='album_cover_url')
+
     class Meta:
         model = Album
         fields = '__all__'
\ No newline at end of file
@@ -0,0 +1,12 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from backend import query_cache
+from .models import Album
+
+
+@receiver(post_save, sender=Album)
+@receiver(post_delete, sender=Album)
+@receiver(m2m_changed, sender=Album.song.through)
+def invalidate_album_lists(sender, **kwargs):
+    query_cache.bump('album')
@@ -6,17 +6,26 @@ from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import filters
+from backend.query_cache import CachedListMixin, get_versions
+from backend.conditional import ConditionalGetMixin, make_etag
 
-class AlbumListCreateView(generics.ListCreateAPIView):
+# Album chưa có migration nên không thêm được updated_at; ETag của album dựa vào version
+# 'album' của backend.query_cache, đổi mỗi khi một album bất kỳ thay đổi (không tốn query nào)
+
+class AlbumListCreateView(ConditionalGetMixin, CachedListMixin, generics.ListCreateAPIView):
     queryset = Album.objects.filter(is_deleted=False)
     serializer_class = AlbumSerializer
+    cache_dependencies = ('album',)
     filter_backends = [filters.SearchFilter]
     search_fields = ['album_name', 'artist__name']
 
-class AlbumRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class AlbumRetrieveUpdateDestroyView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Album.objects.filter(is_deleted=False)
     serializer_class = AlbumSerializer
 
+    def get_object_etag(self):
+        return make_etag('album', self.kwargs['pk'], *get_versions(['album']))
+
     def destroy(self, request, *args, **kwargs):
         album = self.get_object()
         album.is_deleted = True
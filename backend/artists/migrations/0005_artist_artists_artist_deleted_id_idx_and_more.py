@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artists', '0004_artist_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artist',
+            index=models.Index(fields=['is_deleted', '-id'], name='artists_artist_deleted_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['user', 'artist'], name='artists_follow_user_idx'),
+        ),
+    ]
@@ -9,6 +9,13 @@ class Artist(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
     genres = models.ManyToManyField(Genres)
     is_deleted = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Danh sách nghệ sĩ còn hiển thị sắp theo -id (xem songs.Song)
+        indexes = [
+            models.Index(fields=['is_deleted', '-id'], name='artists_artist_deleted_id_idx'),
+        ]
 
     def __str__(self):
         return self.artist_name
@@ -18,4 +25,8 @@ class Follow(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     
     class Meta:
-        unique_together = ('artist', 'user')
\ No newline at end of file
+        unique_together = ('artist', 'user')
+        # unique_together bắt đầu bằng artist; danh sách nghệ sĩ đang theo dõi lọc theo user
+        indexes = [
+            models.Index(fields=['user', 'artist'], name='artists_follow_user_idx'),
+        ]
\ No newline at end of file
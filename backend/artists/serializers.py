@@ -1,21 +1,47 @@
 from rest_framework import serializers
 from .models import Artist, Follow
-from songs.models import Song
+from images.fields import ImageVariantsField
 
 class ArtistSerializer(serializers.ModelSerializer):
     songs = serializers.SerializerMethodField()
+    artist_picture_variants = ImageVariantsField(source='artist_picture_url')
 
     class Meta:
         model = Artist
         fields = '__all__'
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # Dùng prefetch cho songs và genres để tránh N+1 query khi serialize danh sách
+        return queryset.prefetch_related('genres', 'song_set__genres')
+
     def get_songs(self, obj):
         from songs.serializers import SongSimpleSerializer
-        songs = Song.objects.filter(artist=obj)
+        # song_set.all() sẽ dùng dữ liệu đã prefetch nếu có
+        songs = obj.song_set.all()
         return SongSimpleSerializer(songs, many=True).data
 
+class ArtistSummarySerializer(serializers.ModelSerializer):
+    """
+    Thông tin rút gọn của nghệ sĩ, dùng khi lồng trong bài hát.
+
+    Kết quả được cache theo id nghệ sĩ trong context của request, nên một
+    danh sách nhiều bài hát của cùng một nghệ sĩ chỉ serialize nghệ sĩ đó một lần.
+    """
+    artist_picture_variants = ImageVariantsField(source='artist_picture_url')
+
+    class Meta:
+        model = Artist
+        fields = ['id', 'artist_name', 'artist_picture_url', 'artist_picture_variants', 'user']
+
+    def to_representation(self, instance):
+        cache = self.context.setdefault('artist_summary_cache', {})
+        if instance.pk not in cache:
+            cache[instance.pk] = super().to_representation(instance)
+        return dict(cache[instance.pk])
+
 class FollowSerializer(serializers.ModelSerializer):
     class Meta:
         model = Follow
         fields = ['id', 'user']
-        read_only_fields = ['user']
\ No newline at end of file
+        read_only_fields = ['user']
@@ -0,0 +1,18 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from backend import query_cache
+from backend.conditional import touch_m2m
+from .models import Artist
+
+
+@receiver(post_save, sender=Artist)
+@receiver(post_delete, sender=Artist)
+@receiver(m2m_changed, sender=Artist.genres.through)
+def invalidate_artist_lists(sender, **kwargs):
+    query_cache.bump('artist')
+
+
+@receiver(m2m_changed, sender=Artist.genres.through)
+def touch_artist_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m(Artist, instance, action, reverse, pk_set)
@@ -8,10 +8,14 @@ from rest_framework import filters
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.exceptions import NotFound
+from backend.query_cache import CachedListMixin
+from backend.conditional import ConditionalGetMixin, aggregate_etag
+from django.db.models import Sum
 
-class ArtistListCreateView(generics.ListCreateAPIView):
-    queryset = Artist.objects.filter(is_deleted=False)
+class ArtistListCreateView(ConditionalGetMixin, CachedListMixin, generics.ListCreateAPIView):
+    queryset = ArtistSerializer.setup_eager_loading(Artist.objects.filter(is_deleted=False))
     serializer_class = ArtistSerializer
+    cache_dependencies = ('artist', 'song')
     filter_backends = [filters.SearchFilter]
     search_fields = ['artist_name']
 
@@ -21,13 +25,20 @@ class FollowedArtistView(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Artist.objects.filter(follow__user=user, is_deleted=False).distinct()
+        return ArtistSerializer.setup_eager_loading(
+            Artist.objects.filter(follow__user=user, is_deleted=False).distinct()
+        )
 
 
-class ArtistRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Artist.objects.filter(is_deleted=False)
+class ArtistRetrieveUpdateDestroyView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = ArtistSerializer.setup_eager_loading(Artist.objects.filter(is_deleted=False))
     serializer_class = ArtistSerializer
 
+    def get_object_etag(self):
+        # Artist kèm danh sách bài hát đầy đủ, nên ETag gồm cả phiên bản các bài hát
+        queryset = Artist.objects.filter(pk=self.kwargs['pk'], is_deleted=False)
+        return aggregate_etag(queryset, 'updated_at', 'song__updated_at', Sum('song__plays'), extra=('artist', self.kwargs['pk']))
+
     def destroy(self, request, *args, **kwargs):
         artist = self.get_object()
         artist.is_deleted = True
@@ -9,9 +9,10 @@ django.setup()
 from chatbox.routing import websocket_urlpatterns 
 import django.core.asgi
 from channels.auth import AuthMiddlewareStack
+from a2a_server.middleware import CancelOnDisconnectMiddleware
 
 application = ProtocolTypeRouter({
-    "http": django.core.asgi.get_asgi_application(),
+    "http": CancelOnDisconnectMiddleware(django.core.asgi.get_asgi_application()),
     "websocket": AuthMiddlewareStack(
         URLRouter(websocket_urlpatterns)
     ),
@@ -0,0 +1,100 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .media import media_epoch
+from .query_cache import get_versions, ttl_epoch
+
+
+def make_etag(*parts):
+    """
+    ETag từ các giá trị phiên bản (updated_at, version...). Gồm cả chu kỳ ký URL media,
+    để client không dùng lại quá lâu một response chứa URL đã ký sắp hết hạn.
+    """
+    raw = repr(parts + (media_epoch(),))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def aggregate_etag(queryset, *fields, extra=()):
+    """
+    ETag của một tập hợp: Max của các field phiên bản (hoặc biểu thức aggregate bất kỳ)
+    và số dòng, tính bằng một query aggregate nhỏ (không đọc từng dòng). Số dòng giúp
+    nhận ra dòng bị xóa hẳn.
+    """
+    aggregates = {
+        f'v{i}': Max(field) if isinstance(field, str) else field
+        for i, field in enumerate(fields)
+    }
+    aggregates['count'] = Count('pk', distinct=True)
+    values = queryset.order_by().aggregate(**aggregates)
+    return make_etag(*extra, *(values[key] for key in sorted(values)))
+
+
+def touch_m2m(model, instance, action, reverse, pk_set):
+    """
+    Receiver m2m_changed: cập nhật updated_at của phía `model` khi quan hệ nhiều-nhiều đổi,
+    vì thay đổi này không đi qua save() nên auto_now không chạy.
+    """
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        pks = [instance.pk]
+    elif pk_set:
+        pks = list(pk_set)
+    else:
+        return
+    model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags or f'W/{etag}' in etags
+
+
+class ConditionalGetMixin:
+    """
+    Hỗ trợ GET có điều kiện (ETag / If-None-Match) cho generic view.
+
+    View định nghĩa `get_object_etag()` và/hoặc `get_list_etag()` dựa trên dữ liệu phiên
+    bản (updated_at, version của cache). ETag được tính trước, nếu khớp thì trả về 304
+    ngay mà không load hay serialize dữ liệu.
+
+    Với list view có cache (CachedListMixin), ETag mặc định lấy từ version của các tag
+    phụ thuộc và chu kỳ QUERY_CACHE_TTL hiện tại, nên không tốn query nào.
+    """
+
+    def get_object_etag(self):
+        return None
+
+    def get_list_etag(self):
+        tags = getattr(self, 'cache_dependencies', ())
+        if not tags:
+            return None
+        return make_etag(type(self).__name__, *get_versions(tags), ttl_epoch(), self.list_etag_params())
+
+    def list_etag_params(self):
+        # Tham số query (tìm kiếm, lọc, cursor phân trang) là một phần của ETag danh sách
+        return tuple(sorted(self.request.query_params.lists()))
+
+    def _conditional(self, etag, handler, request, *args, **kwargs):
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(self.get_object_etag(), super().retrieve, request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(self.get_list_etag(), super().list, request, *args, **kwargs)
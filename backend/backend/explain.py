@@ -0,0 +1,56 @@
+import json
+import re
+
+from django.db import connections
+
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def _mysql_full_scans(plan):
+    tables = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if node.get('access_type') == 'ALL':
+                tables.append(node.get('table_name'))
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(json.loads(plan))
+    return tables
+
+
+def full_scans(queryset):
+    """
+    Các bảng mà câu query của queryset phải đọc toàn bộ (không qua index nào), theo
+    EXPLAIN của database đang dùng (SQLite, MySQL hoặc PostgreSQL).
+
+    Với SQLite, "SCAN <bảng> USING INDEX ..." là duyệt theo index (ví dụ index ghép đã
+    sắp sẵn theo cột cần ORDER BY) nên không bị tính là full scan.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'mysql':
+        return _mysql_full_scans(queryset.explain(format='json'))
+
+    plan = queryset.explain()
+    if vendor == 'postgresql':
+        return POSTGRES_SCAN.findall(plan)
+
+    tables = []
+    for line in plan.splitlines():
+        match = SQLITE_SCAN.search(line)
+        if match and match.group(1) != 'CONSTANT' and 'USING' not in match.group(2):
+            tables.append(match.group(1))
+    return tables
+
+
+class QueryPlanAssertions:
+    """Mixin cho TestCase: bắt lỗi khi một query quan trọng quay về đọc toàn bảng."""
+
+    def assertUsesIndex(self, queryset):
+        scans = full_scans(queryset)
+        self.assertEqual(scans, [], f'Query đọc toàn bảng {scans}:\n{queryset.query}\n{queryset.explain()}')
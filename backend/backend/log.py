@@ -0,0 +1,70 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+REDACTED = '[REDACTED]'
+
+
+class JsonFormatter(logging.Formatter):
+    """Định dạng log thành một dòng JSON, gộp các trường có cấu trúc trong `extra={'fields': {...}}`."""
+
+    def format(self, record):
+        data = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RedactingFilter(logging.Filter):
+    """Ẩn giá trị của các trường nhạy cảm và cắt ngắn chuỗi dài trong `record.fields`."""
+
+    def __init__(self, keys=('authorization', 'cookie', 'password', 'token', 'api_key'), max_length=500):
+        super().__init__()
+        self.keys = {key.lower() for key in keys}
+        self.max_length = max_length
+
+    def _clean(self, value):
+        if isinstance(value, dict):
+            return {k: REDACTED if str(k).lower() in self.keys else self._clean(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._clean(v) for v in value]
+        if isinstance(value, str) and len(value) > self.max_length:
+            return value[:self.max_length] + '...'
+        return value
+
+    def filter(self, record):
+        fields = getattr(record, 'fields', None)
+        if fields:
+            record.fields = self._clean(fields)
+        return True
+
+
+class QueueFileHandler(QueueHandler):
+    """
+    Handler ghi log không chặn: thread gọi logger chỉ định dạng record và đưa vào
+    queue, một thread nền (QueueListener) ghi ra stdout và, nếu có `filename`, file xoay vòng.
+    """
+
+    def __init__(self, filename=None, max_bytes=5 * 1024 * 1024, backup_count=3, console=True):
+        super().__init__(queue.SimpleQueue())
+        targets = []
+        if filename:
+            directory = os.path.dirname(filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            targets.append(RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'))
+        if console or not targets:
+            targets.append(logging.StreamHandler(sys.stdout))
+        self.listener = QueueListener(self.queue, *targets)
+        self.listener.start()
+        atexit.register(self.listener.stop)
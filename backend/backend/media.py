@@ -0,0 +1,154 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.storage import default_storage
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import get_attribute
+
+from .cache import TTLCache
+
+
+class SignedUrlCache:
+    """
+    Cache URL của file media theo (storage, tên file).
+
+    Với S3 (querystring_auth), mỗi lần gọi storage.url() là một lần ký HMAC
+    signature v4; URL đã ký được dùng lại tới `margin` giây trước khi hết hạn.
+    Storage không ký URL (FileSystemStorage, custom domain công khai) được cache
+    với `unsigned_ttl`. Khi thay file, FileField lưu với tên mới
+    (AWS_S3_FILE_OVERWRITE = False) nên key cũ tự nhiên không còn được dùng.
+    """
+
+    def __init__(self, maxsize=None, margin=None, unsigned_ttl=3600, timer=time.monotonic):
+        self.margin = margin if margin is not None else getattr(settings, 'MEDIA_URL_CACHE_MARGIN', 300)
+        self.unsigned_ttl = unsigned_ttl
+        self._cache = TTLCache(
+            maxsize=maxsize or getattr(settings, 'MEDIA_URL_CACHE_SIZE', 10000),
+            ttl=unsigned_ttl,
+            timer=timer,
+        )
+
+    @staticmethod
+    def _key(storage, name):
+        location = getattr(storage, 'bucket_name', None) or getattr(storage, 'location', '')
+        return (type(storage).__name__, location, name)
+
+    def _ttl(self, storage):
+        if getattr(storage, 'querystring_auth', False):
+            return getattr(storage, 'querystring_expire', 3600) - self.margin
+        return self.unsigned_ttl
+
+    def url(self, field_file):
+        """URL của một FieldFile, chỉ gọi storage.url() khi cache chưa có hoặc sắp hết hạn."""
+        if not field_file:
+            return None
+        return self.urls([field_file])[field_file.name]
+
+    def urls(self, field_files):
+        """
+        Trả về {tên file: URL} cho nhiều file cùng lúc, dùng khi serialize một trang danh sách:
+        mỗi file trùng tên chỉ được tra cache và ký một lần.
+        """
+        result = {}
+        for field_file in field_files:
+            if not field_file or field_file.name in result:
+                continue
+            result[field_file.name] = self.storage_url(field_file.storage, field_file.name)
+        return result
+
+    def storage_url(self, storage, name):
+        """URL của một file theo tên trong storage, dùng cho file không gắn với FileField (vd. segment HLS)."""
+        key = self._key(storage, name)
+        url = self._cache.get(key)
+        if url is None:
+            url = storage.url(name)
+            ttl = self._ttl(storage)
+            if ttl > 0:
+                self._cache.set(key, url, ttl=ttl)
+        return url
+
+    def invalidate(self, field_file):
+        if field_file:
+            self._cache.delete(self._key(field_file.storage, field_file.name))
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+signed_urls = SignedUrlCache()
+
+
+def media_epoch():
+    """
+    Số thứ tự của khoảng MEDIA_URL_CACHE_MARGIN giây hiện tại nếu storage ký URL, ngược lại 0.
+
+    Một URL đã ký còn hiệu lực ít nhất MEDIA_URL_CACHE_MARGIN giây sau khi được trả về,
+    nên response được dùng lại (ETag, 304) trong cùng một khoảng vẫn có URL dùng được.
+    """
+    if not getattr(default_storage, 'querystring_auth', False):
+        return 0
+    return int(time.time() // max(signed_urls.margin, 1))
+
+
+class SignedUrlMixin:
+    """Trả về URL của file qua `signed_urls` thay vì gọi value.url cho mỗi dòng."""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        if not getattr(self, 'use_url', True):
+            return value.name
+        url = signed_urls.url(value)
+        request = self.context.get('request', None)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class SignedFileField(SignedUrlMixin, serializers.FileField):
+    pass
+
+
+class SignedImageField(SignedUrlMixin, serializers.ImageField):
+    pass
+
+
+class SignedMediaListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer ký trước URL của mọi field media trong trang hiện tại (một lượt,
+    bỏ trùng tên file), sau đó từng dòng chỉ còn đọc từ cache.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        media_fields = [f for f in self.child.fields.values() if isinstance(f, SignedUrlMixin) and not f.write_only]
+        if media_fields and items:
+            signed_urls.urls(
+                value for item in items for field in media_fields
+                for value in [self._media_value(item, field)] if value
+            )
+        return super().to_representation(items)
+
+    @staticmethod
+    def _media_value(item, field):
+        try:
+            return get_attribute(item, field.source_attrs)
+        except (ObjectDoesNotExist, AttributeError, KeyError):
+            return None
+
+
+class SignedMediaModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer dùng SignedFileField/SignedImageField cho FileField/ImageField của model.
+    Khai báo `list_serializer_class = SignedMediaListSerializer` trong Meta để ký theo lô khi many=True.
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: SignedFileField,
+        models.ImageField: SignedImageField,
+    }
@@ -0,0 +1,302 @@
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class BudgetExceeded(AssertionError):
+    """Request vượt ngân sách query/thời gian của route khi METRICS_BUDGET_ACTION = 'raise' (dùng trong test)."""
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """
+    Số liệu request trong bộ nhớ của process, xuất theo định dạng text của Prometheus.
+
+    Nhãn là route (mẫu URL như `songs/<int:pk>/`, không phải đường dẫn thật) và method,
+    nên số series không tăng theo số bài hát hay người dùng.
+    """
+
+    HISTOGRAMS = {
+        'http_request_duration_seconds': ('Tổng thời gian xử lý request', DURATION_BUCKETS),
+        'http_request_db_seconds': ('Thời gian chạy query database trong request', DURATION_BUCKETS),
+        'http_request_render_seconds': ('Thời gian serialize response (render JSON)', DURATION_BUCKETS),
+        'http_request_queries': ('Số query database trong request', QUERY_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._requests = {}
+            self._budget_violations = {}
+            self._histograms = {name: {} for name in self.HISTOGRAMS}
+
+    def record(self, route, method, status, timing, budget_violations=()):
+        labels = (route, method)
+        with self._lock:
+            key = (route, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for name, value in (
+                ('http_request_duration_seconds', timing.total),
+                ('http_request_db_seconds', timing.db),
+                ('http_request_render_seconds', timing.render),
+                ('http_request_queries', timing.queries),
+            ):
+                series = self._histograms[name]
+                if labels not in series:
+                    series[labels] = Histogram(self.HISTOGRAMS[name][1])
+                series[labels].observe(value)
+            for kind in budget_violations:
+                key = (route, kind)
+                self._budget_violations[key] = self._budget_violations.get(key, 0) + 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines.append('# HELP http_requests_total Số request đã xử lý')
+            lines.append('# TYPE http_requests_total counter')
+            for (route, method, status), value in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{_labels(route=route, method=method, status=status)} {value}')
+
+            for name, (help_text, buckets) in self.HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (route, method), histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        labels = _labels(route=route, method=method, le=_format(bound))
+                        lines.append(f'{name}_bucket{labels} {cumulative}')
+                    labels = _labels(route=route, method=method)
+                    lines.append(f'{name}_sum{labels} {_format(histogram.sum)}')
+                    lines.append(f'{name}_count{labels} {cumulative}')
+
+            lines.append('# HELP http_request_budget_exceeded_total Số request vượt ngân sách của route')
+            lines.append('# TYPE http_request_budget_exceeded_total counter')
+            for (route, kind), value in sorted(self._budget_violations.items()):
+                lines.append(f'http_request_budget_exceeded_total{_labels(route=route, budget=kind)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+registry = Registry()
+
+
+class RequestTiming:
+    """Số query và thời gian (giây) của một request, nhận query qua `_timed_execute`."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.render = 0.0
+        self.total = 0.0
+        self._render_started_at = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started_at
+            self.queries += 1
+
+    def start_render(self):
+        self._render_started_at = time.perf_counter()
+
+    def end_render(self):
+        if self._render_started_at is not None:
+            self.render += time.perf_counter() - self._render_started_at
+            self._render_started_at = None
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'render;dur={self.render * 1000:.1f}',
+            f'total;dur={self.total * 1000:.1f}',
+        ])
+
+
+# Timing của request hiện tại. ContextVar được sao chép sang thread của sync_to_async/async_to_sync
+# nên query chạy trong thread khác (view sync dưới ASGI) vẫn được tính cho đúng request.
+_current_timing = ContextVar('request_timing', default=None)
+
+
+def _timed_execute(execute, sql, params, many, context):
+    timing = _current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing(execute, sql, params, many, context)
+
+
+def install_query_timer(connection):
+    """Gắn `_timed_execute` vào execute_wrappers của kết nối (một lần cho mỗi kết nối)."""
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_execute)
+
+
+@receiver(connection_created)
+def _install_on_connect(sender, connection, **kwargs):
+    install_query_timer(connection)
+
+
+def route_of(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match is not None and match.route else UNMATCHED_ROUTE
+
+
+def check_budget(method, route, timing):
+    """
+    Các loại ngân sách (queries, ms) mà request đã vượt, theo METRICS_BUDGETS với key
+    `"<METHOD> <route>"` (HEAD dùng ngân sách của GET); method không khai báo thì không kiểm tra.
+    """
+    method = 'GET' if method == 'HEAD' else method
+    budget = getattr(settings, 'METRICS_BUDGETS', {}).get(f'{method} {route}')
+    if not budget:
+        return []
+    exceeded = []
+    if 'queries' in budget and timing.queries > budget['queries']:
+        exceeded.append('queries')
+    if 'ms' in budget and timing.total * 1000 > budget['ms']:
+        exceeded.append('ms')
+    return exceeded
+
+
+class MetricsMiddleware:
+    """
+    Đo số query, thời gian database, thời gian render và tổng thời gian của mỗi request.
+
+    Kết quả được cộng vào `registry` (xem metrics_view, /metrics) và, nếu
+    METRICS_SERVER_TIMING bật, trả về trong header Server-Timing. Request vượt ngân
+    sách trong METRICS_BUDGETS được ghi log cảnh báo, hoặc làm fail test khi
+    METRICS_BUDGET_ACTION = 'raise'. Đặt middleware này trước các middleware khác để
+    tính cả thời gian của chúng.
+
+    Hỗ trợ cả sync và async: dưới ASGI (daphne) chuỗi middleware chạy trên event loop,
+    không bị ép qua một thread sync cho mỗi request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        timing = self._start(request)
+        # Kết nối mở trước khi module này được nạp chưa có wrapper
+        for connection in connections.all():
+            install_query_timer(connection)
+        token = _current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self._finish(request, response, timing)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return await self.get_response(request)
+
+        timing = self._start(request)
+        token = _current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self._finish(request, response, timing)
+
+    @staticmethod
+    def _start(request):
+        timing = RequestTiming()
+        request._timing = timing
+        return timing
+
+    def _finish(self, request, response, timing):
+        timing.end_render()
+        timing.total = time.perf_counter() - timing.started_at
+
+        route = route_of(request)
+        exceeded = check_budget(request.method, route, timing)
+        registry.record(route, request.method, response.status_code, timing, exceeded)
+        if getattr(settings, 'METRICS_SERVER_TIMING', True):
+            response['Server-Timing'] = timing.server_timing()
+
+        if exceeded:
+            message = (
+                f'{request.method} {route} vượt ngân sách {exceeded}: '
+                f'{timing.queries} query, {timing.total * 1000:.1f} ms'
+            )
+            if getattr(settings, 'METRICS_BUDGET_ACTION', 'log') == 'raise':
+                raise BudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_template_response(self, request, response):
+        # Response của DRF được render sau khi view trả về: đo khoảng này làm thời gian serialize
+        timing = getattr(request, '_timing', None)
+        if timing is not None:
+            timing.start_render()
+            response.add_post_render_callback(lambda _: timing.end_render())
+        return response
+
+
+def metrics_view(request):
+    """
+    Số liệu theo định dạng Prometheus, chỉ cho request có header `Authorization: Bearer
+    <METRICS_TOKEN>` hoặc tài khoản staff đã đăng nhập (session của admin). Không đặt
+    METRICS_TOKEN thì chỉ staff xem được. Mỗi process giữ số liệu riêng.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    authorized = bool(token) and hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}')
+    if not authorized and not getattr(request.user, 'is_staff', False):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
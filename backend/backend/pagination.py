@@ -0,0 +1,19 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Phân trang theo cursor (keyset) trên khóa chính.
+
+    Mỗi trang chỉ cần một query dạng `WHERE id < cursor ORDER BY id DESC LIMIT n`
+    dựa trên index của khóa chính, nên thời gian phản hồi không tăng theo số dòng
+    trong bảng. Cursor trả về cho client là chuỗi mã hóa, client chỉ cần gọi lại
+    các link `next`/`previous`.
+
+    Client có thể chọn kích thước trang qua `?page_size=`, tối đa là
+    `PAGINATION_MAX_PAGE_SIZE`.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 200)
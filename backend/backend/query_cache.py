@@ -0,0 +1,115 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+VERSION_PREFIX = 'qc:v:'
+RESPONSE_PREFIX = 'qc:r:'
+LOCK_PREFIX = 'qc:l:'
+
+
+def get_cache():
+    return caches[getattr(settings, 'QUERY_CACHE_ALIAS', 'default')]
+
+
+def _new_version():
+    # Dùng thời gian làm version mới để key cũ không bị dùng lại khi cache mất version (eviction, restart)
+    return int(time.time() * 1000)
+
+
+def get_versions(tags):
+    """Version hiện tại của từng tag phụ thuộc (song, album, artist, genre)."""
+    cache = get_cache()
+    keys = [VERSION_PREFIX + tag for tag in tags]
+    found = cache.get_many(keys)
+    versions = []
+    for tag, key in zip(tags, keys):
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _new_version(), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def ttl_epoch():
+    """Số thứ tự của khoảng QUERY_CACHE_TTL giây hiện tại (response cache có thể đổi sau mỗi khoảng)."""
+    return int(time.time() // max(getattr(settings, 'QUERY_CACHE_TTL', 60), 1))
+
+
+def bump(*tags):
+    """Đổi version của các tag: mọi response phụ thuộc vào chúng trở thành cache miss."""
+    cache = get_cache()
+    for tag in tags:
+        key = VERSION_PREFIX + tag
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+
+
+def response_key(request, endpoint, tags):
+    """Key theo endpoint, host, tham số query (đã sắp xếp) và version của các tag phụ thuộc."""
+    params = sorted(request.query_params.lists())
+    raw = repr((endpoint, request.get_host(), request.is_secure(), params, get_versions(tags)))
+    return RESPONSE_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Trả về giá trị đã cache, hoặc tính bằng compute() và lưu lại.
+
+    Chống cache stampede: khi miss, chỉ request giữ được khóa (cache.add, có hạn) tính
+    giá trị; các request khác chờ tối đa QUERY_CACHE_LOCK_WAIT giây để đọc kết quả
+    đó rồi mới tự tính. Trả về (giá trị, có phải cache hit).
+    """
+    cache = get_cache()
+    timeout = timeout if timeout is not None else getattr(settings, 'QUERY_CACHE_TTL', 60)
+    value = cache.get(key)
+    if value is not None:
+        return value, True
+
+    lock_key = LOCK_PREFIX + key
+    lock_timeout = getattr(settings, 'QUERY_CACHE_LOCK_TIMEOUT', 10)
+    if not cache.add(lock_key, 1, timeout=lock_timeout):
+        deadline = time.monotonic() + getattr(settings, 'QUERY_CACHE_LOCK_WAIT', 2)
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            value = cache.get(key)
+            if value is not None:
+                return value, True
+        return compute(), False
+
+    try:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+    finally:
+        cache.delete(lock_key)
+    return value, False
+
+
+class CachedListMixin:
+    """
+    Cache response của list view (GET) theo endpoint và tham số query, có version.
+
+    `cache_dependencies` là các tag mà dữ liệu của view phụ thuộc; signal post_save,
+    post_delete và m2m_changed của model tương ứng gọi `bump(tag)` (xem signals.py
+    của songs, albums, artists), nên không cần xóa từng key. Kiểm tra quyền vẫn chạy
+    trước khi đọc cache. Thời gian sống QUERY_CACHE_TTL phải ngắn hơn MEDIA_URL_CACHE_MARGIN
+    vì response chứa URL media đã ký.
+    """
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, 'QUERY_CACHE_ENABLED', True):
+            return super().list(request, *args, **kwargs)
+
+        key = response_key(request, type(self).__name__, self.cache_dependencies)
+
+        def compute():
+            return super(CachedListMixin, self).list(request, *args, **kwargs).data
+
+        data, hit = get_or_compute(key, compute)
+        return Response(data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
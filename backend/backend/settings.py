@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
+import shutil
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -55,11 +57,16 @@ INSTALLED_APPS = [
     'songs',
     'orders',
     'a2a_server',
+    'search',
+    'images',
+    'tasks',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'backend.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', 
+    'backend.static_files.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -157,8 +164,25 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.IdCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
+# Kích thước trang tối đa client được phép yêu cầu qua ?page_size=
+PAGINATION_MAX_PAGE_SIZE = 200
+# Số id bài hát đầu tiên trả về kèm mỗi playlist (preview_song_ids)
+PLAYLIST_PREVIEW_SIZE = 4
+# Khoảng cách giữa vị trí của hai bài liền nhau khi thêm vào cuối hoặc đánh số lại playlist
+PLAYLIST_POSITION_GAP = 1024
+# Số bài hát tối đa trong một lần thêm/xóa theo lô
+PLAYLIST_EDIT_MAX_SONGS = 500
+# Số dòng ghi trong mỗi transaction khi nhập bài hát theo lô (songs.importer)
+SONG_IMPORT_CHUNK_SIZE = 1000
+# Số lỗi theo dòng tối đa trả về trong kết quả import (tổng số dòng lỗi vẫn được đếm)
+SONG_IMPORT_MAX_ERRORS = 1000
+# Số dòng tối đa của một file nhập qua API (import chạy trong request); file lớn hơn dùng lệnh import_songs
+SONG_IMPORT_MAX_ROWS = 5000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),  # Thời gian sống của token
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),  # Thời gian sống của refresh token
@@ -175,8 +199,26 @@ AWS_S3_CUSTOM_DOMAIN = os.getenv('AWS_S3_CUSTOM_DOMAIN')
 AWS_S3_FILE_OVERWRITE = False
 AWS_DEFAULT_ACL = None
 AWS_S3_SIGNATURE_VERSION = 's3v4'
+# URL đã ký của file media được cache (backend.media) tới MEDIA_URL_CACHE_MARGIN giây trước khi hết hạn
+MEDIA_URL_CACHE_SIZE = 10000
+MEDIA_URL_CACHE_MARGIN = 300
 
 # Channels Settings
+# Cache dùng chung (backend.query_cache): Redis khi có REDIS_HOST, ngược lại locmem (chạy local, test)
+if os.getenv('REDIS_HOST'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': f"redis://:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}/1",
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
@@ -186,6 +228,124 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Cache thông tin người gửi tin nhắn chat trong cache dùng chung (thời gian sống tính bằng giây)
+CHAT_USER_CACHE_TTL = 300
+
+# Snapshot danh mục cho A2A agent được xây lại toàn bộ sau số giây này, trong thread nền;
+# request dùng snapshot cũ cho tới khi snapshot mới xong
+A2A_CATALOG_MAX_AGE = 600
+A2A_CATALOG_BACKGROUND_BUILD = True
+# Số bài hát ứng viên đưa vào prompt và khoảng thời gian tối thiểu giữa hai lần xây lại index retrieval;
+# index được xây trong thread nền, request dùng index cũ cho tới khi index mới xong
+A2A_RETRIEVAL_TOP_K = 30
+A2A_RETRIEVER_REBUILD_INTERVAL = 60
+A2A_RETRIEVER_BACKGROUND_BUILD = True
+# Cache kết quả dự đoán của A2A agent (số câu truy vấn tối đa, thời gian sống tính bằng giây)
+A2A_RESPONSE_CACHE_SIZE = 512
+A2A_RESPONSE_CACHE_TTL = 600
+# Giới hạn của endpoint JSON-RPC: số lời gọi Gemini đồng thời, thời hạn mỗi lời gọi (giây), số request tối đa trong một batch
+A2A_MAX_CONCURRENT_CALLS = 8
+A2A_CALL_TIMEOUT = 20
+A2A_MAX_BATCH_SIZE = 20
+
+# Lượt nghe được gom trong bộ nhớ, ghi xuống database sau mỗi PLAY_FLUSH_INTERVAL giây
+# hoặc khi đủ PLAY_BUFFER_MAX lượt
+PLAY_FLUSH_INTERVAL = 5
+PLAY_BUFFER_MAX = 1000
+# Bảng xếp hạng (songs.charts): số bài mỗi bảng, khoảng thời gian giữa hai lần worker tính lại (giây,
+# task định kỳ songs.refresh_charts)
+CHART_SIZE = 100
+CHART_REFRESH_INTERVAL = 60
+# Kích thước mỗi chunk (byte) khi stream file audio qua songs/<id>/stream/
+STREAM_CHUNK_SIZE = 64 * 1024
+# Cache response của các list view danh mục (backend.query_cache): thời gian sống (giây, phải ngắn hơn
+# MEDIA_URL_CACHE_MARGIN), thời hạn khóa chống stampede và thời gian tối đa chờ request đang tính
+QUERY_CACHE_ENABLED = True
+QUERY_CACHE_TTL = 60
+QUERY_CACHE_LOCK_TIMEOUT = 10
+QUERY_CACHE_LOCK_WAIT = 2
+# Task queue (tasks): worker chạy bằng `manage.py run_tasks`. Thời gian chờ giữa hai lần hỏi hàng đợi,
+# số lần thử tối đa, backoff (giây, tăng gấp đôi mỗi lần lỗi, tối đa TASK_RETRY_MAX_DELAY),
+# thời gian tối đa một task ở trạng thái running trước khi bị coi là kẹt, chu kỳ worker tìm task kẹt
+# và đưa các task định kỳ vào hàng đợi, thư mục trên đĩa chứa file upload chờ worker đẩy lên
+# default_storage (khi web và worker chạy ở các container khác nhau phải là volume dùng chung)
+TASK_POLL_INTERVAL = 1
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_BASE_DELAY = 5
+TASK_RETRY_MAX_DELAY = 600
+TASK_LOCK_TIMEOUT = 900
+TASK_MAINTENANCE_INTERVAL = 60
+TASK_STAGING_ROOT = os.getenv('TASK_STAGING_ROOT', os.path.join(tempfile.gettempdir(), 'spotify-task-staging'))
+# Ảnh dẫn xuất (images): preset -> cạnh ảnh vuông (px); tạo sẵn khi upload thumbnail/avatar
+IMAGE_PRESETS = {'small': 96, 'medium': 300, 'large': 640}
+IMAGE_DERIVATIVES_ON_UPLOAD = True
+# Chuyển mã audio sang HLS (songs.transcoding) bằng ffmpeg, chạy trong task queue (task songs.transcode):
+# các bitrate (kbps) và thời hạn mỗi lệnh ffmpeg/ffprobe (giây). Job chạy quá TRANSCODE_JOB_TIMEOUT giây
+# bị coi là bỏ dở và được chuyển mã lại (tối đa TRANSCODE_MAX_ATTEMPTS lần), kiểm tra mỗi
+# TRANSCODE_RECLAIM_INTERVAL giây. Chỉ bật khi máy chủ có ffmpeg và ffprobe, nếu không mọi job sẽ lỗi
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE_BINARY = os.getenv('FFPROBE_BINARY', 'ffprobe')
+TRANSCODE_ENABLED = bool(shutil.which(FFMPEG_BINARY) and shutil.which(FFPROBE_BINARY))
+TRANSCODE_TIMEOUT = 600
+TRANSCODE_JOB_TIMEOUT = 3600
+TRANSCODE_MAX_ATTEMPTS = 2
+TRANSCODE_RECLAIM_INTERVAL = 300
+HLS_BITRATES = [64, 128, 256]
+
+# Logging: log của A2A agent ghi dạng JSON qua queue (không chặn request) ra stdout, và thêm
+# file xoay vòng nếu đặt A2A_LOG_FILE. Mỗi request JSON-RPC ghi một record kèm thời gian theo span
+# (db, prompt_build, model_call); chỉ TRACE_SAMPLE_RATE request được ghi, request lỗi (status >= 400)
+# hoặc chậm hơn TRACE_SLOW_MS luôn được ghi.
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.1'))
+TRACE_SLOW_MS = 2000
+
+# Số liệu theo route (backend.metrics): số query, thời gian database/render/tổng, xuất ở /metrics
+# (cần header `Authorization: Bearer <METRICS_TOKEN>` hoặc đăng nhập staff) và header Server-Timing.
+# Ngân sách theo "<METHOD> <route>": request vượt số query hoặc số ms được ghi log, hoặc raise khi
+# METRICS_BUDGET_ACTION = 'raise' (dùng trong test để bắt lỗi N+1 của serializer).
+METRICS_ENABLED = True
+METRICS_SERVER_TIMING = True
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+METRICS_BUDGET_ACTION = os.getenv('METRICS_BUDGET_ACTION', 'log')
+METRICS_BUDGETS = {
+    'GET songs/': {'queries': 5, 'ms': 1000},
+    'GET songs/<int:pk>/': {'queries': 6, 'ms': 500},
+    'GET artists/': {'queries': 7, 'ms': 1000},
+    'GET artists/<int:pk>/': {'queries': 8, 'ms': 500},
+    'GET albums/': {'queries': 5, 'ms': 1000},
+    'GET playlists/': {'queries': 7, 'ms': 1000},
+    'GET playlists/<int:pk>/': {'queries': 7, 'ms': 500},
+    'GET playlists/<int:pk>/tracks/': {'queries': 5, 'ms': 500},
+    'GET search/': {'queries': 6, 'ms': 1000},
+    'GET chatbox/<int:chatbox_id>/messages/': {'queries': 5, 'ms': 1000},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'backend.log.JsonFormatter'},
+    },
+    'filters': {
+        'redact': {'()': 'backend.log.RedactingFilter'},
+    },
+    'handlers': {
+        'a2a_queue': {
+            'class': 'backend.log.QueueFileHandler',
+            'filename': os.getenv('A2A_LOG_FILE'),
+            'formatter': 'json',
+            'filters': ['redact'],
+        },
+    },
+    'loggers': {
+        'a2a_server': {
+            'handlers': ['a2a_queue'],
+            'level': os.getenv('A2A_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # Static files settings
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static"] 
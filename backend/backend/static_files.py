@@ -0,0 +1,33 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware hỗ trợ cả async. Bản gốc chỉ chạy sync nên dưới ASGI Django phải
+    bọc cả phần chuỗi phía sau nó qua async_to_sync, view async (a2a jsonrpc) khi đó chạy
+    trong một event loop phụ và không nhận được tín hiệu client ngắt kết nối.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        # Tra cứu file tĩnh chỉ đọc bảng trong bộ nhớ (hoặc stat khi autorefresh), không chặn đáng kể
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,37 @@
+"""
+Settings để chạy test suite không cần MySQL, Redis, S3 hay GOOGLE_API_KEY: SQLite, cache locmem,
+channel layer trong bộ nhớ và storage trên đĩa.
+
+    DJANGO_SETTINGS_MODULE=backend.test_settings python manage.py test
+"""
+import os
+import tempfile
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test')
+
+from backend.settings import *  # noqa: E402,F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('TEST_DB', ':memory:'),
+    }
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    }
+}
+DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'spotify-test-media')
+
+TRANSCODE_ENABLED = False
+# Thread nền không thấy dữ liệu trong transaction của test; test của retrieval/catalog tự bật chế độ nền
+A2A_RETRIEVER_BACKGROUND_BUILD = False
+A2A_CATALOG_BACKGROUND_BUILD = False
@@ -0,0 +1,329 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from albums.models import Album
+from artists.models import Artist
+from playlists.models import Playlist
+from songs.models import Song, Genres
+from . import query_cache
+from .explain import QueryPlanAssertions, full_scans
+from .log import JsonFormatter, QueueFileHandler, RedactingFilter
+from .media import SignedUrlCache, signed_urls
+from .metrics import BudgetExceeded, registry
+
+
+class CatalogQueryCacheTest(TestCase):
+    def setUp(self):
+        query_cache.get_cache().clear()
+        self.addCleanup(query_cache.get_cache().clear)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        self.genre = Genres.objects.create(genre_name='Pop')
+        self.artist = Artist.objects.create(artist_name='Artist')
+        self.song = Song.objects.create(artist=self.artist, song_name='Song')
+
+    def test_repeated_reads_are_cache_hits(self):
+        first = self.client.get('/songs/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/songs/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+        self.assertEqual(self.client.get('/songs/', {'search': 'Song'})['X-Cache'], 'MISS')
+        for url in ('/songs/genres/', '/artists/', '/albums/'):
+            self.client.get(url)
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+    def test_writes_invalidate_dependent_lists(self):
+        self.client.get('/songs/')
+        self.client.get('/artists/')
+        self.client.get('/songs/genres/')
+
+        self.song.genres.add(self.genre)
+        self.assertEqual(self.client.get('/songs/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/songs/genres/')['X-Cache'], 'HIT')
+
+        self.artist.artist_name = 'Renamed'
+        self.artist.save()
+        response = self.client.get('/songs/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['artist']['artist_name'], 'Renamed')
+
+        Song.objects.create(artist=self.artist, song_name='Another')
+        self.assertEqual(len(self.client.get('/artists/').data['results'][0]['songs']), 2)
+
+    def test_concurrent_miss_waits_for_first_computation(self):
+        cache = query_cache.get_cache()
+        cache.add(query_cache.LOCK_PREFIX + 'key', 1)
+        threading.Timer(0.05, lambda: cache.set('key', 'computed elsewhere')).start()
+        compute = mock.Mock(return_value='computed here')
+
+        value, hit = query_cache.get_or_compute('key', compute)
+
+        self.assertEqual((value, hit), ('computed elsewhere', True))
+        compute.assert_not_called()
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        query_cache.get_cache().clear()
+        self.addCleanup(query_cache.get_cache().clear)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        self.genre = Genres.objects.create(genre_name='Pop')
+        self.artist = Artist.objects.create(artist_name='Artist')
+        self.song = Song.objects.create(artist=self.artist, song_name='Song')
+        self.url = f'/songs/{self.song.id}/'
+
+    def assertNotModified(self, url, etag, num_queries):
+        with self.assertNumQueries(num_queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_song_detail_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertNotModified(self.url, etag, 1)
+
+        changes = [
+            lambda: self.song.genres.add(self.genre),
+            lambda: Song.objects.filter(pk=self.song.pk).update(plays=5),
+            lambda: Artist.objects.get(pk=self.artist.pk).save(),
+            lambda: Song.objects.get(pk=self.song.pk).save(),
+        ]
+        for change in changes:
+            change()
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+
+    def test_collection_etag_costs_no_queries(self):
+        etag = self.client.get('/songs/')['ETag']
+        self.assertNotModified('/songs/', etag, 0)
+        self.assertEqual(self.client.get('/songs/', {'search': 'x'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        Song.objects.create(artist=self.artist, song_name='New')
+        self.assertEqual(self.client.get('/songs/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_artist_and_album_etags(self):
+        artist_url = f'/artists/{self.artist.id}/'
+        etag = self.client.get(artist_url)['ETag']
+        self.assertNotModified(artist_url, etag, 1)
+        Song.objects.create(artist=self.artist, song_name='New')
+        self.assertEqual(self.client.get(artist_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        album = Album.objects.create(album_name='Album', artist=self.artist)
+        album_url = f'/albums/{album.id}/'
+        etag = self.client.get(album_url)['ETag']
+        self.assertNotModified(album_url, etag, 0)
+        album.song.add(self.song)
+        self.assertEqual(self.client.get(album_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class FakeSigningStorage:
+    """Giả lập S3 với querystring_auth: mỗi lần gọi url() là một lần ký."""
+    querystring_auth = True
+    querystring_expire = 600
+    bucket_name = 'fake-bucket'
+
+    def __init__(self):
+        self.signed = []
+
+    def url(self, name):
+        self.signed.append(name)
+        return f'https://fake-bucket.s3.amazonaws.com/{name}?X-Amz-Signature={len(self.signed)}'
+
+
+class SignedUrlCacheTest(TestCase):
+    def setUp(self):
+        self.storage = FakeSigningStorage()
+        self.patches = [
+            mock.patch.object(Song._meta.get_field(name), 'storage', self.storage)
+            for name in ('audio', 'thumbnail')
+        ]
+        for patch in self.patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        signed_urls.clear()
+        self.addCleanup(signed_urls.clear)
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        artist = Artist.objects.create(artist_name='Artist')
+        for i in range(10):
+            Song.objects.create(artist=artist, song_name=f'Song {i}', audio=f'audio/{i}.mp3', thumbnail='thumbnails/shared.jpg')
+
+    def test_list_signs_each_file_once(self):
+        response = self.client.get('/songs/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.storage.signed), 11)
+        self.assertTrue(response.data['results'][0]['audio'].startswith('https://fake-bucket.s3.amazonaws.com/audio/'))
+
+        self.client.get('/songs/')
+        self.assertEqual(len(self.storage.signed), 11)
+
+    def test_replaced_file_gets_new_url(self):
+        song = Song.objects.get(song_name='Song 0')
+        old_url = self.client.get(f'/songs/{song.id}/').data['audio']
+        song.audio = 'audio/0_replaced.mp3'
+        song.save()
+        new_url = self.client.get(f'/songs/{song.id}/').data['audio']
+        self.assertNotEqual(old_url, new_url)
+        self.assertIn('audio/0_replaced.mp3', new_url)
+
+    def test_urls_are_resigned_before_expiry(self):
+        now = [0]
+        cache = SignedUrlCache(maxsize=100, margin=60, timer=lambda: now[0])
+        song = Song.objects.get(song_name='Song 0')
+
+        first = cache.url(song.audio)
+        now[0] = 500
+        self.assertEqual(cache.url(song.audio), first)
+        now[0] = 541
+        self.assertNotEqual(cache.url(song.audio), first)
+        self.assertEqual(self.storage.signed, ['audio/0.mp3', 'audio/0.mp3'])
+
+
+class QueryPlanTest(QueryPlanAssertions, TestCase):
+    """Các query danh mục hay dùng phải đi qua index (EXPLAIN), kể cả khi bảng rỗng."""
+
+    def test_live_lists_use_composite_index(self):
+        # MySQL so sánh trực tiếp is_deleted = false nên dùng index (is_deleted, id). SQLite mặc
+        # định viết "NOT is_deleted" (không dùng được index ghép): tắt cách viết đó như backend MySQL
+        # để EXPLAIN chạy trên đúng dạng câu query mà MySQL nhận
+        with mock.patch.object(connection.ops, 'conditional_expression_supported_in_where_clause', return_value=False):
+            self.assertUsesIndex(Song.objects.filter(is_deleted=False).order_by('-id')[:51])
+            self.assertUsesIndex(Artist.objects.filter(is_deleted=False).order_by('-id'))
+            self.assertUsesIndex(Playlist.objects.filter(is_deleted=False).order_by('-id'))
+
+    def test_filtered_live_lists_use_index(self):
+        self.assertUsesIndex(Song.objects.filter(is_deleted=False, genres__id=1).order_by('-id')[:51])
+        self.assertUsesIndex(Song.objects.filter(is_deleted=False, artist_id=1))
+        self.assertUsesIndex(Artist.objects.filter(follow__user_id=1, is_deleted=False).distinct())
+        self.assertUsesIndex(Playlist.objects.filter(user_id=1, is_deleted=False))
+
+    def test_full_scan_is_reported(self):
+        self.assertEqual(full_scans(Song.objects.filter(song_name='x')), ['songs_song'])
+        self.assertEqual(full_scans(Song.objects.filter(pk=1)), [])
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.user = User.objects.create_user('listener', password='secret123')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        genres = [Genres.objects.create(genre_name=f'Genre {i}') for i in range(3)]
+        self.artists = [Artist.objects.create(artist_name=f'Artist {i}') for i in range(5)]
+        songs = []
+        for i in range(30):
+            song = Song.objects.create(artist=self.artists[i % 5], song_name=f'Song {i}')
+            song.genres.set(genres[: i % 3 + 1])
+            songs.append(song)
+        album = Album.objects.create(album_name='Album', artist=self.artists[0])
+        album.song.set(songs[:10])
+        self.playlist = Playlist.objects.create(user=self.user, playlist_name='Mix', description='')
+        self.playlist.song.set(songs[:20])
+        self.song = songs[0]
+
+    def test_server_timing_and_metrics_endpoint(self):
+        response = self.client.get('/songs/', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", render;dur=[\d.]+, total;dur=[\d.]+$')
+
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(User.objects.create_user('ops', password='secret123', is_staff=True))
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('http_requests_total{route="songs/",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_queries_bucket{route="songs/",method="GET",le="+Inf"} 1', body)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+
+    async def test_async_middleware_chain_counts_queries(self):
+        # Dưới ASGI chuỗi middleware phải chạy async; query của view sync (trong thread
+        # sync_to_async) vẫn được tính cho request
+        response = await self.async_client.get('/songs/', AUTHORIZATION=self.auth['HTTP_AUTHORIZATION'])
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_BUDGETS={'GET songs/<int:pk>/': {'queries': 1}})
+    def test_budget_is_logged_or_raised(self):
+        url = f'/songs/{self.song.id}/'
+        with self.assertLogs('backend.metrics', 'WARNING') as logs:
+            self.assertEqual(self.client.get(url, **self.auth).status_code, 200)
+        self.assertIn('songs/<int:pk>/', logs.output[0])
+        self.assertIn('http_request_budget_exceeded_total{route="songs/<int:pk>/",budget="queries"} 1', registry.render())
+
+        with override_settings(METRICS_BUDGET_ACTION='raise'):
+            with self.assertRaises(BudgetExceeded):
+                self.client.get(url, **self.auth)
+
+    def test_read_budgets_do_not_apply_to_writes(self):
+        budgets = {route: {'queries': budget['queries']} for route, budget in settings.METRICS_BUDGETS.items()}
+        url = f'/playlists/{self.playlist.id}/'
+        with override_settings(METRICS_BUDGETS=budgets, METRICS_BUDGET_ACTION='raise'):
+            response = self.client.patch(url, {'song_id': [self.song.id]}, content_type='application/json', **self.auth)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.client.head(url, **self.auth).status_code, 200)
+
+    def test_catalog_endpoints_stay_within_query_budgets(self):
+        # Chỉ kiểm tra số query (thời gian phụ thuộc máy chạy test); tắt cache để đo đường chạy thật
+        budgets = {route: {'queries': budget['queries']} for route, budget in settings.METRICS_BUDGETS.items()}
+        urls = [
+            '/songs/', f'/songs/{self.song.id}/', '/artists/', f'/artists/{self.artists[0].id}/',
+            '/albums/', '/playlists/', f'/playlists/{self.playlist.id}/', '/search/?q=song',
+        ]
+        with override_settings(METRICS_BUDGETS=budgets, METRICS_BUDGET_ACTION='raise', QUERY_CACHE_ENABLED=False):
+            for url in urls:
+                with self.subTest(url=url):
+                    self.assertEqual(self.client.get(url, **self.auth).status_code, 200)
+
+
+class StructuredLogTest(TestCase):
+    def make_record(self, fields):
+        record = logging.LogRecord('a2a_server', logging.INFO, __file__, 1, 'event', None, None)
+        record.fields = fields
+        return record
+
+    def test_sensitive_fields_are_redacted_and_long_values_truncated(self):
+        record = self.make_record({'headers': {'Authorization': 'Bearer x', 'Accept': '*/*'}, 'body': 'x' * 1000})
+
+        RedactingFilter(max_length=10).filter(record)
+
+        self.assertEqual(record.fields['headers'], {'Authorization': '[REDACTED]', 'Accept': '*/*'})
+        self.assertEqual(record.fields['body'], 'x' * 10 + '...')
+
+    def test_json_formatter_merges_fields(self):
+        line = JsonFormatter().format(self.make_record({'duration_ms': 1.5}))
+
+        data = json.loads(line)
+        self.assertEqual(data['message'], 'event')
+        self.assertEqual(data['duration_ms'], 1.5)
+
+    def test_bare_log_filename_is_written_to_the_working_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                QueueFileHandler('a2a.log', console=False)
+            finally:
+                os.chdir(cwd)
+
+            self.assertTrue(os.path.exists(os.path.join(directory, 'a2a.log')))
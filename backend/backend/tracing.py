@@ -0,0 +1,74 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_current_trace = ContextVar('current_trace', default=None)
+
+
+class Trace:
+    """Thời gian của một request, chia theo các span (db, prompt_build, model_call...)."""
+
+    def __init__(self, name, sampled, **fields):
+        self.name = name
+        self.sampled = sampled
+        self.fields = fields
+        self.spans = {}
+        self.error = None
+        self.started_at = time.perf_counter()
+
+    def add_span(self, name, duration_ms):
+        self.spans[name] = self.spans.get(name, 0) + duration_ms
+
+    def duration_ms(self):
+        return (time.perf_counter() - self.started_at) * 1000
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name):
+    """Đo thời gian một đoạn code và cộng vào trace hiện tại (nếu có)."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(name, (time.perf_counter() - started_at) * 1000)
+
+
+@contextmanager
+def start_trace(name, logger, **fields):
+    """
+    Bắt đầu trace cho một request và ghi một record có cấu trúc khi kết thúc.
+
+    Chỉ một phần request (TRACE_SAMPLE_RATE) được ghi log; request lỗi (exception hoặc
+    `trace.fields['status']` >= 400) hoặc chậm hơn TRACE_SLOW_MS luôn được ghi.
+    """
+    rate = getattr(settings, 'TRACE_SAMPLE_RATE', 0.1)
+    trace = Trace(name, sampled=random.random() < rate, **fields)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.error = repr(e)
+        raise
+    finally:
+        _current_trace.reset(token)
+        duration_ms = trace.duration_ms()
+        slow = duration_ms >= getattr(settings, 'TRACE_SLOW_MS', 2000)
+        failed = trace.error is not None or trace.fields.get('status', 0) >= 400
+        if trace.sampled or slow or failed:
+            level = logging.WARNING if failed or slow else logging.INFO
+            logger.log(level, name, extra={'fields': {
+                **trace.fields,
+                'duration_ms': round(duration_ms, 2),
+                'spans': {key: round(value, 2) for key, value in trace.spans.items()},
+                'error': trace.error,
+            }})
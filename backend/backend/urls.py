@@ -19,6 +19,8 @@ from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .metrics import metrics_view
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -30,4 +32,7 @@ urlpatterns = [
     path('orders/', include('orders.urls')),
     path('chatbox/', include('chatbox.urls')),
     path('a2a/', include('a2a_server.urls')),
+    path('search/', include('search.urls')),
+    path('images/', include('images.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,69 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.runner import SCENARIOS, BenchmarkRunner, compare, report
+from benchmarks.seed import CatalogSeeder, ensure_schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed danh mục giả lập rồi đo thông lượng, độ trễ p50/p99 và số query của các đường chạy chính. '
+        'Chạy với DJANGO_SETTINGS_MODULE=benchmarks.settings (SQLite, locmem, channel layer trong bộ nhớ).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--songs', type=int, default=10000)
+        parser.add_argument('--artists', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--playlists', type=int, default=1000)
+        parser.add_argument('--chatboxes', type=int, default=100)
+        parser.add_argument('--messages', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0, help='Seed cho dữ liệu và thứ tự request')
+        parser.add_argument('--iterations', type=int, default=200, help='Số lần đo mỗi kịch bản')
+        parser.add_argument('--warmup', type=int, default=10, help='Số lần chạy trước khi đo')
+        parser.add_argument('--listeners', type=int, default=50, help='Số kết nối WebSocket nhận tin trong ws_fanout')
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='Chỉ chạy kịch bản này (lặp lại được)')
+        parser.add_argument('--output', help='Ghi kết quả JSON ra file thay vì stdout')
+        parser.add_argument('--compare', help='File JSON của lần chạy trước để so sánh')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Tỉ lệ chậm hơn cho phép khi so sánh')
+
+    def handle(self, *args, **options):
+        # Benchmark ghi hàng triệu dòng giả: không bao giờ chạy trên database thật
+        if connection.vendor != 'sqlite':
+            raise CommandError('Benchmark chỉ chạy trên SQLite (DJANGO_SETTINGS_MODULE=benchmarks.settings)')
+
+        ensure_schema()
+        seeder = CatalogSeeder(seed=options['seed'])
+        dataset = seeder.run(
+            users=options['users'], artists=options['artists'], genres=options['genres'], songs=options['songs'],
+            playlists=options['playlists'], chatboxes=options['chatboxes'], messages=options['messages'],
+        )
+        self.stderr.write(f'Seeded {dataset}')
+
+        runner = BenchmarkRunner(
+            seeder, iterations=options['iterations'], warmup=options['warmup'],
+            listeners=options['listeners'], seed=options['seed'],
+        )
+        results = {}
+        for name in options['scenario'] or SCENARIOS:
+            results.update(runner.run([name]))
+            latency = results[name]['latency_ms']
+            self.stderr.write(f"{name}: p50 {latency['p50']} ms, p99 {latency['p99']} ms, "
+                              f"{results[name]['queries']['max']} queries")
+
+        document = json.dumps(report(results, dataset, options['seed']), indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(document + '\n')
+        else:
+            self.stdout.write(document)
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                regressions = compare(json.load(f), json.loads(document), options['tolerance'])
+            if regressions:
+                raise CommandError('Regression so với ' + options['compare'] + ':\n' + '\n'.join(regressions))
+            self.stderr.write(self.style.SUCCESS('Không có regression so với ' + options['compare']))
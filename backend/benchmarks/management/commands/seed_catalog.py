@@ -0,0 +1,80 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.seed import DEFAULT_CHUNK_SIZE, DEFAULT_SKEW, CatalogSeeder, ensure_schema
+
+# Kích thước mặc định (nhân với --scale)
+SIZES = {
+    'users': 10000,
+    'artists': 2000,
+    'genres': 40,
+    'songs': 50000,
+    'albums': 5000,
+    'playlists': 20000,
+    'chatboxes': 5000,
+    'messages': 200000,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Sinh dữ liệu giả lập quy mô lớn (người dùng, nghệ sĩ, thể loại, bài hát, album, playlist, '
+        'theo dõi, bạn bè, đơn hàng, tin nhắn) bằng bulk_create theo chunk, phân phối lệch, cố định theo seed'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in SIZES.items():
+            parser.add_argument(f'--{name}', type=int, help=f'Số {name} (mặc định {default} x --scale)')
+        parser.add_argument('--scale', type=float, default=1.0, help='Hệ số nhân cho mọi kích thước mặc định')
+        parser.add_argument('--songs-per-playlist', type=float, default=20, help='Số bài hát trung bình mỗi playlist')
+        parser.add_argument('--follows-per-user', type=float, default=5, help='Số nghệ sĩ theo dõi trung bình')
+        parser.add_argument('--friends-per-user', type=float, default=4, help='Số bạn bè trung bình')
+        parser.add_argument('--orders-per-user', type=float, default=2, help='Số bài hát đã mua trung bình')
+        parser.add_argument('--skew', type=float, default=DEFAULT_SKEW, help='Số mũ Zipf của độ phổ biến')
+        parser.add_argument('--deleted-ratio', type=float, default=0.02, help='Tỉ lệ dòng bị xóa mềm (is_deleted)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--rebuild-search', action='store_true', help='Xây lại chỉ mục tìm kiếm sau khi seed')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Cho phép chạy trên database khác SQLite (chỉ dùng với database local)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite' and not options['force']:
+            raise CommandError(f'Database đang dùng là {connection.vendor}; thêm --force nếu đây là database local')
+
+        ensure_schema()
+
+        sizes = {
+            name: options[name] if options[name] is not None else int(default * options['scale'])
+            for name, default in SIZES.items()
+        }
+        seeder = CatalogSeeder(
+            seed=options['seed'], chunk_size=options['chunk_size'],
+            skew=options['skew'], deleted_ratio=options['deleted_ratio'],
+        )
+        started_at = time.monotonic()
+        step_started_at = [started_at]
+
+        def progress(name, count):
+            now = time.monotonic()
+            self.stdout.write(f'{name}: {count} ({now - step_started_at[0]:.1f}s)')
+            step_started_at[0] = now
+
+        counts = seeder.run(
+            **sizes,
+            songs_per_playlist=options['songs_per_playlist'],
+            follows_per_user=options['follows_per_user'],
+            friends_per_user=options['friends_per_user'],
+            orders_per_user=options['orders_per_user'],
+            progress=progress,
+        )
+        if options['rebuild_search']:
+            call_command('rebuild_search_index', chunk_size=options['chunk_size'], stdout=self.stdout)
+
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(self.style.SUCCESS(f'Seeded {sum(counts.values())} rows in {elapsed:.1f}s'))
@@ -0,0 +1,215 @@
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.metrics import RequestTiming
+from chatbox.routing import websocket_urlpatterns
+
+SCENARIOS = ('song_list', 'artist_detail', 'playlist_detail', 'message_history', 'ws_fanout')
+
+
+def percentile(values, q):
+    """Percentile theo nearest-rank của danh sách giá trị (q từ 0 tới 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(latencies, queries, db_times, elapsed, errors):
+    """Kết quả của một kịch bản: thông lượng, độ trễ (ms) và số query mỗi thao tác."""
+    def ms(value):
+        return None if value is None else round(value * 1000, 3)
+
+    count = len(latencies)
+    return {
+        'iterations': count,
+        'errors': errors,
+        'throughput_per_sec': round(count / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': ms(sum(latencies) / count) if count else None,
+            'p50': ms(percentile(latencies, 50)),
+            'p90': ms(percentile(latencies, 90)),
+            'p99': ms(percentile(latencies, 99)),
+            'max': ms(max(latencies)) if count else None,
+        },
+        'queries': {
+            'mean': round(sum(queries) / count, 2) if count else None,
+            'max': max(queries) if count else None,
+        },
+        'db_ms': {
+            'mean': ms(sum(db_times) / count) if count else None,
+        },
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class BenchmarkRunner:
+    """
+    Chạy các kịch bản đo trên dữ liệu đã seed (xem seed.CatalogSeeder), tuần tự trong
+    một process: request HTTP đi qua toàn bộ middleware và xác thực JWT bằng test Client,
+    WebSocket chạy qua consumer thật với channel layer đang cấu hình.
+
+    Mỗi kịch bản chạy `warmup` lần không tính rồi `iterations` lần được đo. Số query và
+    thời gian database đếm bằng execute_wrapper (backend.metrics.RequestTiming).
+    """
+
+    def __init__(self, seeder, iterations=200, warmup=10, listeners=50, seed=0):
+        self.seeder = seeder
+        self.iterations = iterations
+        self.warmup = warmup
+        self.listeners = listeners
+        self.random = random.Random(seed)
+        self.client = Client(HTTP_HOST='localhost')
+
+    def auth_headers(self, user_id):
+        return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(User(id=user_id))}'}
+
+    def measure(self, operation):
+        latencies, queries, db_times, errors = [], [], [], 0
+        for _ in range(self.warmup):
+            operation()
+        started_at = time.perf_counter()
+        for _ in range(self.iterations):
+            timing = RequestTiming()
+            with connection.execute_wrapper(timing):
+                begin = time.perf_counter()
+                ok = operation()
+                latencies.append(time.perf_counter() - begin)
+            queries.append(timing.queries)
+            db_times.append(timing.db)
+            errors += 0 if ok else 1
+        return summarize(latencies, queries, db_times, time.perf_counter() - started_at, errors)
+
+    def http(self, url_for, user_id):
+        headers = self.auth_headers(user_id)
+
+        def operation():
+            return self.client.get(url_for(), **headers).status_code == 200
+        return self.measure(operation)
+
+    def song_list(self):
+        return self.http(lambda: '/songs/', self.seeder.ids['users'][0])
+
+    def artist_detail(self):
+        artists = self.seeder.ids['artists']
+        return self.http(lambda: f'/artists/{self.random.choice(artists)}/', self.seeder.ids['users'][0])
+
+    def playlist_detail(self):
+        playlists = self.seeder.ids['playlists']
+        return self.http(lambda: f'/playlists/{self.random.choice(playlists)}/', self.seeder.ids['users'][0])
+
+    def message_history(self):
+        chatbox_id = self.seeder.ids['chatboxes'][0]
+        member = self.seeder.members[chatbox_id][0]
+        return self.http(lambda: f'/chatbox/{chatbox_id}/messages/', member)
+
+    def ws_fanout(self):
+        """Một tin nhắn gửi qua WebSocket tới khi cả `listeners` kết nối khác trong nhóm nhận được."""
+        chatbox_id = self.seeder.ids['chatboxes'][0]
+        sender = User(id=self.seeder.members[chatbox_id][0])
+        application = URLRouter(websocket_urlpatterns)
+        # Kết nối database của thread hiện tại: query của consumer chạy ở đây (sync_to_async thread_sensitive)
+        database = connections[DEFAULT_DB_ALIAS]
+
+        async def connect(user):
+            communicator = WebsocketCommunicator(application, f'/ws/chat/{chatbox_id}/')
+            communicator.scope['user'] = user
+            connected, _ = await communicator.connect()
+            if not connected:
+                raise RuntimeError(f'Không kết nối được WebSocket tới chatbox {chatbox_id}')
+            return communicator
+
+        async def run():
+            source = await connect(sender)
+            listeners = [await connect(sender) for _ in range(self.listeners)]
+
+            async def operation():
+                await source.send_to(text_data=json.dumps({'message': 'benchmark'}))
+                await source.receive_from(timeout=10)
+                for listener in listeners:
+                    await listener.receive_from(timeout=10)
+                return True
+
+            try:
+                return await self._measure_async(operation, database)
+            finally:
+                for communicator in [source, *listeners]:
+                    await communicator.disconnect()
+
+        return async_to_sync(run)()
+
+    async def _measure_async(self, operation, database):
+        latencies, queries, db_times = [], [], []
+        for _ in range(self.warmup):
+            await operation()
+        started_at = time.perf_counter()
+        for _ in range(self.iterations):
+            timing = RequestTiming()
+            with database.execute_wrapper(timing):
+                begin = time.perf_counter()
+                await operation()
+                latencies.append(time.perf_counter() - begin)
+            queries.append(timing.queries)
+            db_times.append(timing.db)
+        return summarize(latencies, queries, db_times, time.perf_counter() - started_at, 0)
+
+    def run(self, scenarios=SCENARIOS):
+        return {name: getattr(self, name)() for name in scenarios}
+
+
+def report(results, dataset, seed):
+    """Tài liệu JSON của một lần chạy, kèm commit và môi trường để so sánh giữa các commit."""
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': seed,
+            'dataset': dataset,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, tolerance=0.2):
+    """
+    Các regression của `current` so với `baseline`: p50/p99 chậm hơn quá `tolerance`
+    (tỉ lệ) hoặc số query tối đa tăng. Trả về danh sách thông báo.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        for key in ('p50', 'p99'):
+            old, new = previous['latency_ms'][key], result['latency_ms'][key]
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f'{name}: latency {key} {old} ms -> {new} ms')
+        old, new = previous['queries']['max'], result['queries']['max']
+        if old is not None and new is not None and new > old:
+            regressions.append(f'{name}: queries {old} -> {new}')
+    return regressions
@@ -0,0 +1,341 @@
+import bisect
+import itertools
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Max
+
+from albums.models import Album
+from artists.models import Artist, Follow
+from backend import query_cache
+from chatbox.models import Chatbox, ChatboxMember, Message
+from orders.models import Order, PaymentMethod
+from playlists.models import Playlist
+from playlists.ordering import position_gap
+from songs.models import Genres, Song
+from users.models import Friend, StatusFriend
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_SKEW = 1.1
+# Ngày gốc cố định để dữ liệu không phụ thuộc ngày chạy
+REFERENCE_DATE = date(2025, 1, 1)
+SONG_PRICES = [Decimal('0')] * 8 + [Decimal('9000'), Decimal('19000')]
+
+
+def ensure_schema():
+    """Chạy migrate khi database còn migration chưa áp dụng hoặc thiếu bảng (albums không có migration)."""
+    executor = MigrationExecutor(connection)
+    pending = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    tables = set(connection.introspection.table_names())
+    missing = [model for model in apps.get_models() if model._meta.db_table not in tables]
+    if pending or missing:
+        call_command('migrate', verbosity=0, interactive=False, run_syncdb=True)
+
+
+def next_id(model):
+    return (model.objects.aggregate(value=Max('pk'))['value'] or 0) + 1
+
+
+def bulk_insert(model, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Ghi các đối tượng (iterable, có thể là generator) bằng bulk_create theo từng chunk."""
+    count = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return count
+        model.objects.bulk_create(chunk)
+        count += len(chunk)
+
+
+class Popularity:
+    """
+    Chọn phần tử theo phân phối Zipf: phần tử xếp hạng r có trọng số 1 / r^skew. Thứ hạng
+    được xáo trộn để phần tử phổ biến không luôn là id nhỏ nhất.
+    """
+
+    def __init__(self, rng, items, skew=DEFAULT_SKEW):
+        self.rng = rng
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, len(self.items) + 1)))
+
+    def __len__(self):
+        return len(self.items)
+
+    def pick(self):
+        value = self.rng.random() * self.cum_weights[-1]
+        return self.items[min(bisect.bisect(self.cum_weights, value), len(self.items) - 1)]
+
+    def distinct(self, k, exclude=()):
+        """k phần tử khác nhau (không nằm trong exclude), ưu tiên phần tử phổ biến."""
+        k = min(k, len(self.items) - len(exclude))
+        if k <= 0:
+            return []
+        if k > len(self.items) // 2:
+            # Lấy gần hết tập: chọn ngẫu nhiên đều thay vì rút lại nhiều lần
+            pool = [item for item in self.items if item not in exclude]
+            return self.rng.sample(pool, k)
+        chosen = {}
+        while len(chosen) < k:
+            item = self.pick()
+            if item not in exclude:
+                chosen[item] = None
+        return list(chosen)
+
+
+class CatalogSeeder:
+    """
+    Sinh dữ liệu giả lập ở quy mô lớn bằng bulk_create theo chunk, không qua save() nên
+    không chạy signal (chỉ mục tìm kiếm, chuyển mã, ảnh dẫn xuất).
+
+    Độ phổ biến lệch theo phân phối Zipf (`skew`): vài nghệ sĩ có rất nhiều bài hát và
+    người theo dõi, vài bài hát có mặt trong rất nhiều playlist và đơn hàng, vài người
+    dùng và chatbox hoạt động nhiều hơn hẳn. Số phần tử của mỗi playlist, số người theo
+    dõi, bạn bè, đơn hàng của mỗi người dùng theo phân phối mũ quanh giá trị trung bình.
+
+    Khóa chính được gán trước (tiếp nối giá trị lớn nhất hiện có) để tạo quan hệ mà không
+    phải đọc lại; SQLite và MySQL tự cập nhật auto increment theo giá trị đã ghi. Cùng seed,
+    cùng tham số và cùng dữ liệu ban đầu cho ra cùng kết quả.
+    """
+
+    def __init__(self, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, skew=DEFAULT_SKEW, deleted_ratio=0):
+        self.random = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.skew = skew
+        self.deleted_ratio = deleted_ratio
+        self.ids = {}
+        self.popularity = {}
+        self.members = {}
+        self.songs_by_artist = {}
+        self.song_prices = {}
+        # Số dòng của các bảng quan hệ (bảng trung gian many-to-many, thành viên chatbox)
+        self.related_counts = {}
+
+    def insert(self, model, rows):
+        return bulk_insert(model, rows, self.chunk_size)
+
+    def allocate(self, model, count, key):
+        start = next_id(model)
+        self.ids[key] = range(start, start + count)
+        return self.ids[key]
+
+    def rank(self, key):
+        self.popularity[key] = Popularity(self.random, self.ids[key], self.skew)
+        return self.popularity[key]
+
+    def size(self, mean, limit):
+        """Số phần tử lệch (phân phối mũ quanh mean), trong khoảng [0, limit]."""
+        if mean <= 0:
+            return 0
+        return min(int(self.random.expovariate(1 / mean)), limit)
+
+    def deleted(self):
+        return self.deleted_ratio > 0 and self.random.random() < self.deleted_ratio
+
+    def seed_users(self, count):
+        # Băm mật khẩu một lần cho mọi người dùng (mật khẩu: "benchmark")
+        password = make_password('benchmark')
+        ids = self.allocate(User, count, 'users')
+        self.insert(User, (User(id=i, username=f'user{i}', password=password) for i in ids))
+        self.rank('users')
+        return count
+
+    def seed_genres(self, count):
+        ids = self.allocate(Genres, count, 'genres')
+        self.insert(Genres, (Genres(id=i, genre_name=f'Genre {i}') for i in ids))
+        self.rank('genres')
+        return count
+
+    def seed_artists(self, count):
+        ids = self.allocate(Artist, count, 'artists')
+        self.insert(Artist, (Artist(id=i, artist_name=f'Artist {i}', is_deleted=self.deleted()) for i in ids))
+        self.rank('artists')
+        return count
+
+    def seed_songs(self, count):
+        artists, genres = self.popularity['artists'], self.popularity['genres']
+        ids = self.allocate(Song, count, 'songs')
+        rng = self.random
+
+        def rows():
+            for song_id in ids:
+                artist_id = artists.pick()
+                self.songs_by_artist.setdefault(artist_id, []).append(song_id)
+                price = rng.choice(SONG_PRICES)
+                if price:
+                    self.song_prices[song_id] = price
+                yield Song(
+                    id=song_id,
+                    artist_id=artist_id,
+                    song_name=f'Song {song_id}',
+                    duration=rng.randint(90, 420),
+                    plays=min(int(rng.paretovariate(1.2) * 100), 10 ** 8),
+                    release_date=REFERENCE_DATE - timedelta(days=rng.randint(0, 20 * 365)),
+                    price=price,
+                    is_deleted=self.deleted(),
+                )
+        self.insert(Song, rows())
+
+        Through = Song.genres.through
+        self.related_counts['song_genres'] = self.insert(Through, (
+            Through(song_id=song_id, genres_id=genre_id)
+            for song_id in ids
+            for genre_id in genres.distinct(rng.randint(1, 3))
+        ))
+        self.rank('songs')
+        return count
+
+    def seed_albums(self, count):
+        # Album của các nghệ sĩ có bài hát, mỗi album gồm một phần bài hát của chính nghệ sĩ đó
+        artists = [artist_id for artist_id in self.popularity['artists'].items if artist_id in self.songs_by_artist]
+        if not artists:
+            return 0
+        ids = self.allocate(Album, count, 'albums')
+        rng = self.random
+        owners = {album_id: artists[index % len(artists)] for index, album_id in enumerate(ids)}
+        self.insert(Album, (
+            Album(
+                id=album_id, artist_id=owners[album_id], album_name=f'Album {album_id}',
+                release_date=REFERENCE_DATE - timedelta(days=rng.randint(0, 20 * 365)), is_deleted=self.deleted(),
+            )
+            for album_id in ids
+        ))
+
+        Through = Album.song.through
+
+        def rows():
+            for album_id in ids:
+                songs = self.songs_by_artist[owners[album_id]]
+                for song_id in rng.sample(songs, min(rng.randint(5, 15), len(songs))):
+                    yield Through(album_id=album_id, song_id=song_id)
+        self.related_counts['album_songs'] = self.insert(Through, rows())
+        return count
+
+    def seed_playlists(self, count, songs_per_playlist=20):
+        users, songs = self.popularity['users'], self.popularity['songs']
+        ids = self.allocate(Playlist, count, 'playlists')
+        rng = self.random
+        self.insert(Playlist, (
+            Playlist(
+                id=i, user_id=users.pick(), playlist_name=f'Playlist {i}', description='',
+                is_public=rng.random() < 0.3, is_deleted=self.deleted(),
+            )
+            for i in ids
+        ))
+
+        Through = Playlist.song.through
+        gap = position_gap()
+        self.related_counts['playlist_songs'] = self.insert(Through, (
+            Through(playlist_id=playlist_id, song_id=song_id, position=index * gap)
+            for playlist_id in ids
+            for index, song_id in enumerate(songs.distinct(self.size(songs_per_playlist, 500) + 1), start=1)
+        ))
+        return count
+
+    def seed_follows(self, per_user):
+        artists = self.popularity['artists']
+        return self.insert(Follow, (
+            Follow(user_id=user_id, artist_id=artist_id)
+            for user_id in self.ids['users']
+            for artist_id in artists.distinct(self.size(per_user, 1000))
+        ))
+
+    def seed_friendships(self, per_user):
+        users = self.popularity['users']
+        statuses = {
+            name: StatusFriend.objects.get_or_create(name=name)[0].id
+            for name in (StatusFriend.ACCEPTED, StatusFriend.PENDING, StatusFriend.DECLINED)
+        }
+        rng = self.random
+        seen = set()
+
+        def rows():
+            for user_id in self.ids['users']:
+                for other in users.distinct(self.size(per_user / 2, 500), exclude={user_id}):
+                    # user1 luôn là id nhỏ hơn (như Friend.save)
+                    pair = (min(user_id, other), max(user_id, other))
+                    if pair in seen:
+                        continue
+                    seen.add(pair)
+                    status = rng.choices(list(statuses.values()), weights=(85, 10, 5))[0]
+                    yield Friend(user1_id=pair[0], user2_id=pair[1], status_id=status)
+        return self.insert(Friend, rows())
+
+    def seed_orders(self, per_user):
+        songs = self.popularity['songs']
+        methods = [PaymentMethod.objects.get_or_create(name=name)[0].id for name in ('momo', 'vnpay', 'card')]
+        rng = self.random
+        return self.insert(Order, (
+            Order(
+                user_id=user_id, song_id=song_id, payment_method_id=rng.choice(methods),
+                price=self.song_prices.get(song_id, 0),
+            )
+            for user_id in self.ids['users']
+            for song_id in songs.distinct(self.size(per_user, 200))
+        ))
+
+    def seed_chatboxes(self, count, members_per_group=8):
+        users = self.popularity['users']
+        ids = self.allocate(Chatbox, count, 'chatboxes')
+        rng = self.random
+        # Khoảng 70% là chat hai người, còn lại là nhóm
+        types = {i: 'user' if rng.random() < 0.7 else 'group' for i in ids}
+        self.insert(Chatbox, (Chatbox(id=i, name=f'Chat {i}', type=types[i]) for i in ids))
+
+        self.members = {
+            chatbox_id: users.distinct(2 if kind == 'user' else rng.randint(3, members_per_group * 2))
+            for chatbox_id, kind in types.items()
+        }
+        self.related_counts['chatbox_members'] = self.insert(ChatboxMember, (
+            ChatboxMember(chatbox_id=chatbox_id, user_id=user_id, is_admin=index == 0)
+            for chatbox_id, user_ids in self.members.items()
+            for index, user_id in enumerate(user_ids)
+        ))
+        self.rank('chatboxes')
+        return count
+
+    def seed_messages(self, count):
+        active = self.popularity['chatboxes']
+        rng = self.random
+        return self.insert(Message, (
+            Message(chatbox_id=chatbox_id, user_id=rng.choice(self.members[chatbox_id]), message=f'Message {i}')
+            for i, chatbox_id in enumerate(active.pick() for _ in range(count))
+        ))
+
+    def run(self, users=100, artists=100, genres=20, songs=1000, albums=50, playlists=100, songs_per_playlist=20,
+            follows_per_user=5, friends_per_user=4, orders_per_user=2, chatboxes=10, messages=1000, progress=None):
+        """
+        Sinh toàn bộ dữ liệu trong một transaction, trả về số dòng đã ghi của từng loại.
+        `progress(tên, số dòng)` được gọi sau mỗi bước nếu có.
+        """
+        steps = [
+            ('users', lambda: self.seed_users(users)),
+            ('genres', lambda: self.seed_genres(genres)),
+            ('artists', lambda: self.seed_artists(artists)),
+            ('songs', lambda: self.seed_songs(songs) if artists else 0),
+            ('albums', lambda: self.seed_albums(albums)),
+            ('playlists', lambda: self.seed_playlists(playlists, songs_per_playlist) if users and songs else 0),
+            ('follows', lambda: self.seed_follows(follows_per_user) if artists else 0),
+            ('friendships', lambda: self.seed_friendships(friends_per_user) if users > 1 else 0),
+            ('orders', lambda: self.seed_orders(orders_per_user) if songs else 0),
+            ('chatboxes', lambda: self.seed_chatboxes(chatboxes) if users > 1 else 0),
+            ('messages', lambda: self.seed_messages(messages) if users > 1 and chatboxes else 0),
+        ]
+        counts = {}
+        with transaction.atomic():
+            for name, step in steps:
+                counts[name] = step()
+                if progress:
+                    progress(name, counts[name])
+            counts.update(self.related_counts)
+            # Dữ liệu ghi bằng bulk_create không qua signal: làm mới response cache của danh mục
+            transaction.on_commit(lambda: query_cache.bump('song', 'artist', 'album', 'genre'))
+        return counts
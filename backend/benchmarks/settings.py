@@ -0,0 +1,31 @@
+"""
+Settings cho `manage.py benchmark`: dựa trên backend.test_settings (SQLite, cache locmem, channel
+layer trong bộ nhớ, storage trên đĩa), tắt thêm các side effect không thuộc phần được đo.
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python manage.py benchmark --songs 100000
+
+Mặc định database nằm trong bộ nhớ; đặt BENCHMARK_DB=<file> để giữ lại dữ liệu đã seed.
+Test suite chạy với backend.test_settings, không phải settings này.
+"""
+import os
+import tempfile
+
+os.environ.setdefault('GOOGLE_API_KEY', 'benchmark')
+
+from backend.test_settings import *  # noqa: E402,F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('BENCHMARK_DB', ':memory:'),
+    }
+}
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'spotify-benchmark-media')
+
+DEBUG = False
+IMAGE_DERIVATIVES_ON_UPLOAD = False
+A2A_RETRIEVER_BACKGROUND_BUILD = True
+A2A_CATALOG_BACKGROUND_BUILD = True
+# Đo đường chạy thật qua database; BENCHMARK_QUERY_CACHE=1 để đo cả response cache
+QUERY_CACHE_ENABLED = os.getenv('BENCHMARK_QUERY_CACHE') == '1'
+METRICS_BUDGET_ACTION = 'log'
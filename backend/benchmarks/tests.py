@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+import random
+from collections import Counter
+
+from django.db.models import Count, F
+
+from artists.models import Follow
+from chatbox.models import ChatboxMember, Message
+from orders.models import Order
+from playlists.models import Playlist
+from songs.models import Song
+from users.models import Friend
+from .runner import SCENARIOS, compare, percentile
+from .seed import CatalogSeeder, Popularity
+
+
+class SeedTest(TestCase):
+    def relative_rows(self, seed):
+        seeder = CatalogSeeder(seed=seed, chunk_size=7)
+        seeder.run(users=5, artists=4, genres=3, songs=30, playlists=3, chatboxes=2, messages=20)
+        artist_start = seeder.ids['artists'][0]
+        return [
+            (song.duration, song.artist_id - artist_start)
+            for song in Song.objects.filter(id__in=seeder.ids['songs']).order_by('id')
+        ]
+
+    def test_same_seed_gives_same_catalog(self):
+        first = self.relative_rows(seed=1)
+        self.assertEqual(len(first), 30)
+        self.assertEqual(first, self.relative_rows(seed=1))
+        self.assertNotEqual(first, self.relative_rows(seed=2))
+
+
+class SeedCatalogCommandTest(TestCase):
+    def test_seeds_every_kind_with_skew(self):
+        out = StringIO()
+        call_command(
+            'seed_catalog', scale=0.01, users=200, genres=8, songs=2000, chatboxes=50, messages=2000,
+            deleted_ratio=0.1, seed=3, chunk_size=300, stdout=out,
+        )
+
+        self.assertIn('Seeded', out.getvalue())
+        self.assertEqual(Song.objects.count(), 2000)
+        self.assertEqual(Message.objects.count(), 2000)
+        for model in (Playlist, Follow, Friend, Order, ChatboxMember):
+            self.assertGreater(model.objects.count(), 0, model.__name__)
+        self.assertEqual(Song.genres.through.objects.values('song_id').distinct().count(), 2000)
+
+        deleted = Song.objects.filter(is_deleted=True).count()
+        self.assertTrue(100 < deleted < 300, deleted)
+        self.assertFalse(Friend.objects.filter(user1_id__gte=F('user2_id')).exists())
+        self.assertFalse(Order.objects.exclude(song__price=F('price')).exists())
+
+        # Nghệ sĩ phổ biến nhất có nhiều bài hát hơn hẳn nghệ sĩ ở giữa
+        per_artist = sorted(Song.objects.values('artist').annotate(n=Count('id')).values_list('n', flat=True))
+        self.assertGreater(per_artist[-1], 5 * per_artist[len(per_artist) // 2])
+
+
+class PopularityTest(TestCase):
+    def test_distinct_prefers_popular_items(self):
+        popularity = Popularity(random.Random(0), range(1000), skew=1.2)
+        picks = Counter(popularity.pick() for _ in range(5000))
+        self.assertEqual(picks.most_common(1)[0][0], popularity.items[0])
+
+        sample = popularity.distinct(50, exclude={popularity.items[0]})
+        self.assertEqual(len(set(sample)), 50)
+        self.assertNotIn(popularity.items[0], sample)
+        self.assertEqual(sorted(popularity.distinct(1000)), list(range(1000)))
+
+
+class BenchmarkCommandTest(TestCase):
+    def test_report_covers_every_scenario(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'result.json')
+            call_command(
+                'benchmark', songs=200, artists=20, users=20, playlists=10, chatboxes=2, messages=100,
+                iterations=5, warmup=1, listeners=3, output=output, stderr=StringIO(),
+            )
+            with open(output) as f:
+                document = json.load(f)
+
+            self.assertEqual(document['meta']['dataset']['songs'], 200)
+            self.assertEqual(set(document['results']), set(SCENARIOS))
+            for name, result in document['results'].items():
+                self.assertEqual(result['errors'], 0, name)
+                self.assertEqual(result['iterations'], 5, name)
+            # Lịch sử tin nhắn không được query theo từng tin nhắn
+            self.assertLessEqual(document['results']['message_history']['queries']['max'], 5)
+
+            # Baseline nhanh hơn nhiều so với lần chạy sau: phải báo regression
+            document['results']['song_list']['latency_ms'].update(p50=0.001, p99=0.001)
+            with open(output, 'w') as f:
+                json.dump(document, f)
+            with self.assertRaises(CommandError):
+                call_command(
+                    'benchmark', songs=10, artists=2, users=2, playlists=1, chatboxes=1, messages=1,
+                    iterations=1, warmup=0, listeners=1, scenario=['song_list'],
+                    compare=output, stdout=StringIO(), stderr=StringIO(),
+                )
+
+
+class CompareTest(TestCase):
+    def result(self, p50, p99, queries):
+        return {'latency_ms': {'p50': p50, 'p99': p99}, 'queries': {'max': queries}}
+
+    def test_regressions(self):
+        baseline = {'results': {'song_list': self.result(10, 20, 3), 'ws_fanout': self.result(1, 2, 1)}}
+        current = {'results': {'song_list': self.result(11, 30, 4), 'ws_fanout': self.result(1, 2, 1)}}
+
+        self.assertEqual(compare(baseline, current, tolerance=0.2), [
+            'song_list: latency p99 20 ms -> 30 ms',
+            'song_list: queries 3 -> 4',
+        ])
+        self.assertEqual(compare(baseline, baseline), [])
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 99), 5)
+        self.assertIsNone(percentile([], 50))
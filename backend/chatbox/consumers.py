@@ -1,8 +1,7 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 import json
 from .models import Message
-from django.contrib.auth.models import User
-from users.models import UserProfile
+from users.cache import aget_cached_user_payload, get_user_payload
 from asgiref.sync import sync_to_async
 
 class ChatboxConsumer(AsyncWebsocketConsumer):
@@ -24,21 +23,24 @@ class ChatboxConsumer(AsyncWebsocketConsumer):
         # Lưu tin nhắn vào database và lấy created_at từ server
         saved_message = await self.save_message(user_id, self.chatbox_id, message)
 
+        # Serialize người gửi một lần rồi gửi kèm trong event cho cả nhóm
+        user_data = await self.get_user_payload(saved_message.user_id)
+
         await self.channel_layer.group_send(
             self.chatbox_group_name,
             {
                 'type': 'chat_message',
                 'message': saved_message.message,
                 'user_id': saved_message.user_id,
+                'user': user_data,
                 'created_at': saved_message.created_at.isoformat()  # Convert to string
             }
         )
 
     async def chat_message(self, event):
-        user = await self.get_user(event['user_id'])
-
-        # Chạy hàm serialize_user và đảm bảo dữ liệu đã được tính toán
-        user_data = await self.serialize_user(user)
+        user_data = event.get('user')
+        if user_data is None:
+            user_data = await self.get_user_payload(event['user_id'])
 
         await self.send(text_data=json.dumps({
             'message': event['message'],
@@ -54,25 +56,9 @@ class ChatboxConsumer(AsyncWebsocketConsumer):
             message=message
         )
 
-    @sync_to_async
-    def get_user(self, user_id):
-        return User.objects.get(id=user_id)
-
-    @sync_to_async
-    def serialize_user(self, user):
-        profile = getattr(user, 'profile', None) 
-
-        # Đảm bảo rằng tất cả các đối tượng bất đồng bộ đã được xử lý
-        return {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'avatar': profile.avatar.url if profile and profile.avatar else None,
-            'is_active': user.is_active,
-            'is_staff': user.is_staff,
-            'is_superuser': user.is_superuser,
-            'last_login': user.last_login.isoformat() if user.last_login else None,
-            'date_joined': user.date_joined.isoformat() if user.date_joined else None
-        }
+    async def get_user_payload(self, user_id):
+        # Cache hit không cần chuyển sang thread đồng bộ
+        user_data = await aget_cached_user_payload(user_id)
+        if user_data is None:
+            user_data = await sync_to_async(get_user_payload)(user_id)
+        return user_data
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatboxmember',
+            index=models.Index(fields=['chatbox', 'user'], name='chatbox_member_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chatbox', 'created_at'], name='chatbox_message_time_idx'),
+        ),
+    ]
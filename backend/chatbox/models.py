@@ -19,6 +19,12 @@ class ChatboxMember(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     is_admin = models.BooleanField(default=False)
 
+    class Meta:
+        # Kiểm tra thành viên (chatbox, user) chạy ở mỗi tin nhắn gửi qua websocket
+        indexes = [
+            models.Index(fields=['chatbox', 'user'], name='chatbox_member_lookup_idx'),
+        ]
+
     def __str__(self):
         return f"{self.chatbox.name} - {self.user.username}"
 
@@ -28,6 +34,12 @@ class Message(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Lịch sử tin nhắn của một chatbox theo thời gian
+        indexes = [
+            models.Index(fields=['chatbox', 'created_at'], name='chatbox_message_time_idx'),
+        ]
+
     def __str__(self):
         return f"{self.chatbox.name} - {self.user.username}"
 
@@ -1,3 +1,90 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from backend.explain import QueryPlanAssertions
+from users.cache import invalidate_user_payload
+from .consumers import ChatboxConsumer
+from .models import Chatbox, ChatboxMember, Message
+
+
+class ChatMessageFanOutTest(TestCase):
+    def setUp(self):
+        self.sender = User.objects.create_user('sender', password='secret123')
+        self.chatbox = Chatbox.objects.create(name='Group', type='group')
+        invalidate_user_payload(self.sender.id)
+
+    def make_consumer(self):
+        consumer = ChatboxConsumer()
+        consumer.scope = {'user': self.sender}
+        consumer.chatbox_id = self.chatbox.id
+        consumer.chatbox_group_name = f'chatbox_{self.chatbox.id}'
+        consumer.channel_layer = mock.Mock(group_send=mock.AsyncMock())
+        consumer.send = mock.AsyncMock()
+        return consumer
+
+    def test_receive_puts_sender_payload_in_group_event(self):
+        consumer = self.make_consumer()
+
+        async_to_sync(consumer.receive)('{"message": "hello"}')
+
+        event = consumer.channel_layer.group_send.call_args.args[1]
+        self.assertEqual(event['user']['id'], self.sender.id)
+        self.assertEqual(event['user']['username'], 'sender')
+
+    def test_fan_out_to_members_costs_no_queries(self):
+        sender_consumer = self.make_consumer()
+        async_to_sync(sender_consumer.receive)('{"message": "hello"}')
+        event = sender_consumer.channel_layer.group_send.call_args.args[1]
+
+        members = [self.make_consumer() for _ in range(200)]
+        with self.assertNumQueries(0):
+            for member in members:
+                async_to_sync(member.chat_message)(event)
+
+        self.assertEqual(sum(member.send.await_count for member in members), 200)
+
+    def test_event_without_user_payload_is_still_delivered(self):
+        consumer = self.make_consumer()
+        event = {'type': 'chat_message', 'message': 'hi', 'user_id': self.sender.id, 'created_at': 'now'}
+
+        async_to_sync(consumer.chat_message)(event)
+
+        self.assertIn('"username": "sender"', consumer.send.call_args.kwargs['text_data'])
+
+
+class ChatboxCreateTest(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret123')
+        self.others = [User.objects.create_user(f'member{i}', password='secret123') for i in range(5)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_members_are_inserted_in_one_query(self):
+        user_ids = [user.id for user in self.others]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/chatbox/', {'name': 'Group', 'type': 'group', 'user_ids': user_ids}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "chatbox_chatboxmember"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(ChatboxMember.objects.filter(chatbox_id=response.data['id']).count(), 6)
+
+    def test_direct_chat_is_reused(self):
+        payload = {'name': 'Direct', 'type': 'user', 'user_ids': [self.others[0].id]}
+        created = self.client.post('/chatbox/', payload, format='json')
+        again = self.client.post('/chatbox/', payload, format='json')
+
+        self.assertEqual((created.status_code, again.status_code), (201, 200))
+        self.assertEqual(created.data['id'], again.data['id'])
+
 
-# Create your tests here.
+class ChatQueryPlanTest(QueryPlanAssertions, TestCase):
+    def test_membership_and_history_use_index(self):
+        self.assertUsesIndex(ChatboxMember.objects.filter(chatbox_id=1, user_id=1))
+        self.assertUsesIndex(Message.objects.filter(chatbox_id=1).order_by('created_at'))
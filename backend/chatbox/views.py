@@ -9,6 +9,7 @@ from django.db import models
 from rest_framework.exceptions import ValidationError
 from django.db.models import Count, Q
 from rest_framework.response import Response
+from users.cache import get_user_payload
 
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
@@ -47,10 +48,11 @@ class ChatboxListCreateView(generics.ListCreateAPIView):
         serializer.is_valid(raise_exception=True)
         chatbox = serializer.save()
 
-        ChatboxMember.objects.create(chatbox=chatbox, user=request.user)
-        for uid in user_ids:
-            if uid != request.user.id:
-                ChatboxMember.objects.create(chatbox=chatbox, user_id=uid)
+        # Thêm mọi thành viên bằng một câu INSERT; việc kiểm tra chatbox đã tồn tại ở trên
+        # dựa vào danh sách thành viên nên không thể hoãn bước này sang task queue
+        ChatboxMember.objects.bulk_create(
+            [ChatboxMember(chatbox=chatbox, user_id=uid) for uid in user_ids]
+        )
 
         return Response(self.get_serializer(chatbox).data, status=201)
 
@@ -62,7 +64,8 @@ class MessageListCreateView(generics.ListCreateAPIView):
         chatbox_id = self.kwargs['chatbox_id']
         if not ChatboxMember.objects.filter(chatbox_id=chatbox_id, user=self.request.user).exists():
             return Message.objects.none()
-        return Message.objects.filter(chatbox_id=chatbox_id)
+        # Người gửi và profile (avatar) lấy bằng JOIN, không query riêng cho từng tin nhắn
+        return Message.objects.filter(chatbox_id=chatbox_id).select_related('user__profile')
 
     def perform_create(self, serializer):
         chatbox_id = self.kwargs['chatbox_id']
@@ -83,6 +86,7 @@ def send_message_to_ws_group(chatbox_id, user_id, message_text, created_at):
             "type": "chat_message",
             "message": message_text,
             "user_id": user_id,
+            "user": get_user_payload(user_id),
             "created_at": created_at.isoformat()
         }
     )
@@ -0,0 +1,154 @@
+import io
+import os
+import threading
+from functools import lru_cache
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+
+from backend.cache import TTLCache
+
+SIGNING_SALT = 'images.derivatives'
+
+# Định dạng xuất: phần mở rộng -> (định dạng Pillow, content type, tham số lưu)
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def presets():
+    """Các kích thước dẫn xuất: tên preset -> cạnh (px) của ảnh vuông."""
+    return getattr(settings, 'IMAGE_PRESETS', {'small': 96, 'medium': 300, 'large': 640})
+
+
+def derivative_name(name, preset, fmt):
+    """Ảnh dẫn xuất nằm cạnh ảnh gốc: avatars/a.png -> avatars/a__small.webp."""
+    stem, _ = os.path.splitext(name)
+    return f'{stem}__{preset}.{fmt}'
+
+
+@lru_cache(maxsize=16)
+def _storage_base(storage):
+    """
+    (netloc, tiền tố path) của URL file trong storage. Tính một lần cho mỗi storage thay vì
+    mỗi giá trị: với S3 (querystring_auth) mỗi lần gọi storage.url() là một lần ký.
+    """
+    probe = '__probe__'
+    base = urlsplit(storage.url(probe))
+    return base.netloc, base.path[:-len(probe)]
+
+
+@receiver(setting_changed)
+def _reset_storage_base(setting, **kwargs):
+    if setting in ('MEDIA_URL', 'STORAGES') or setting.startswith('AWS_'):
+        _storage_base.cache_clear()
+
+
+def storage_name(value, storage=default_storage):
+    """
+    Tên file trong storage của một ảnh: FieldFile, hoặc URL (URLField) trỏ vào storage
+    của mình. URL bên ngoài trả về None — không tải ảnh từ địa chỉ tùy ý.
+    """
+    if not value:
+        return None
+    if hasattr(value, 'name'):
+        return value.name
+    netloc, prefix = _storage_base(storage)
+    url = urlsplit(value)
+    if not netloc and not prefix.strip('/'):
+        # Không có tiền tố URL riêng thì không phân biệt được ảnh của storage với ảnh ngoài
+        return None
+    # Storage có URL tương đối (FileSystemStorage) thì chỉ so phần path
+    if netloc and url.netloc != netloc:
+        return None
+    if not url.path.startswith(prefix) or len(url.path) == len(prefix):
+        return None
+    return unquote(url.path[len(prefix):])
+
+
+@lru_cache(maxsize=4096)
+def make_token(name):
+    return signing.dumps(name, salt=SIGNING_SALT, compress=True)
+
+
+def read_token(token):
+    """Tên ảnh gốc trong token, hoặc None nếu token không hợp lệ."""
+    try:
+        return signing.loads(token, salt=SIGNING_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def render(source, size, fmt):
+    """Cắt giữa và thu nhỏ ảnh về size x size, trả về bytes theo định dạng fmt."""
+    pil_format, _, options = FORMATS[fmt]
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if pil_format == 'JPEG':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, pil_format, **options)
+    return output.getvalue()
+
+
+class DerivativeStore:
+    """
+    Tạo và tìm ảnh dẫn xuất trong storage.
+
+    Tên ảnh gốc là duy nhất cho mỗi lần upload, nên ảnh dẫn xuất không bao giờ thay đổi:
+    sự tồn tại của nó được nhớ trong bộ nhớ để không phải hỏi storage mỗi request, và
+    mỗi ảnh chỉ được một thread tạo tại một thời điểm.
+    """
+
+    def __init__(self, storage=default_storage):
+        self.storage = storage
+        self._known = TTLCache(maxsize=getattr(settings, 'IMAGE_DERIVATIVE_CACHE_SIZE', 10000), ttl=24 * 3600)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, name):
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _release_lock(self, name):
+        with self._locks_guard:
+            self._locks.pop(name, None)
+
+    def ensure(self, name, preset, fmt):
+        """Trả về tên ảnh dẫn xuất, tạo nó từ ảnh gốc nếu chưa có."""
+        target = derivative_name(name, preset, fmt)
+        if self._known.get(target):
+            return target
+        try:
+            with self._lock_for(target):
+                if not self._known.get(target) and not self.storage.exists(target):
+                    with self.storage.open(name, 'rb') as source:
+                        data = render(source, presets()[preset], fmt)
+                    # storage.save có thể đổi tên nếu file đã tồn tại; tên dẫn xuất phải cố định
+                    saved = self.storage.save(target, ContentFile(data))
+                    if saved != target:
+                        self.storage.delete(saved)
+                self._known.set(target, True)
+        finally:
+            self._release_lock(target)
+        return target
+
+    def generate_all(self, name):
+        """Tạo mọi preset và định dạng cho một ảnh gốc (dùng khi upload)."""
+        return [self.ensure(name, preset, fmt) for preset in presets() for fmt in FORMATS]
+
+    def clear(self):
+        self._known.clear()
+
+
+store = DerivativeStore()
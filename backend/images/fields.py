@@ -0,0 +1,31 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .derivatives import FORMATS, make_token, presets, storage_name
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    URL các ảnh dẫn xuất của một ảnh: {preset: {định dạng: url}}.
+
+    Chỉ tính toán URL, không truy cập storage; ảnh được tạo khi upload hoặc ở
+    request đầu tiên tới images/. Trả về None nếu không có ảnh hoặc ảnh nằm ngoài storage.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        name = storage_name(value)
+        if not name:
+            return None
+        token = make_token(name)
+        request = self.context.get('request', None)
+        variants = {}
+        for preset in presets():
+            variants[preset] = {}
+            for fmt in FORMATS:
+                url = reverse('image-derivative', kwargs={'token': token, 'preset': preset, 'fmt': fmt})
+                variants[preset][fmt] = request.build_absolute_uri(url) if request is not None else url
+        return variants
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db.models.signals import post_init, post_save
+
+from songs.models import Song
+from users.models import UserProfile
+from .tasks import generate_derivatives
+
+# Model -> field ảnh được tạo sẵn ảnh dẫn xuất khi upload
+IMAGE_FIELDS = {
+    Song: 'thumbnail',
+    UserProfile: 'avatar',
+}
+
+
+def _image_name(instance, field):
+    value = instance.__dict__.get(field)
+    return getattr(value, 'name', value)
+
+
+def remember_image(sender, instance, **kwargs):
+    instance._original_image = _image_name(instance, IMAGE_FIELDS[sender])
+
+
+def generate_on_upload(sender, instance, **kwargs):
+    field = IMAGE_FIELDS[sender]
+    if field not in instance.__dict__:
+        return
+    name = _image_name(instance, field)
+    changed = name != getattr(instance, '_original_image', None)
+    instance._original_image = name
+    if name and changed and getattr(settings, 'IMAGE_DERIVATIVES_ON_UPLOAD', True):
+        # Nếu task lỗi hẳn, ảnh dẫn xuất vẫn được tạo ở request đầu tiên tới images/
+        generate_derivatives.delay(name)
+
+
+for model in IMAGE_FIELDS:
+    post_init.connect(remember_image, sender=model, dispatch_uid=f'images_remember_{model.__name__}')
+    post_save.connect(generate_on_upload, sender=model, dispatch_uid=f'images_generate_{model.__name__}')
@@ -0,0 +1,19 @@
+import logging
+
+from PIL import Image
+
+from tasks.queue import task
+from .derivatives import store
+
+logger = logging.getLogger(__name__)
+
+
+@task('images.generate_derivatives', priority=-5)
+def generate_derivatives(name):
+    """Tạo mọi ảnh dẫn xuất của một ảnh gốc vừa upload."""
+    try:
+        return store.generate_all(name)
+    except Image.DecompressionBombError:
+        # Ảnh vượt Image.MAX_IMAGE_PIXELS: thử lại cũng lỗi như vậy, không tạo ảnh dẫn xuất
+        logger.warning('Image %s is too large to resize, skipping derivatives', name)
+        return []
@@ -0,0 +1,117 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from albums.models import Album
+from artists.models import Artist
+from songs.models import Song
+from tasks.models import Task
+from tasks.worker import Worker
+from users.models import UserProfile
+from . import derivatives
+from .derivatives import derivative_name, store
+
+
+def png_bytes(size=(800, 600), color=(200, 30, 30)):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, 'PNG')
+    return output.getvalue()
+
+
+@override_settings(IMAGE_PRESETS={'small': 32, 'medium': 64})
+class ImageDerivativeTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL='/media/')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        store.clear()
+        self.addCleanup(store.clear)
+
+        self.user = User.objects.create_user('listener', password='secret123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.artist = Artist.objects.create(artist_name='Artist')
+
+    def create_song(self):
+        song = Song(artist=self.artist, song_name='Song')
+        song.thumbnail.save('cover.png', ContentFile(png_bytes()), save=True)
+        Worker().run(burst=True)
+        return song
+
+    def test_derivatives_are_generated_on_upload(self):
+        song = self.create_song()
+        for preset, size in (('small', 32), ('medium', 64)):
+            for fmt in ('webp', 'jpg'):
+                name = derivative_name(song.thumbnail.name, preset, fmt)
+                self.assertTrue(default_storage.exists(name))
+                with Image.open(default_storage.open(name)) as image:
+                    self.assertEqual(image.size, (size, size))
+
+    def test_lazy_generation_and_immutable_response(self):
+        with self.settings(IMAGE_DERIVATIVES_ON_UPLOAD=False):
+            song = self.create_song()
+        self.assertFalse(default_storage.exists(derivative_name(song.thumbnail.name, 'small', 'webp')))
+
+        url = self.client.get(f'/songs/{song.id}/').data['thumbnail_variants']['small']['webp']
+        with mock.patch.object(derivatives, 'render', wraps=derivatives.render) as render:
+            anonymous = APIClient()
+            response = anonymous.get(url)
+            self.assertEqual(anonymous.get(url).status_code, 200)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(anonymous.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_invalid_token_or_preset(self):
+        song = self.create_song()
+        url = self.client.get(f'/songs/{song.id}/').data['thumbnail_variants']['small']['jpg']
+        self.assertEqual(self.client.get(url.replace('/small.', '/huge.')).status_code, 404)
+        self.assertEqual(self.client.get('/images/forged-token/small.jpg').status_code, 404)
+
+    def test_oversized_image_is_skipped_and_served_as_not_found(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            song = self.create_song()
+            self.assertFalse(default_storage.exists(derivative_name(song.thumbnail.name, 'small', 'webp')))
+            self.assertEqual(Task.objects.get(name='images.generate_derivatives').status, 'done')
+
+            url = self.client.get(f'/songs/{song.id}/').data['thumbnail_variants']['small']['webp']
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_url_fields_only_use_own_storage(self):
+        name = default_storage.save('albums/cover.png', ContentFile(png_bytes()))
+        own = Album.objects.create(album_name='Own', artist=self.artist, album_cover_url=f'http://testserver{default_storage.url(name)}')
+        external = Album.objects.create(album_name='External', artist=self.artist, album_cover_url='https://example.com/cover.png')
+
+        variants = self.client.get(f'/albums/{own.id}/').data['album_cover_variants']
+        self.assertEqual(self.client.get(variants['medium']['jpg']).status_code, 200)
+        self.assertIsNone(self.client.get(f'/albums/{external.id}/').data['album_cover_variants'])
+
+    def test_storage_url_prefix_is_computed_once(self):
+        storage = mock.Mock()
+        storage.url.side_effect = lambda name: f'https://bucket.s3.amazonaws.com/media/{name}?X-Amz-Signature=abc'
+        names = [
+            derivatives.storage_name(f'https://bucket.s3.amazonaws.com/media/covers/{i}.png?X-Amz-Signature=x', storage)
+            for i in range(20)
+        ]
+        self.assertEqual(names[3], 'covers/3.png')
+        self.assertIsNone(derivatives.storage_name('https://example.com/media/covers/1.png', storage))
+        self.assertEqual(storage.url.call_count, 1)
+
+    def test_avatar_variants(self):
+        profile = UserProfile.objects.create(user=self.user)
+        profile.avatar.save('me.png', ContentFile(png_bytes((300, 300))))
+        Worker().run(burst=True)
+        self.assertTrue(default_storage.exists(derivative_name(profile.avatar.name, 'small', 'jpg')))
+        self.assertEqual(derivatives.storage_name(profile.avatar), profile.avatar.name)
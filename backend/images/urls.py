@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import ImageDerivativeView
+
+urlpatterns = [
+    path('<str:token>/<str:preset>.<str:fmt>', ImageDerivativeView.as_view(), name='image-derivative'),
+]
@@ -0,0 +1,36 @@
+from django.http import Http404, HttpResponse
+from django.utils.http import quote_etag
+from PIL import Image
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from .derivatives import FORMATS, presets, read_token, store
+
+
+class ImageDerivativeView(APIView):
+    """
+    Trả về ảnh dẫn xuất (images/<token>/<preset>.<fmt>), tạo nó ở lần truy cập đầu tiên.
+
+    Token là tên ảnh gốc đã ký, nên URL đổi khi ảnh gốc đổi và nội dung tại một URL
+    không bao giờ thay đổi: response được cache vĩnh viễn (immutable). Không cần đăng nhập
+    vì ảnh được dùng trực tiếp trong thẻ <img>; token ký ngăn việc đọc file tùy ý.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, token, preset, fmt):
+        name = read_token(token)
+        if name is None or preset not in presets() or fmt not in FORMATS:
+            raise Http404
+        etag = quote_etag(f'{token[-16:]}-{preset}-{fmt}')
+        headers = {'ETag': etag, 'Cache-Control': 'public, max-age=31536000, immutable'}
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            return HttpResponse(status=304, headers=headers)
+        try:
+            target = store.ensure(name, preset, fmt)
+        except (OSError, Image.DecompressionBombError):
+            # Ảnh gốc không đọc được hoặc quá lớn để giải nén an toàn
+            raise Http404
+        with store.storage.open(target, 'rb') as f:
+            data = f.read()
+        return HttpResponse(data, content_type=FORMATS[fmt][1], headers=headers)
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_orders(apps, schema_editor):
+    # Không tự xóa đơn hàng trùng (dữ liệu thanh toán); báo rõ để xử lý tay trước khi thêm ràng buộc
+    Order = apps.get_model('orders', 'Order')
+    duplicates = (
+        Order.objects.values('user_id', 'song_id').annotate(n=Count('id')).filter(n__gt=1).order_by()
+    )
+    if duplicates.exists():
+        sample = ', '.join(f"(user={d['user_id']}, song={d['song_id']})" for d in duplicates[:10])
+        raise RuntimeError(f'Có {duplicates.count()} cặp người dùng/bài hát bị mua trùng, cần gộp trước khi migrate: {sample}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_orders, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(fields=('user', 'song'), name='orders_order_user_song_uniq'),
+        ),
+    ]
@@ -14,5 +14,11 @@ class Order(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     date_buy = models.DateTimeField(auto_now_add=True) 
 
+    class Meta:
+        # Mỗi người dùng mua một bài hát một lần; index của ràng buộc phục vụ luôn CheckSongPaidView
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'song'], name='orders_order_user_song_uniq'),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.user.username} - {self.song}"
\ No newline at end of file
@@ -1,3 +1,29 @@
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from artists.models import Artist
+from backend.explain import QueryPlanAssertions
+from songs.models import Song
+from .models import Order
+
+
+class OrderConstraintTest(QueryPlanAssertions, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('buyer', password='secret123')
+        self.song = Song.objects.create(artist=Artist.objects.create(artist_name='Artist'), song_name='Song')
+
+    def test_song_can_only_be_bought_once(self):
+        Order.objects.create(user=self.user, song=self.song, price=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Order.objects.create(user=self.user, song=self.song, price=1)
+
+    def test_paid_check_uses_index(self):
+        self.assertUsesIndex(Order.objects.filter(user=self.user, song_id=self.song.id))
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertFalse(client.get(f'/orders/check-song-paid/{self.song.id}/').data['has_paid'])
+        Order.objects.create(user=self.user, song=self.song, price=1)
+        self.assertTrue(client.get(f'/orders/check-song-paid/{self.song.id}/').data['has_paid'])
@@ -6,7 +6,7 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 
 class OrderListCreateView(generics.ListCreateAPIView):
-    queryset = Order.objects.all()
+    queryset = Order.objects.select_related('song__artist').prefetch_related('song__genres')
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
 
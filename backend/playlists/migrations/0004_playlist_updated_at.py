@@ -0,0 +1,20 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlists', '0003_playlist_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playlist',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
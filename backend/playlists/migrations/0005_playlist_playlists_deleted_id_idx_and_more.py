@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playlists', '0004_playlist_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playlist',
+            index=models.Index(fields=['is_deleted', '-id'], name='playlists_deleted_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playlist',
+            index=models.Index(fields=['user', 'is_deleted'], name='playlists_user_live_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+POSITION_GAP = 1024
+
+
+def fill_positions(apps, schema_editor):
+    # Thứ tự hiện có là thứ tự thêm vào (id của bảng trung gian)
+    PlaylistSong = apps.get_model('playlists', 'PlaylistSong')
+    rows = PlaylistSong.objects.order_by('playlist_id', 'id').values_list('id', 'playlist_id')
+    batch, current, index = [], None, 0
+    for row_id, playlist_id in rows.iterator():
+        if playlist_id != current:
+            current, index = playlist_id, 0
+        index += 1
+        batch.append(PlaylistSong(id=row_id, position=index * POSITION_GAP))
+        if len(batch) >= 1000:
+            PlaylistSong.objects.bulk_update(batch, ['position'])
+            batch = []
+    if batch:
+        PlaylistSong.objects.bulk_update(batch, ['position'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0011_song_songs_song_deleted_id_idx_and_more'),
+        ('playlists', '0005_playlist_playlists_deleted_id_idx_and_more'),
+    ]
+
+    operations = [
+        # Bảng playlists_playlist_song đã có sẵn (quan hệ nhiều-nhiều tự tạo): chỉ đổi state
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='PlaylistSong',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('playlist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='playlists.playlist')),
+                        ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='songs.song')),
+                    ],
+                    options={
+                        'db_table': 'playlists_playlist_song',
+                        'unique_together': {('playlist', 'song')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='playlist',
+                    name='song',
+                    field=models.ManyToManyField(blank=True, through='playlists.PlaylistSong', to='songs.song'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='playlistsong',
+            name='position',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='playlistsong',
+            index=models.Index(fields=['playlist', 'position'], name='playlists_song_position_idx'),
+        ),
+    ]
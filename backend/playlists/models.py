@@ -10,8 +10,41 @@ class Playlist(models.Model):
     is_public = models.BooleanField(default=False)
     playlist_cover_url = models.URLField(blank=True, null=True)
     is_deleted = models.BooleanField(default=False)
-    song = models.ManyToManyField(Song, blank=True)
+    song = models.ManyToManyField(Song, blank=True, through='PlaylistSong')
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Danh sách playlist còn hiển thị sắp theo -id (xem songs.Song)
+        indexes = [
+            models.Index(fields=['is_deleted', '-id'], name='playlists_deleted_id_idx'),
+            models.Index(fields=['user', 'is_deleted'], name='playlists_user_live_idx'),
+        ]
+
+    def __str__(self):
+        return self.playlist_name
+
+
+class PlaylistSong(models.Model):
+    """
+    Bài hát trong playlist, sắp theo `position` (tăng dần, có khoảng trống giữa các vị trí).
+
+    Chèn hoặc di chuyển một bài chỉ cần một vị trí nằm giữa hai bài kề nhau, nên chỉ ghi
+    đúng dòng đó; khi hết khoảng trống mới đánh số lại cả playlist (xem ordering.py).
+    Dòng thêm qua `playlist.song.add()`/`set()` chưa có vị trí, signal post_add gán vị trí
+    cuối playlist cho chúng.
+    """
+    playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE)
+    song = models.ForeignKey(Song, on_delete=models.CASCADE)
+    position = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        # Giữ bảng của quan hệ nhiều-nhiều cũ, dữ liệu không phải chép sang
+        db_table = 'playlists_playlist_song'
+        unique_together = [('playlist', 'song')]
+        indexes = [
+            models.Index(fields=['playlist', 'position'], name='playlists_song_position_idx'),
+        ]
 
     def __str__(self):
-        return self.playlist_name
\ No newline at end of file
+        return f'{self.playlist_id}:{self.song_id}@{self.position}'
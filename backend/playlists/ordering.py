@@ -0,0 +1,137 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from backend import query_cache
+from .models import Playlist, PlaylistSong
+
+
+def position_gap():
+    return getattr(settings, 'PLAYLIST_POSITION_GAP', 1024)
+
+
+def _lock(playlist_id):
+    # UPDATE updated_at vừa khóa dòng playlist (các thao tác sửa cùng playlist chạy lần lượt)
+    # vừa làm đổi ETag của playlist và danh sách bài hát; tag playlist đổi ETag của danh sách playlist
+    Playlist.objects.filter(pk=playlist_id).update(updated_at=timezone.now())
+    transaction.on_commit(lambda: query_cache.bump('playlist'))
+
+
+def _last_position(playlist_id):
+    return PlaylistSong.objects.filter(playlist_id=playlist_id).aggregate(last=Max('position'))['last'] or 0
+
+
+def _slots(low, high, count):
+    """`count` vị trí cách đều nằm giữa low và high (high None là cuối playlist), None nếu hết chỗ."""
+    if high is None:
+        return [low + position_gap() * (i + 1) for i in range(count)]
+    step = (high - low) // (count + 1)
+    if step < 1:
+        return None
+    return [low + step * (i + 1) for i in range(count)]
+
+
+def _neighbours(playlist_id, before, exclude=None):
+    """Vị trí của bài `before` và của bài ngay trước nó; PlaylistSong.DoesNotExist nếu `before` không có trong playlist."""
+    rows = PlaylistSong.objects.filter(playlist_id=playlist_id)
+    if exclude is not None:
+        rows = rows.exclude(song_id=exclude)
+    high = rows.filter(song_id=before).values_list('position', flat=True).get()
+    if high is None:
+        return None, None
+    low = rows.filter(position__lt=high).order_by('-position').values_list('position', flat=True).first()
+    return low or 0, high
+
+
+def _positions(playlist_id, before, count, exclude=None):
+    if before is None:
+        return _slots(_last_position(playlist_id), None, count)
+    low, high = _neighbours(playlist_id, before, exclude)
+    positions = _slots(low, high, count) if high is not None else None
+    if positions is None:
+        # Hết khoảng trống giữa hai bài kề nhau: đánh số lại rồi tính lại (hiếm khi xảy ra)
+        renumber(playlist_id)
+        low, high = _neighbours(playlist_id, before, exclude)
+        positions = _slots(low, high, count)
+    return positions
+
+
+def renumber(playlist_id):
+    """Đặt lại vị trí của cả playlist thành các bội số của position_gap(), giữ nguyên thứ tự."""
+    rows = list(
+        PlaylistSong.objects.filter(playlist_id=playlist_id)
+        .order_by(F('position').asc(nulls_last=True), 'id')
+        .only('id')
+    )
+    for index, row in enumerate(rows, start=1):
+        row.position = index * position_gap()
+    PlaylistSong.objects.bulk_update(rows, ['position'], batch_size=1000)
+
+
+def fill_missing(playlist_id):
+    """Gán vị trí cuối playlist cho các dòng chưa có (thêm qua playlist.song.add()/set()), theo thứ tự thêm vào."""
+    rows = list(
+        PlaylistSong.objects.filter(playlist_id=playlist_id, position__isnull=True).order_by('id').only('id')
+    )
+    if not rows:
+        return
+    for row, position in zip(rows, _slots(_last_position(playlist_id), None, len(rows))):
+        row.position = position
+    PlaylistSong.objects.bulk_update(rows, ['position'], batch_size=1000)
+
+
+def insert(playlist_id, song_ids, before=None):
+    """
+    Thêm các bài hát vào playlist, ngay trước bài `before` hoặc vào cuối nếu `before` là None.
+    Bài đã có trong playlist được bỏ qua. Trả về id các bài thực sự được thêm.
+    """
+    with transaction.atomic():
+        _lock(playlist_id)
+        existing = set(
+            PlaylistSong.objects.filter(playlist_id=playlist_id, song_id__in=song_ids).values_list('song_id', flat=True)
+        )
+        added = [song_id for song_id in dict.fromkeys(song_ids) if song_id not in existing]
+        if not added:
+            return []
+        positions = _positions(playlist_id, before, len(added))
+        PlaylistSong.objects.bulk_create([
+            PlaylistSong(playlist_id=playlist_id, song_id=song_id, position=position)
+            for song_id, position in zip(added, positions)
+        ])
+        return added
+
+
+def move(playlist_id, song_id, before=None):
+    """
+    Chuyển một bài tới ngay trước bài `before` (hoặc cuối playlist): chỉ ghi một dòng.
+    Trả về False nếu bài không có trong playlist.
+    """
+    with transaction.atomic():
+        _lock(playlist_id)
+        row = PlaylistSong.objects.filter(playlist_id=playlist_id, song_id=song_id).only('id').first()
+        if row is None:
+            return False
+        if before != song_id:
+            position, = _positions(playlist_id, before, 1, exclude=song_id)
+            PlaylistSong.objects.filter(pk=row.pk).update(position=position)
+        return True
+
+
+def remove(playlist_id, song_ids):
+    """Xóa các bài khỏi playlist bằng một câu DELETE; vị trí của các bài còn lại giữ nguyên. Trả về số bài đã xóa."""
+    with transaction.atomic():
+        _lock(playlist_id)
+        deleted, _ = PlaylistSong.objects.filter(playlist_id=playlist_id, song_id__in=song_ids).delete()
+        return deleted
+
+
+def replace(playlist_id, song_ids):
+    """
+    Đặt danh sách bài hát của playlist: xóa bài không còn trong danh sách, thêm bài mới vào
+    cuối theo thứ tự đã cho. Bài đã có giữ nguyên vị trí.
+    """
+    with transaction.atomic():
+        _lock(playlist_id)
+        PlaylistSong.objects.filter(playlist_id=playlist_id).exclude(song_id__in=song_ids).delete()
+        return insert(playlist_id, song_ids)
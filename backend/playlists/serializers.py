@@ -1,23 +1,153 @@
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.conf import settings
 from rest_framework import serializers
-from .models import Playlist
+from .models import Playlist, PlaylistSong
+from . import ordering
 from songs.models import Song
-from songs.serializers import SongSerializer
+from backend.media import SignedMediaModelSerializer, SignedMediaListSerializer
+from images.fields import ImageVariantsField
+from songs.hls import HlsPlaylistField
+
+
+def preview_size():
+    return getattr(settings, 'PLAYLIST_PREVIEW_SIZE', 4)
+
+
+def load_previews(playlists):
+    """
+    Gán `_preview_song_ids` (id của vài bài hát đầu, theo vị trí trong playlist) cho các playlist
+    bằng một query duy nhất: ROW_NUMBER() theo từng playlist, chỉ giữ preview_size() dòng đầu.
+    """
+    previews = {playlist.pk: [] for playlist in playlists}
+    if not previews:
+        return
+    rows = (
+        PlaylistSong.objects
+        .filter(playlist_id__in=previews, song__is_deleted=False)
+        .annotate(rank=Window(
+            RowNumber(), partition_by=F('playlist_id'), order_by=[F('position').asc(), F('id').asc()]
+        ))
+        .filter(rank__lte=preview_size())
+        .order_by('playlist_id', 'position', 'id')
+        .values_list('playlist_id', 'song_id')
+    )
+    for playlist_id, song_id in rows:
+        previews[playlist_id].append(song_id)
+    for playlist in playlists:
+        playlist._preview_song_ids = previews[playlist.pk]
+
+
+class PlaylistListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        load_previews(items)
+        return super().to_representation(items)
+
 
 class PlaylistSerializer(serializers.ModelSerializer):
+    """
+    Playlist kèm số bài hát và id của vài bài đầu; danh sách bài hát đầy đủ lấy theo
+    trang qua /playlists/<id>/tracks/ (PlaylistTrackSerializer).
+    """
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
-
-    song = SongSerializer(many=True, read_only=True)
+    song_count = serializers.SerializerMethodField()
+    preview_song_ids = serializers.SerializerMethodField()
 
     song_id = serializers.PrimaryKeyRelatedField(
-        queryset=Song.objects.all(),
+        queryset=Song.objects.filter(is_deleted=False),
         many=True,
         required=False,
+        write_only=True,
         source='song'
     )
 
     class Meta:
         model = Playlist
-        fields = '__all__'
+        exclude = ['song']
+        list_serializer_class = PlaylistListSerializer
         extra_kwargs = {
             'playlist_cover_url': {'required': False},
         }
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # Số bài hát (chưa bị xóa) đếm trong cùng query với playlist
+        return queryset.annotate(song_count=Count('song', filter=Q(song__is_deleted=False)))
+
+    def create(self, validated_data):
+        songs = validated_data.pop('song', None)
+        instance = super().create(validated_data)
+        if songs:
+            ordering.replace(instance.pk, [song.pk for song in songs])
+        return instance
+
+    def update(self, instance, validated_data):
+        # Chỉ xóa/thêm các bài thay đổi, bài còn lại giữ vị trí (thay vì song.set())
+        songs = validated_data.pop('song', None)
+        instance = super().update(instance, validated_data)
+        if songs is not None:
+            ordering.replace(instance.pk, [song.pk for song in songs])
+        # Số bài hát và preview đã tính trước khi sửa không còn đúng
+        instance.__dict__.pop('song_count', None)
+        instance.__dict__.pop('_preview_song_ids', None)
+        return instance
+
+    def get_song_count(self, obj):
+        count = getattr(obj, 'song_count', None)
+        if count is None:
+            count = obj.song.filter(is_deleted=False).count()
+        return count
+
+    def get_preview_song_ids(self, obj):
+        if not hasattr(obj, '_preview_song_ids'):
+            load_previews([obj])
+        return obj._preview_song_ids
+
+
+class PlaylistTrackSerializer(SignedMediaModelSerializer):
+    """Bài hát trong playlist ở dạng phẳng: chỉ id và tên nghệ sĩ, không lồng ArtistSerializer."""
+    artist_name = serializers.CharField(source='artist.artist_name', read_only=True)
+    thumbnail_variants = ImageVariantsField(source='thumbnail')
+    hls_playlist = HlsPlaylistField()
+
+    class Meta:
+        model = Song
+        fields = [
+            'id', 'song_name', 'artist', 'artist_name', 'duration', 'price', 'plays',
+            'audio', 'hls_playlist', 'thumbnail', 'thumbnail_variants', 'release_date',
+        ]
+        read_only_fields = fields
+        list_serializer_class = SignedMediaListSerializer
+
+
+def max_edit_songs():
+    return getattr(settings, 'PLAYLIST_EDIT_MAX_SONGS', 500)
+
+
+class PlaylistTrackIdsSerializer(serializers.Serializer):
+    """Danh sách id bài hát cho thao tác sửa playlist theo lô (xóa nhiều bài)."""
+    song_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_song_ids(self, value):
+        if len(value) > max_edit_songs():
+            raise serializers.ValidationError(f'Tối đa {max_edit_songs()} bài hát mỗi lần.')
+        return value
+
+
+class PlaylistTrackInsertSerializer(PlaylistTrackIdsSerializer):
+    """Thêm bài hát vào playlist, trước bài `before` hoặc vào cuối nếu không có `before`."""
+    before = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+    def validate_song_ids(self, value):
+        value = super().validate_song_ids(value)
+        found = set(Song.objects.filter(pk__in=value, is_deleted=False).values_list('id', flat=True))
+        missing = [song_id for song_id in value if song_id not in found]
+        if missing:
+            raise serializers.ValidationError(f'Bài hát không tồn tại: {missing}')
+        return value
+
+
+class PlaylistTrackMoveSerializer(serializers.Serializer):
+    """Chuyển bài hát tới ngay trước bài `before`, hoặc xuống cuối playlist nếu `before` là null."""
+    before = serializers.IntegerField(required=False, allow_null=True, default=None)
@@ -0,0 +1,29 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from backend import query_cache
+from backend.conditional import touch_m2m
+from . import ordering
+from .models import Playlist
+
+
+@receiver(post_save, sender=Playlist)
+@receiver(post_delete, sender=Playlist)
+def invalidate_playlist_lists(sender, **kwargs):
+    query_cache.bump('playlist')
+
+
+@receiver(m2m_changed, sender=Playlist.song.through)
+def touch_playlist_songs(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m(Playlist, instance, action, reverse, pk_set)
+    if action.startswith('post_'):
+        query_cache.bump('playlist')
+
+
+@receiver(m2m_changed, sender=Playlist.song.through)
+def position_added_songs(sender, instance, action, reverse, pk_set, **kwargs):
+    # Dòng thêm qua playlist.song.add()/set() (hoặc song.playlist_set.add()) chưa có vị trí
+    if action != 'post_add':
+        return
+    for playlist_id in (pk_set or ()) if reverse else (instance.pk,):
+        ordering.fill_missing(playlist_id)
@@ -1,3 +1,207 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from artists.models import Artist
+from songs.models import Song
+from . import ordering
+from .models import Playlist, PlaylistSong
+
+
+class PlaylistConditionalGetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('listener', password='secret123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.artist = Artist.objects.create(artist_name='Artist')
+        self.songs = [Song.objects.create(artist=self.artist, song_name=f'Song {i}') for i in range(3)]
+        self.playlist = Playlist.objects.create(user=self.user, playlist_name='Mix', description='')
+        self.playlist.song.set(self.songs[:2])
+        self.url = f'/playlists/{self.playlist.id}/'
+
+    def test_detail_returns_304_until_playlist_or_songs_change(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.playlist.song.add(self.songs[2])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.songs[0].song_name = 'Renamed'
+        self.songs[0].save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_collection_etag(self):
+        etag = self.client.get('/playlists/')['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/playlists/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Playlist.objects.create(user=self.user, playlist_name='Other', description='')
+        self.assertEqual(self.client.get('/playlists/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(PLAYLIST_PREVIEW_SIZE=2)
+class PlaylistSongsPayloadTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('listener', password='secret123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.artist = Artist.objects.create(artist_name='Artist')
+        self.songs = [Song.objects.create(artist=self.artist, song_name=f'Song {i}') for i in range(5)]
+        self.playlist = Playlist.objects.create(user=self.user, playlist_name='Mix', description='')
+        for song in self.songs:
+            self.playlist.song.add(song)
+
+    def test_playlist_returns_count_and_preview_instead_of_songs(self):
+        self.songs[0].is_deleted = True
+        self.songs[0].save()
+
+        data = self.client.get(f'/playlists/{self.playlist.id}/').data
+        self.assertNotIn('song', data)
+        self.assertEqual(data['song_count'], 4)
+        self.assertEqual(data['preview_song_ids'], [self.songs[1].id, self.songs[2].id])
+
+    def test_list_query_count_does_not_grow_with_playlists(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get('/playlists/').status_code, 200)
+            return len(queries)
+
+        before = count_queries()
+        for i in range(5):
+            other = Playlist.objects.create(user=self.user, playlist_name=f'Other {i}', description='')
+            other.song.set(self.songs)
+        self.assertEqual(count_queries(), before)
+
+    def test_tracks_are_paginated_in_insertion_order(self):
+        self.songs[3].is_deleted = True
+        self.songs[3].save()
+        url = f'/playlists/{self.playlist.id}/tracks/'
+
+        first = self.client.get(url, {'page_size': 2}).data
+        self.assertEqual([track['id'] for track in first['results']], [self.songs[0].id, self.songs[1].id])
+        self.assertEqual(first['results'][0]['artist_name'], 'Artist')
+        second = self.client.get(first['next']).data
+        self.assertEqual([track['id'] for track in second['results']], [self.songs[2].id, self.songs[4].id])
+        self.assertIsNone(second['next'])
+
+    def test_tracks_etag_changes_with_songs(self):
+        url = f'/playlists/{self.playlist.id}/tracks/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Lượt nghe được ghi bằng UPDATE (songs.plays), không làm đổi ETag
+        Song.objects.filter(pk=self.songs[1].pk).update(plays=10)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.artist.artist_name = 'Renamed'
+        self.artist.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        ordering.move(self.playlist.id, self.songs[0].id)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_tracks_of_deleted_playlist_is_404(self):
+        self.playlist.is_deleted = True
+        self.playlist.save()
+        self.assertEqual(self.client.get(f'/playlists/{self.playlist.id}/tracks/').status_code, 404)
+
+
+class PlaylistTrackOrderingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('listener', password='secret123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.artist = Artist.objects.create(artist_name='Artist')
+        self.songs = [Song.objects.create(artist=self.artist, song_name=f'Song {i}') for i in range(6)]
+        self.playlist = Playlist.objects.create(user=self.user, playlist_name='Mix', description='')
+        self.url = f'/playlists/{self.playlist.id}/tracks/'
+
+    def order(self):
+        return list(
+            PlaylistSong.objects.filter(playlist=self.playlist).order_by('position', 'id').values_list('song_id', flat=True)
+        )
+
+    def ids(self, *indexes):
+        return [self.songs[i].id for i in indexes]
+
+    def test_append_and_insert_before(self):
+        response = self.client.post(self.url, {'song_ids': self.ids(2, 0, 1)}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.order(), self.ids(2, 0, 1))
+
+        response = self.client.post(self.url, {'song_ids': self.ids(3, 4, 0), 'before': self.songs[0].id}, format='json')
+        self.assertEqual(response.data['added'], self.ids(3, 4))
+        self.assertEqual(self.order(), self.ids(2, 3, 4, 0, 1))
+
+        response = self.client.post(self.url, {'song_ids': self.ids(5), 'before': 999999}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_move_updates_a_single_row(self):
+        ordering.insert(self.playlist.id, self.ids(0, 1, 2, 3, 4, 5))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'{self.url}{self.songs[4].id}/', {'before': self.songs[1].id}, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.order(), self.ids(0, 4, 1, 2, 3, 5))
+        writes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith(('UPDATE "playlists_playlist_song"', 'INSERT', 'DELETE'))]
+        self.assertEqual(len(writes), 1)
+
+        self.client.patch(f'{self.url}{self.songs[0].id}/', {'before': None}, format='json')
+        self.assertEqual(self.order(), self.ids(4, 1, 2, 3, 5, 0))
+        self.assertEqual(self.client.patch(f'{self.url}999999/', {}, format='json').status_code, 404)
+
+    @override_settings(PLAYLIST_POSITION_GAP=4)
+    def test_renumbers_when_gap_is_exhausted(self):
+        ordering.insert(self.playlist.id, self.ids(0, 1, 2))
+        for i in (3, 4, 5):
+            ordering.insert(self.playlist.id, self.ids(i), before=self.songs[1].id)
+        self.assertEqual(self.order(), self.ids(0, 3, 4, 5, 1, 2))
+        ordering.move(self.playlist.id, self.songs[2].id, before=self.songs[5].id)
+        ordering.move(self.playlist.id, self.songs[0].id, before=self.songs[5].id)
+        self.assertEqual(self.order(), self.ids(3, 4, 2, 0, 5, 1))
+
+    def test_bulk_remove_and_delete(self):
+        ordering.insert(self.playlist.id, self.ids(0, 1, 2, 3))
+        response = self.client.post(f'{self.url}remove/', {'song_ids': self.ids(1, 3, 5)}, format='json')
+        self.assertEqual(response.data, {'removed': 2})
+        self.assertEqual(self.client.delete(f'{self.url}{self.songs[0].id}/').status_code, 204)
+        self.assertEqual(self.order(), self.ids(2))
+
+    def test_only_owner_can_edit(self):
+        other = User.objects.create_user('other', password='secret123')
+        self.client.force_authenticate(other)
+        response = self.client.post(self.url, {'song_ids': self.ids(0)}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.order(), [])
+
+    def test_related_manager_and_serializer_keep_order(self):
+        ordering.insert(self.playlist.id, self.ids(0, 1))
+        self.playlist.song.add(self.songs[2])
+        self.assertEqual(self.order(), self.ids(0, 1, 2))
+
+        response = self.client.patch(
+            f'/playlists/{self.playlist.id}/', {'song_id': self.ids(5, 1, 4, 0)}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.order(), self.ids(0, 1, 5, 4))
+        self.assertEqual(response.data['song_count'], 4)
+
+    def test_create_orders_validated_songs(self):
+        deleted = Song.objects.create(artist=self.artist, song_name='Deleted', is_deleted=True)
+        payload = {'playlist_name': 'New', 'description': 'Mix', 'song_id': self.ids(3, 1)}
+        response = self.client.post('/playlists/', {**payload, 'song': [999999]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        created = Playlist.objects.get(pk=response.data['id'])
+        self.assertEqual(
+            list(PlaylistSong.objects.filter(playlist=created).order_by('position').values_list('song_id', flat=True)),
+            self.ids(3, 1),
+        )
+
+        response = self.client.post('/playlists/', {**payload, 'song_id': [deleted.id]}, format='json')
+        self.assertEqual(response.status_code, 400)
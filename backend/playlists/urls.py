@@ -1,7 +1,13 @@
 from django.urls import path
-from .views import PlaylistListCreateView, PlaylistRetrieveUpdateDestroyView
+from .views import (
+    PlaylistListCreateView, PlaylistRetrieveUpdateDestroyView, PlaylistTracksView,
+    PlaylistTrackDetailView, PlaylistTracksRemoveView,
+)
 
 urlpatterns = [
     path('', PlaylistListCreateView.as_view(), name='playlist-list-create'),
     path('<int:pk>/', PlaylistRetrieveUpdateDestroyView.as_view(), name='playlist-retrieve-update-destroy'),
+    path('<int:pk>/tracks/', PlaylistTracksView.as_view(), name='playlist-tracks'),
+    path('<int:pk>/tracks/remove/', PlaylistTracksRemoveView.as_view(), name='playlist-tracks-remove'),
+    path('<int:pk>/tracks/<int:song_id>/', PlaylistTrackDetailView.as_view(), name='playlist-track-detail'),
 ]
@@ -1,34 +1,144 @@
-from django.shortcuts import render
-from .models import Playlist
-from .serializers import PlaylistSerializer
+from django.http import Http404
+from django.shortcuts import render, get_object_or_404
+from .models import Playlist, PlaylistSong
+from .serializers import (
+    PlaylistSerializer, PlaylistTrackSerializer, PlaylistTrackIdsSerializer,
+    PlaylistTrackInsertSerializer, PlaylistTrackMoveSerializer,
+)
+from . import ordering
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import permissions, filters
+from backend.conditional import ConditionalGetMixin, make_etag
+from backend.pagination import IdCursorPagination
+from backend.query_cache import get_versions
 
-class PlaylistListCreateView(generics.ListCreateAPIView):
-    queryset = Playlist.objects.filter(is_deleted=False)
+# ETag của playlist gồm version của tag (backend.query_cache) thay vì đọc lại các bài hát:
+# playlist chỉ kèm số bài hát và preview id, bài hát bị xóa mềm làm đổi cả hai (tag song);
+# trang bài hát của playlist chứa thêm tên nghệ sĩ (tag artist). Lượt nghe không đổi ETag.
+PLAYLIST_TAGS = ('song',)
+TRACK_TAGS = ('song', 'artist')
+
+
+def playlist_version(pk):
+    """updated_at của playlist (đổi khi playlist hoặc danh sách bài hát đổi, xem ordering), 404 nếu không có."""
+    return get_object_or_404(Playlist.objects.values_list('updated_at', flat=True), pk=pk, is_deleted=False)
+
+class PlaylistListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
+    queryset = PlaylistSerializer.setup_eager_loading(Playlist.objects.filter(is_deleted=False))
     serializer_class = PlaylistSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['playlist_name', 'description']  
 
-    def perform_create(self, serializer):
-        playlist = serializer.save(user=self.request.user)
-        songs = self.request.data.get('song', [])
-        if songs:
-            playlist.song.set(songs)
-
     def get_queryset(self):
-        return Playlist.objects.filter(is_deleted=False)
+        return PlaylistSerializer.setup_eager_loading(Playlist.objects.filter(is_deleted=False))
 
-class PlaylistRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Playlist.objects.filter(is_deleted=False)
+    def get_list_etag(self):
+        # Tag playlist đổi khi có playlist được tạo, sửa hoặc đổi bài hát (playlists.signals, ordering)
+        return make_etag('playlists', *get_versions(('playlist',) + PLAYLIST_TAGS), self.list_etag_params())
+
+class PlaylistRetrieveUpdateDestroyView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = PlaylistSerializer.setup_eager_loading(Playlist.objects.filter(is_deleted=False))
     serializer_class = PlaylistSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_object_etag(self):
+        updated_at = playlist_version(self.kwargs['pk'])
+        return make_etag('playlist', self.kwargs['pk'], updated_at, *get_versions(PLAYLIST_TAGS))
+
     def destroy(self, request, *args, **kwargs):
         playlist = self.get_object()
         playlist.is_deleted = True
         playlist.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def get_editable_playlist(request, pk):
+    # Chỉ chủ playlist được sửa danh sách bài hát
+    return get_object_or_404(Playlist.objects.only('id'), pk=pk, user=request.user, is_deleted=False)
+
+
+class PlaylistTrackPagination(IdCursorPagination):
+    # Theo vị trí trong playlist (index playlist_id, position)
+    ordering = ('position', 'id')
+
+
+class PlaylistTracksView(ConditionalGetMixin, generics.ListAPIView):
+    """
+    Bài hát của playlist theo trang (cursor): một query cho trang dòng của bảng trung gian
+    kèm bài hát và nghệ sĩ (JOIN), không phụ thuộc độ dài playlist.
+
+    POST `{"song_ids": [...], "before": <id bài hát>}` thêm bài vào trước `before`, hoặc
+    vào cuối nếu không có `before`; chỉ ghi các dòng mới (xem ordering.insert).
+    """
+    serializer_class = PlaylistTrackSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PlaylistTrackPagination
+
+    def get_queryset(self):
+        return (
+            PlaylistSong.objects
+            .filter(playlist_id=self.kwargs['pk'], song__is_deleted=False)
+            .select_related('song__artist')
+            .defer('song__lyrics_text', 'song__source', 'song__artist__artist_bio')
+        )
+
+    def get_list_etag(self):
+        updated_at = playlist_version(self.kwargs['pk'])
+        return make_etag('tracks', self.kwargs['pk'], updated_at, *get_versions(TRACK_TAGS), self.list_etag_params())
+
+    def paginate_queryset(self, queryset):
+        # Phân trang trên dòng của bảng trung gian, serialize bài hát đã JOIN sẵn
+        return [row.song for row in super().paginate_queryset(queryset)]
+
+    def post(self, request, pk):
+        playlist = get_editable_playlist(request, pk)
+        serializer = PlaylistTrackInsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            added = ordering.insert(playlist.id, serializer.validated_data['song_ids'], serializer.validated_data['before'])
+        except PlaylistSong.DoesNotExist:
+            raise ValidationError({'before': 'Bài hát không có trong playlist.'})
+        return Response({'added': added}, status=status.HTTP_201_CREATED)
+
+
+class PlaylistTrackDetailView(APIView):
+    """
+    PATCH `{"before": <id bài hát>|null}` chuyển một bài tới trước `before` (null: xuống cuối),
+    chỉ cập nhật vị trí của chính bài đó. DELETE xóa bài khỏi playlist.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def patch(self, request, pk, song_id):
+        playlist = get_editable_playlist(request, pk)
+        serializer = PlaylistTrackMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            moved = ordering.move(playlist.id, song_id, serializer.validated_data['before'])
+        except PlaylistSong.DoesNotExist:
+            raise ValidationError({'before': 'Bài hát không có trong playlist.'})
+        if not moved:
+            raise Http404
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def delete(self, request, pk, song_id):
+        playlist = get_editable_playlist(request, pk)
+        if not ordering.remove(playlist.id, [song_id]):
+            raise Http404
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PlaylistTracksRemoveView(APIView):
+    """POST `{"song_ids": [...]}` xóa nhiều bài khỏi playlist bằng một câu DELETE."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        playlist = get_editable_playlist(request, pk)
+        serializer = PlaylistTrackIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        removed = ordering.remove(playlist.id, serializer.validated_data['song_ids'])
+        return Response({'removed': removed})
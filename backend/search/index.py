@@ -0,0 +1,200 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When, Window
+from django.db.models.functions import Length, RowNumber
+
+from albums.models import Album
+from artists.models import Artist
+from songs.models import Song, Genres
+from .models import SearchToken
+from .text import tokenize, edit_distance
+
+# Trọng số của từng trường khi tính điểm
+NAME_WEIGHT = 3.0
+ARTIST_WEIGHT = 1.5
+GENRE_WEIGHT = 1.0
+LYRICS_WEIGHT = 0.5
+
+# Hệ số theo kiểu khớp giữa từ khóa và token
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.7
+FUZZY_MATCH = 0.4
+
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+MAX_ROWS_PER_TERM = 5000
+
+KIND_MODELS = {
+    'song': Song,
+    'artist': Artist,
+    'album': Album,
+    'genre': Genres,
+}
+
+
+def kind_of(instance):
+    for kind, model in KIND_MODELS.items():
+        if isinstance(instance, model):
+            return kind
+    return None
+
+
+def _weighted_fields(kind, obj):
+    if kind == 'song':
+        yield obj.song_name, NAME_WEIGHT
+        yield obj.artist.artist_name, ARTIST_WEIGHT
+        for genre in obj.genres.all():
+            yield genre.genre_name, GENRE_WEIGHT
+        yield obj.lyrics_text, LYRICS_WEIGHT
+    elif kind == 'artist':
+        yield obj.artist_name, NAME_WEIGHT
+        for genre in obj.genres.all():
+            yield genre.genre_name, GENRE_WEIGHT
+    elif kind == 'album':
+        yield obj.album_name, NAME_WEIGHT
+        yield obj.artist.artist_name, ARTIST_WEIGHT
+    elif kind == 'genre':
+        yield obj.genre_name, NAME_WEIGHT
+
+
+def build_tokens(kind, obj):
+    """Trả về danh sách SearchToken (chưa lưu) cho một đối tượng, mỗi token giữ trọng số cao nhất."""
+    weights = {}
+    for text, weight in _weighted_fields(kind, obj):
+        for token in tokenize(text):
+            if weights.get(token, 0) < weight:
+                weights[token] = weight
+    return [SearchToken(token=token, kind=kind, object_id=obj.pk, weight=weight) for token, weight in weights.items()]
+
+
+def is_indexable(obj):
+    return not getattr(obj, 'is_deleted', False)
+
+
+def index_queryset(kind, queryset):
+    """Cập nhật index cho nhiều đối tượng cùng loại trong một transaction."""
+    if kind in ('song', 'album'):
+        queryset = queryset.select_related('artist')
+    if kind in ('song', 'artist'):
+        queryset = queryset.prefetch_related('genres')
+
+    objects = list(queryset)
+    with transaction.atomic():
+        SearchToken.objects.filter(kind=kind, object_id__in=[obj.pk for obj in objects]).delete()
+        tokens = []
+        for obj in objects:
+            if is_indexable(obj):
+                tokens.extend(build_tokens(kind, obj))
+        SearchToken.objects.bulk_create(tokens, batch_size=1000)
+    return len(objects)
+
+
+def index_object(obj):
+    kind = kind_of(obj)
+    if kind is not None:
+        index_queryset(kind, type(obj).objects.filter(pk=obj.pk))
+
+
+def remove_object(obj):
+    kind = kind_of(obj)
+    if kind is not None:
+        SearchToken.objects.filter(kind=kind, object_id=obj.pk).delete()
+
+
+def index_in_chunks(kind, queryset, chunk_size=1000):
+    """Như index_queryset nhưng đọc và ghi theo từng khối `chunk_size` đối tượng."""
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), chunk_size):
+        index_queryset(kind, queryset.model.objects.filter(pk__in=ids[start:start + chunk_size]))
+    return len(ids)
+
+
+def rebuild(chunk_size=1000):
+    """Xây lại toàn bộ index, đọc dữ liệu theo từng khối `chunk_size`."""
+    SearchToken.objects.all().delete()
+    counts = {}
+    for kind, model in KIND_MODELS.items():
+        counts[kind] = index_in_chunks(kind, model.objects.all(), chunk_size)
+    return counts
+
+
+def _rows(queryset):
+    return queryset.values_list('token', 'kind', 'object_id', 'weight')
+
+
+def _capped(queryset, *order_by):
+    """Tối đa MAX_ROWS_PER_TERM dòng cho mỗi kind, chọn theo `order_by` (một query)."""
+    ranked = queryset.annotate(
+        rank=Window(RowNumber(), partition_by=F('kind'), order_by=[*order_by, F('object_id').asc()]),
+    )
+    return ranked.filter(rank__lte=MAX_ROWS_PER_TERM).order_by('kind', 'rank')
+
+
+def _term_matches(term, kinds):
+    """
+    Trả về các dòng (token, kind, object_id, weight, hệ số khớp) cho một từ khóa, tối đa
+    MAX_ROWS_PER_TERM dòng cho mỗi kind: token khớp đúng trước, sau đó token bắt đầu bằng
+    từ khóa; trong mỗi nhóm theo weight giảm dần rồi theo token, để kết quả không phụ
+    thuộc thứ tự dòng trong bảng và một kind nhiều token không lấn hết phần của kind khác.
+    """
+    tokens = SearchToken.objects.filter(kind__in=kinds)
+    if len(term) >= MIN_PREFIX_LENGTH:
+        rows = tokens.filter(token__startswith=term)
+    else:
+        rows = tokens.filter(token=term)
+    exact = Case(When(token=term, then=Value(1)), default=Value(0), output_field=IntegerField())
+    matches = [
+        (token, kind, object_id, weight, EXACT_MATCH if token == term else PREFIX_MATCH)
+        for token, kind, object_id, weight in _rows(_capped(rows, exact.desc(), F('weight').desc(), F('token').asc()))
+    ]
+    if matches or len(term) < MIN_FUZZY_LENGTH:
+        return matches
+
+    # Không có kết quả: thử các token sai khác tối đa một ký tự, cùng ký tự đầu
+    candidates = (
+        tokens.filter(token__startswith=term[0])
+        .annotate(length=Length('token'))
+        .filter(length__gte=len(term) - 1, length__lte=len(term) + 1)
+        .values_list('token', flat=True)
+        .distinct()
+    )
+    similar = [token for token in candidates if edit_distance(term, token) <= 1]
+    if not similar:
+        return []
+    rows = _capped(tokens.filter(token__in=similar), F('weight').desc(), F('token').asc())
+    return [
+        (token, kind, object_id, weight, FUZZY_MATCH)
+        for token, kind, object_id, weight in _rows(rows)
+    ]
+
+
+def search(query, kinds=None, limit=20):
+    """
+    Tìm kiếm trên index, trả về dict kind -> danh sách object_id đã xếp hạng.
+
+    Mỗi từ khóa đóng góp điểm cao nhất trong các token khớp của đối tượng.
+    Đối tượng khớp nhiều từ khóa hơn được xếp trước, sau đó theo tổng điểm.
+    """
+    kinds = list(kinds or KIND_MODELS)
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return {kind: [] for kind in kinds}
+
+    scores = defaultdict(float)
+    matched_terms = defaultdict(int)
+    for term in terms:
+        best = {}
+        for token, kind, object_id, weight, factor in _term_matches(term, kinds):
+            key = (kind, object_id)
+            best[key] = max(best.get(key, 0), weight * factor)
+        for key, score in best.items():
+            scores[key] += score
+            matched_terms[key] += 1
+
+    ranked = sorted(scores, key=lambda key: (matched_terms[key], scores[key]), reverse=True)
+    results = {kind: [] for kind in kinds}
+    for kind, object_id in ranked:
+        if len(results[kind]) < limit:
+            results[kind].append(object_id)
+    return results
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from search import index
+
+
+class Command(BaseCommand):
+    help = 'Xây lại toàn bộ inverted index tìm kiếm cho bài hát, nghệ sĩ, album và thể loại'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        counts = index.rebuild(chunk_size=options['chunk_size'])
+        for kind, count in counts.items():
+            self.stdout.write(f'{kind}: {count}')
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
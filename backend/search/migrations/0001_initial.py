@@ -0,0 +1,27 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('song', 'song'), ('artist', 'artist'), ('album', 'album'), ('genre', 'genre')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('weight', models.FloatField(default=1.0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'kind'], name='search_token_kind_idx'), models.Index(fields=['kind', 'object_id'], name='search_object_idx')],
+            },
+        ),
+    ]
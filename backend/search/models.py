@@ -0,0 +1,27 @@
+from django.db import models
+
+searchKind = [
+    ('song', 'song'),
+    ('artist', 'artist'),
+    ('album', 'album'),
+    ('genre', 'genre'),
+]
+
+class SearchToken(models.Model):
+    """
+    Một dòng trong inverted index: token (đã bỏ dấu, viết thường) xuất hiện
+    trong đối tượng (kind, object_id) với trọng số `weight`.
+    """
+    token = models.CharField(max_length=64)
+    kind = models.CharField(max_length=10, choices=searchKind)
+    object_id = models.BigIntegerField()
+    weight = models.FloatField(default=1.0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'kind'], name='search_token_kind_idx'),
+            models.Index(fields=['kind', 'object_id'], name='search_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.token} - {self.kind}:{self.object_id}"
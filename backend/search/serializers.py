@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from albums.serializers import AlbumSerializer
+from artists.serializers import ArtistSummarySerializer
+from songs.serializers import SongSerializer, GenresSerializer
+
+class SearchResultSerializer(serializers.Serializer):
+    songs = SongSerializer(many=True, read_only=True)
+    artists = ArtistSummarySerializer(many=True, read_only=True)
+    albums = AlbumSerializer(many=True, read_only=True)
+    genres = GenresSerializer(many=True, read_only=True)
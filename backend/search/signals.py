@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from albums.models import Album
+from artists.models import Artist
+from songs.models import Song, Genres
+from . import index
+from .tasks import reindex_artist, reindex_genre
+
+
+@receiver(post_save, sender=Song)
+@receiver(post_save, sender=Album)
+def index_saved_object(sender, instance, **kwargs):
+    index.index_object(instance)
+
+
+@receiver(post_init, sender=Artist)
+def remember_artist_name(sender, instance, **kwargs):
+    instance._search_artist_name = instance.__dict__.get('artist_name')
+
+
+@receiver(post_save, sender=Artist)
+def index_saved_artist(sender, instance, created, **kwargs):
+    index.index_object(instance)
+    renamed = instance.artist_name != getattr(instance, '_search_artist_name', None)
+    instance._search_artist_name = instance.artist_name
+    if renamed and not created:
+        # Tên nghệ sĩ nằm trong index của mọi bài hát và album của nghệ sĩ đó: cập nhật trong task queue
+        reindex_artist.delay(instance.pk)
+
+
+@receiver(post_save, sender=Genres)
+def index_saved_genre(sender, instance, created, **kwargs):
+    index.index_object(instance)
+    if not created:
+        # Tên thể loại nằm trong index của mọi bài hát và nghệ sĩ thuộc thể loại đó
+        genre_id = instance.pk
+        transaction.on_commit(lambda: reindex_genre.delay(genre_id))
+
+
+@receiver(post_delete, sender=Song)
+@receiver(post_delete, sender=Album)
+@receiver(post_delete, sender=Artist)
+@receiver(post_delete, sender=Genres)
+def remove_deleted_object(sender, instance, **kwargs):
+    index.remove_object(instance)
+
+
+@receiver(m2m_changed, sender=Song.genres.through)
+@receiver(m2m_changed, sender=Artist.genres.through)
+def index_changed_genres(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # genre.song_set.clear(): post_clear không có pk_set, ghi lại các đối tượng bị gỡ trước khi xóa
+        instance._search_cleared_ids = list(model.objects.filter(genres=instance).values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        index.index_object(instance)
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_search_cleared_ids', None)
+    if pk_set:
+        # Thay đổi từ phía Genres (genre.song_set.add(...)): pk_set là id của bài hát/nghệ sĩ
+        kind = index.kind_of(model())
+        index.index_queryset(kind, model.objects.filter(pk__in=pk_set))
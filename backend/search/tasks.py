@@ -0,0 +1,23 @@
+from albums.models import Album
+from artists.models import Artist
+from songs.models import Song
+from tasks.queue import task
+from . import index
+
+
+@task('search.reindex_artist', priority=-5)
+def reindex_artist(artist_id):
+    """Cập nhật index của bài hát và album của một nghệ sĩ vừa đổi tên (tên nằm trong index của chúng)."""
+    return {
+        'song': index.index_in_chunks('song', Song.objects.filter(artist_id=artist_id)),
+        'album': index.index_in_chunks('album', Album.objects.filter(artist_id=artist_id)),
+    }
+
+
+@task('search.reindex_genre', priority=-5)
+def reindex_genre(genre_id):
+    """Cập nhật index của bài hát và nghệ sĩ thuộc một thể loại vừa đổi tên."""
+    return {
+        'song': index.index_in_chunks('song', Song.objects.filter(genres=genre_id)),
+        'artist': index.index_in_chunks('artist', Artist.objects.filter(genres=genre_id)),
+    }
@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from albums.models import Album
+from artists.models import Artist
+from songs.models import Song, Genres
+from tasks.models import Task
+from tasks.worker import Worker
+from . import index
+from .models import SearchToken
+from .text import fold, tokenize
+
+
+class TextTest(TestCase):
+    def test_fold_removes_vietnamese_diacritics(self):
+        self.assertEqual(fold('Đêm Trăng Tình Yêu'), 'dem trang tinh yeu')
+        self.assertEqual(tokenize('Hãy Trao Cho Anh!'), ['hay', 'trao', 'cho', 'anh'])
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.ballad = Genres.objects.create(genre_name='Ballad')
+        self.artist = Artist.objects.create(artist_name='Sơn Tùng M-TP')
+        self.song = Song.objects.create(artist=self.artist, song_name='Hãy Trao Cho Anh', lyrics_text='bóng ai đó nhẹ nhàng')
+        self.song.genres.add(self.ballad)
+        self.other = Song.objects.create(artist=self.artist, song_name='Nơi Này Có Anh')
+        self.album = Album.objects.create(album_name='Sky Decade', artist=self.artist)
+
+    def test_signals_keep_index_up_to_date(self):
+        self.assertEqual(index.search('trao')['song'], [self.song.id])
+        self.assertEqual(index.search('ballad', kinds=['song'])['song'], [self.song.id])
+
+        self.song.song_name = 'Chúng Ta Của Hiện Tại'
+        self.song.save()
+        self.assertEqual(index.search('trao')['song'], [])
+        self.assertEqual(index.search('hien tai')['song'], [self.song.id])
+
+        self.song.is_deleted = True
+        self.song.save()
+        self.assertFalse(SearchToken.objects.filter(kind='song', object_id=self.song.id).exists())
+
+    def test_clearing_genre_from_genre_side_reindexes_songs(self):
+        self.ballad.song_set.clear()
+        self.assertEqual(index.search('ballad', kinds=['song'])['song'], [])
+
+    def test_artist_rename_reindexes_songs_and_albums(self):
+        self.artist.artist_name = 'Tùng Sơn'
+        self.artist.save()
+        self.assertEqual(Task.objects.get().name, 'search.reindex_artist')
+        Worker().run(burst=True)
+
+        results = index.search('tung son')
+        self.assertEqual(results['artist'], [self.artist.id])
+        self.assertCountEqual(results['song'], [self.song.id, self.other.id])
+        self.assertEqual(results['album'], [self.album.id])
+
+    def test_saving_artist_without_rename_does_not_reindex_songs(self):
+        self.artist.save()
+        self.assertFalse(Task.objects.exists())
+
+    def test_genre_rename_reindexes_songs_in_the_task_queue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ballad.genre_name = 'Acoustic'
+            self.ballad.save()
+        self.assertEqual(index.search('acoustic', kinds=['song'])['song'], [])
+        self.assertEqual(Task.objects.get().name, 'search.reindex_genre')
+
+        Worker().run(burst=True)
+        self.assertEqual(index.search('acoustic', kinds=['song'])['song'], [self.song.id])
+
+    def test_prefix_and_typo_tolerance(self):
+        self.assertEqual(index.search('dec')['album'], [self.album.id])
+        self.assertEqual(index.search('decase')['album'], [self.album.id])
+
+    def test_capped_term_matches_keep_exact_then_heaviest_prefixes(self):
+        SearchToken.objects.bulk_create([
+            SearchToken(token='skyline', kind='genre', object_id=101, weight=1.0),
+            SearchToken(token='skywalker', kind='genre', object_id=102, weight=3.0),
+            SearchToken(token='skyfall', kind='genre', object_id=103, weight=3.0),
+            SearchToken(token='sky', kind='genre', object_id=104, weight=0.5),
+        ])
+        with mock.patch.object(index, 'MAX_ROWS_PER_TERM', 3):
+            matches = index._term_matches('sky', ['genre'])
+        self.assertEqual(
+            [(token, object_id, factor) for token, _, object_id, _, factor in matches],
+            [('sky', 104, index.EXACT_MATCH), ('skyfall', 103, index.PREFIX_MATCH), ('skywalker', 102, index.PREFIX_MATCH)],
+        )
+
+    def test_term_cap_applies_per_kind_and_keeps_heaviest_exact_matches(self):
+        SearchToken.objects.bulk_create([
+            SearchToken(token='sky', kind='genre', object_id=201, weight=0.5),
+            SearchToken(token='sky', kind='genre', object_id=202, weight=3.0),
+            SearchToken(token='sky', kind='artist', object_id=203, weight=1.0),
+        ])
+        with mock.patch.object(index, 'MAX_ROWS_PER_TERM', 1):
+            matches = index._term_matches('sky', ['genre', 'artist'])
+        self.assertCountEqual([(kind, object_id) for _, kind, object_id, _, _ in matches], [('genre', 202), ('artist', 203)])
+
+    def test_name_match_ranks_above_lyrics_match(self):
+        lyrics_only = Song.objects.create(artist=self.artist, song_name='Khác', lyrics_text='trao')
+        self.assertEqual(index.search('trao')['song'], [self.song.id, lyrics_only.id])
+
+    def test_rebuild_matches_incremental_index(self):
+        before = sorted(SearchToken.objects.values_list('token', 'kind', 'object_id', 'weight'))
+        index.rebuild(chunk_size=1)
+        after = sorted(SearchToken.objects.values_list('token', 'kind', 'object_id', 'weight'))
+        self.assertEqual(before, after)
+
+
+class SearchViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        artist = Artist.objects.create(artist_name='Mỹ Tâm')
+        self.song = Song.objects.create(artist=artist, song_name='Đừng Hỏi Em')
+
+    def test_search_endpoint_returns_grouped_results(self):
+        response = self.client.get('/search/', {'q': 'dung hoi'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([song['id'] for song in response.data['songs']], [self.song.id])
+        self.assertEqual(response.data['artists'], [])
+
+    def test_type_filter_and_missing_query(self):
+        response = self.client.get('/search/', {'q': 'my tam', 'type': 'artist'})
+        self.assertEqual(response.data['artists'][0]['artist_name'], 'Mỹ Tâm')
+        self.assertEqual(response.data['songs'], [])
+
+        self.assertEqual(self.client.get('/search/').status_code, 400)
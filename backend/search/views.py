@@ -0,0 +1,55 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from albums.models import Album
+from artists.models import Artist
+from songs.models import Song, Genres
+from songs.serializers import SongSerializer
+from . import index
+from .serializers import SearchResultSerializer
+
+RESULT_KEYS = {
+    'song': 'songs',
+    'artist': 'artists',
+    'album': 'albums',
+    'genre': 'genres',
+}
+
+QUERYSETS = {
+    'song': lambda: SongSerializer.setup_eager_loading(Song.objects.filter(is_deleted=False)),
+    'artist': lambda: Artist.objects.filter(is_deleted=False),
+    'album': lambda: Album.objects.filter(is_deleted=False),
+    'genre': lambda: Genres.objects.all(),
+}
+
+class SearchView(APIView):
+    """
+    Tìm kiếm bài hát, nghệ sĩ, album và thể loại qua inverted index.
+
+    Tham số:
+    - q     : từ khóa (không phân biệt hoa thường, có dấu hay không dấu)
+    - type  : danh sách loại cần tìm, ví dụ `song,artist` (mặc định tất cả)
+    - limit : số kết quả tối đa cho mỗi loại (mặc định 20, tối đa 100)
+    """
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Thiếu tham số q'}, status=status.HTTP_400_BAD_REQUEST)
+
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind in RESULT_KEYS]
+        kinds = kinds or list(RESULT_KEYS)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'limit không hợp lệ'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ranked_ids = index.search(query, kinds=kinds, limit=limit)
+
+        results = {key: [] for key in RESULT_KEYS.values()}
+        for kind, ids in ranked_ids.items():
+            objects = QUERYSETS[kind]().in_bulk(ids)
+            results[RESULT_KEYS[kind]] = [objects[pk] for pk in ids if pk in objects]
+
+        serializer = SearchResultSerializer(results, context={'request': request})
+        return Response(serializer.data)
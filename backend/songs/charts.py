@@ -0,0 +1,86 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Genres, SongTrend, ChartEntry
+
+# Chu kỳ bán rã của điểm xu hướng (giây): một lượt nghe hôm qua có trọng số bằng
+# một nửa lượt nghe hôm nay trong bảng daily, và bằng một nửa sau 7 ngày trong bảng weekly
+HALF_LIVES = {
+    'daily': 24 * 3600,
+    'weekly': 7 * 24 * 3600,
+}
+
+# Mốc thời gian cố định để quy đổi trọng số lượt nghe
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def decay_rate(period):
+    return math.log(2) / HALF_LIVES[period]
+
+
+def log_weight(period, played_at):
+    """log của trọng số lượt nghe tại `played_at`, quy về EPOCH: λ·(t - EPOCH)."""
+    return decay_rate(period) * (played_at - EPOCH).total_seconds()
+
+
+def logaddexp(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def current_score(period, log_score, now=None):
+    """Điểm thực tại thời điểm `now`: Σ 2^(-(now - t_i) / half_life) của các lượt nghe."""
+    return math.exp(log_score - log_weight(period, now or timezone.now()))
+
+
+def record_plays(events):
+    """
+    Cộng các lượt nghe (song_id, played_at) vào SongTrend.
+
+    Vì log_score được quy về EPOCH, thứ tự theo log_score luôn là thứ tự theo điểm
+    hiện tại, nên chỉ các bài hát có lượt nghe mới cần cập nhật. Phải gọi trong transaction.
+    """
+    for period in HALF_LIVES:
+        increments = {}
+        for song_id, played_at in events:
+            weight = log_weight(period, played_at)
+            increments[song_id] = logaddexp(increments[song_id], weight) if song_id in increments else weight
+
+        trends = SongTrend.objects.select_for_update().filter(period=period, song_id__in=increments)
+        existing = {trend.song_id: trend for trend in trends}
+        to_update, to_create = [], []
+        for song_id, increment in increments.items():
+            trend = existing.get(song_id)
+            if trend is None:
+                to_create.append(SongTrend(song_id=song_id, period=period, log_score=increment))
+            else:
+                trend.log_score = logaddexp(trend.log_score, increment)
+                to_update.append(trend)
+        SongTrend.objects.bulk_update(to_update, ['log_score'], batch_size=1000)
+        SongTrend.objects.bulk_create(to_create, batch_size=1000)
+
+
+def refresh_charts():
+    """
+    Tính lại bảng ChartEntry từ SongTrend (top CHART_SIZE theo từng period và thể loại).
+    Chạy bởi worker của task queue mỗi CHART_REFRESH_INTERVAL giây (task songs.refresh_charts).
+    """
+    size = getattr(settings, 'CHART_SIZE', 100)
+    genre_ids = list(Genres.objects.values_list('id', flat=True))
+
+    entries = []
+    for period in HALF_LIVES:
+        live = SongTrend.objects.filter(period=period, song__is_deleted=False).order_by('-log_score', 'song_id')
+        for genre_id in [None] + genre_ids:
+            ranked = live if genre_id is None else live.filter(song__genres__id=genre_id)
+            for rank, (song_id, log_score) in enumerate(ranked.values_list('song_id', 'log_score')[:size], 1):
+                entries.append(ChartEntry(period=period, genre_id=genre_id, rank=rank, song_id=song_id, log_score=log_score))
+
+    with transaction.atomic():
+        ChartEntry.objects.all().delete()
+        ChartEntry.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
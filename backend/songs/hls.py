@@ -0,0 +1,54 @@
+import posixpath
+import re
+
+from django.urls import reverse
+from rest_framework import serializers
+
+from backend.media import signed_urls
+from .transcoding import MASTER_PLAYLIST
+
+# Chỉ các playlist do transcoding ghi ra: master.m3u8 và <bitrate>k/index.m3u8
+PLAYLIST_NAME_RE = re.compile(r'^(master|\d+k/index)\.m3u8$')
+
+CONTENT_TYPE = 'application/vnd.apple.mpegurl'
+
+
+def playlist_path(song_id, name=MASTER_PLAYLIST):
+    return reverse('song-hls', kwargs={'pk': song_id, 'name': name})
+
+
+def rewrite_playlist(text, storage, directory, name, playlist_url):
+    """
+    Đổi các URI tương đối trong playlist `name` (đường dẫn trong thư mục HLS `directory`
+    của storage) thành URL tuyệt đối: playlist con đi qua app (`playlist_url(tên)`),
+    segment lấy URL đã ký của storage. Player không ghép được URI tương đối với URL
+    đã ký (querystring_auth) của playlist nên cần viết lại khi phục vụ.
+    """
+    base = posixpath.dirname(name)
+    lines = []
+    for line in text.splitlines():
+        uri = line.strip()
+        if uri and not uri.startswith('#') and '://' not in uri:
+            target = posixpath.normpath(posixpath.join(base, uri))
+            if target.endswith('.m3u8'):
+                line = playlist_url(target)
+            else:
+                line = signed_urls.storage_url(storage, f'{directory}/{target}')
+        lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+class HlsPlaylistField(serializers.Field):
+    """URL master playlist HLS của bài hát, phục vụ qua songs/<id>/hls/, hoặc None nếu chưa chuyển mã."""
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, song):
+        if not song.hls_playlist:
+            return None
+        url = playlist_path(song.pk)
+        request = self.context.get('request', None)
+        return request.build_absolute_uri(url) if request is not None else url
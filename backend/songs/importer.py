@@ -0,0 +1,398 @@
+import csv
+import json
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework import serializers
+
+from a2a_server.catalog import catalog
+from artists.models import Artist
+from backend import query_cache
+from search import index
+from .models import Genres, Song
+
+FORMATS = ('csv', 'ndjson')
+GENRE_SEPARATOR = '|'
+# Các trường của Song mà file import được phép ghi
+SONG_FIELDS = ('song_name', 'duration', 'price', 'release_date', 'lyrics_text', 'source')
+
+
+def default_chunk_size():
+    return getattr(settings, 'SONG_IMPORT_CHUNK_SIZE', 1000)
+
+
+def max_errors():
+    return getattr(settings, 'SONG_IMPORT_MAX_ERRORS', 1000)
+
+
+def detect_format(name='', content_type=''):
+    """Định dạng theo đuôi file hoặc content type: 'csv', 'ndjson' hoặc None."""
+    name, content_type = (name or '').lower(), (content_type or '').lower()
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return None
+
+
+def _decode(lines):
+    for number, line in enumerate(lines):
+        text = line.decode('utf-8') if isinstance(line, bytes) else line
+        yield text.lstrip('﻿') if number == 0 else text
+
+
+def read_rows(lines, fmt):
+    """
+    Đọc dần từng dòng của file CSV (có header) hoặc NDJSON (mỗi dòng một object).
+    Trả về (số dòng, dict) hoặc (số dòng, thông báo lỗi) cho dòng không đọc được,
+    không đọc cả file vào bộ nhớ.
+    """
+    lines = _decode(lines)
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            if None in row:
+                yield reader.line_num, 'Dòng có nhiều cột hơn header.'
+                continue
+            if row.get('genres'):
+                row['genres'] = [name for name in row['genres'].split(GENRE_SEPARATOR) if name.strip()]
+            yield reader.line_num, row
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, f'JSON không hợp lệ: {exc}'
+            continue
+        if not isinstance(row, dict):
+            yield number, 'Mỗi dòng phải là một object JSON.'
+            continue
+        if isinstance(row.get('genres'), str):
+            row['genres'] = [name for name in row['genres'].split(GENRE_SEPARATOR) if name.strip()]
+        yield number, row
+
+
+class SongImportRowSerializer(serializers.Serializer):
+    """
+    Một dòng của file import. Có `id` là cập nhật bài hát đó; không có `id` thì bài hát
+    được xác định theo nghệ sĩ và tên (cập nhật nếu đã có, tạo mới nếu chưa). Nghệ sĩ
+    cho bằng `artist_id` hoặc tên (`artist`), thể loại bằng tên (`genres`).
+    Ô trống được bỏ qua: giữ giá trị cũ khi cập nhật, giá trị mặc định khi tạo mới.
+    """
+    id = serializers.IntegerField(required=False, min_value=1)
+    song_name = serializers.CharField(required=False, max_length=255)
+    artist_id = serializers.IntegerField(required=False, min_value=1)
+    artist = serializers.CharField(required=False, max_length=255)
+    genres = serializers.ListField(child=serializers.CharField(max_length=255), required=False)
+    duration = serializers.IntegerField(required=False, min_value=0)
+    price = serializers.DecimalField(required=False, max_digits=10, decimal_places=2, min_value=Decimal('0'))
+    release_date = serializers.DateField(required=False)
+    lyrics_text = serializers.CharField(required=False, trim_whitespace=False)
+    source = serializers.CharField(required=False)
+
+    def to_internal_value(self, data):
+        data = {key: value for key, value in data.items() if value not in ('', None)}
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        if 'id' not in attrs:
+            if 'song_name' not in attrs:
+                raise serializers.ValidationError({'song_name': 'Cần tên bài hát khi không có id.'})
+            if 'artist_id' not in attrs and 'artist' not in attrs:
+                raise serializers.ValidationError({'artist': 'Cần artist hoặc artist_id khi không có id.'})
+        return attrs
+
+
+def _name_key(name):
+    return ' '.join(name.split()).casefold()
+
+
+def _id_floor(model):
+    """
+    Id lớn nhất hiện có, đọc trước bulk_create trên database không trả về id của các
+    dòng vừa chèn (MySQL); None nếu database trả về id.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return None
+    return model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+
+class SongImporter:
+    """
+    Nhập bài hát theo lô từ các dòng đã đọc (xem read_rows).
+
+    Mỗi dòng được kiểm tra ngay khi đọc; dòng hợp lệ được gom thành khối `chunk_size`
+    dòng và ghi trong một transaction bằng bulk_create/bulk_update, gồm cả bảng
+    song_genres, nên số query tỉ lệ với số khối chứ không phải số dòng. Nghệ sĩ và thể
+    loại được tra bằng map trong bộ nhớ nạp một lần lúc bắt đầu.
+
+    `allowed_artist_ids` giới hạn các nghệ sĩ được ghi (None: tất cả). Nếu
+    `create_missing`, nghệ sĩ và thể loại chưa có được tạo mới, ngược lại dòng đó bị báo lỗi.
+    bulk_create/bulk_update không phát signal nên index tìm kiếm, version của query
+    cache và snapshot danh mục của A2A agent được cập nhật trực tiếp sau mỗi khối.
+    """
+
+    def __init__(self, allowed_artist_ids=None, create_missing=False, chunk_size=None):
+        self.allowed_artist_ids = allowed_artist_ids
+        self.create_missing = create_missing
+        self.chunk_size = chunk_size or default_chunk_size()
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.artists_created = 0
+        self.genres_created = 0
+        self._load_maps()
+
+    def _load_maps(self):
+        artists = Artist.objects.filter(is_deleted=False).order_by('-id').values_list('id', 'artist_name')
+        self.artist_ids = set()
+        self.artists_by_name = {}
+        # Sắp giảm dần để khi trùng tên, nghệ sĩ có id nhỏ nhất được dùng
+        for artist_id, name in artists.iterator():
+            self.artist_ids.add(artist_id)
+            self.artists_by_name[_name_key(name)] = artist_id
+        self.genres_by_name = {
+            _name_key(name): genre_id for genre_id, name in Genres.objects.values_list('id', 'genre_name')
+        }
+
+    def error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < max_errors():
+            self.errors.append({'line': line, 'errors': errors})
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'artists_created': self.artists_created,
+            'genres_created': self.genres_created,
+            'errors': self.errors,
+        }
+
+    def validate(self, rows):
+        for line, row in rows:
+            if isinstance(row, str):
+                self.error(line, {'non_field_errors': [row]})
+                continue
+            serializer = SongImportRowSerializer(data=row)
+            if serializer.is_valid():
+                yield line, serializer.validated_data
+            else:
+                self.error(line, serializer.errors)
+
+    def run(self, rows):
+        """Nhập toàn bộ các dòng, trả về summary()."""
+        valid = self.validate(rows)
+        while True:
+            chunk = list(islice(valid, self.chunk_size))
+            if not chunk:
+                break
+            counters = (self.created, self.updated, self.failed, len(self.errors), self.artists_created, self.genres_created)
+            try:
+                with transaction.atomic():
+                    self.write_chunk(chunk)
+            except DatabaseError as exc:
+                # Khối đã rollback: bỏ số liệu của nó và nạp lại map (nghệ sĩ/thể loại vừa tạo không còn)
+                self.created, self.updated, self.failed, errors, self.artists_created, self.genres_created = counters
+                del self.errors[errors:]
+                self._load_maps()
+                for line, _ in chunk:
+                    self.error(line, {'non_field_errors': [f'Lỗi database khi ghi khối: {exc}']})
+        return self.summary()
+
+    def _resolve_artists(self, chunk):
+        missing = {}
+        for line, attrs in chunk:
+            if 'artist_id' not in attrs and 'artist' in attrs:
+                key = _name_key(attrs['artist'])
+                if key not in self.artists_by_name and self.create_missing:
+                    missing.setdefault(key, attrs['artist'].strip())
+        if missing:
+            floor = _id_floor(Artist)
+            created = Artist.objects.bulk_create([Artist(artist_name=name) for name in missing.values()])
+            if any(artist.pk is None for artist in created):
+                # Không có id sau bulk_create: đọc lại các dòng mới hơn `floor`, so tên theo
+                # _name_key (collation của MySQL không phân biệt hoa thường), id lớn nhất thắng
+                created = Artist.objects.filter(
+                    id__gt=floor, is_deleted=False, artist_name__in=missing.values(),
+                ).order_by('id')
+            for artist in created:
+                key = _name_key(artist.artist_name)
+                if key in missing:
+                    self.artist_ids.add(artist.pk)
+                    self.artists_by_name[key] = artist.pk
+            self.artists_created += len(missing)
+            index.index_queryset('artist', Artist.objects.filter(pk__in=[self.artists_by_name[key] for key in missing]))
+
+        resolved = []
+        for line, attrs in chunk:
+            if 'artist_id' in attrs:
+                artist_id = attrs['artist_id']
+                if artist_id not in self.artist_ids:
+                    self.error(line, {'artist_id': [f'Không có nghệ sĩ {artist_id}.']})
+                    continue
+                attrs['artist'] = artist_id
+            elif 'artist' in attrs:
+                artist_id = self.artists_by_name.get(_name_key(attrs['artist']))
+                if artist_id is None:
+                    self.error(line, {'artist': [f"Không có nghệ sĩ '{attrs['artist']}'."]})
+                    continue
+                attrs['artist'] = artist_id
+            if 'artist' in attrs and self.allowed_artist_ids is not None and attrs['artist'] not in self.allowed_artist_ids:
+                self.error(line, {'artist': ['Không có quyền nhập bài hát cho nghệ sĩ này.']})
+                continue
+            attrs.pop('artist_id', None)
+            resolved.append((line, attrs))
+        return resolved
+
+    def _resolve_genres(self, chunk):
+        missing = {}
+        for line, attrs in chunk:
+            for name in attrs.get('genres', ()):
+                key = _name_key(name)
+                if key not in self.genres_by_name and self.create_missing:
+                    missing.setdefault(key, name.strip())
+        if missing:
+            Genres.objects.bulk_create([Genres(genre_name=name) for name in missing.values()], ignore_conflicts=True)
+            created = Genres.objects.filter(genre_name__in=missing.values()).values_list('id', 'genre_name')
+            for genre_id, name in created:
+                self.genres_by_name[_name_key(name)] = genre_id
+            self.genres_created += len(missing)
+            index.index_queryset('genre', Genres.objects.filter(pk__in=[genre_id for genre_id, _ in created]))
+
+        resolved = []
+        for line, attrs in chunk:
+            if 'genres' in attrs:
+                unknown = [name for name in attrs['genres'] if _name_key(name) not in self.genres_by_name]
+                if unknown:
+                    self.error(line, {'genres': [f'Không có thể loại {unknown}.']})
+                    continue
+                attrs['genres'] = list(dict.fromkeys(self.genres_by_name[_name_key(name)] for name in attrs['genres']))
+            resolved.append((line, attrs))
+        return resolved
+
+    def _targets(self, chunk):
+        """Id bài hát cần cập nhật của từng dòng (None: tạo mới), kiểm tra id và quyền theo nghệ sĩ."""
+        ids = {attrs['id'] for _, attrs in chunk if 'id' in attrs}
+        # Bài đã xóa mềm không được sửa qua import: id của chúng báo lỗi như id không tồn tại,
+        # khóa tự nhiên trùng bài đã xóa tạo bài mới
+        live = Song.objects.filter(is_deleted=False)
+        owners = dict(live.filter(pk__in=ids).values_list('id', 'artist_id')) if ids else {}
+
+        keyed = [attrs for _, attrs in chunk if 'id' not in attrs]
+        by_key = {}
+        if keyed:
+            existing = live.filter(
+                artist_id__in={attrs['artist'] for attrs in keyed},
+                song_name__in={attrs['song_name'] for attrs in keyed},
+            ).order_by('-id').values_list('id', 'artist_id', 'song_name')
+            for song_id, artist_id, song_name in existing:
+                by_key[(artist_id, song_name)] = song_id
+                owners[song_id] = artist_id
+
+        targets = []
+        for line, attrs in chunk:
+            song_id = attrs.pop('id', None)
+            if song_id is None:
+                song_id = by_key.get((attrs['artist'], attrs['song_name']))
+            elif song_id not in owners:
+                self.error(line, {'id': [f'Không có bài hát {song_id}.']})
+                continue
+            if song_id is not None and self.allowed_artist_ids is not None and owners[song_id] not in self.allowed_artist_ids:
+                self.error(line, {'id': ['Không có quyền sửa bài hát này.']})
+                continue
+            targets.append((line, song_id, attrs))
+        return targets
+
+    def write_chunk(self, chunk):
+        chunk = self._resolve_genres(self._resolve_artists(chunk))
+        # Nhiều dòng cùng một bài hát trong khối: dòng sau ghi đè dòng trước
+        updates, creates = {}, {}
+        for line, song_id, attrs in self._targets(chunk):
+            if song_id is not None:
+                updates.setdefault(song_id, {}).update(attrs)
+            else:
+                creates.setdefault((attrs['artist'], attrs['song_name']), {}).update(attrs)
+
+        genres, created_ids = {}, []
+        if creates:
+            songs = [
+                Song(artist_id=attrs['artist'], **{field: attrs[field] for field in SONG_FIELDS if field in attrs})
+                for attrs in creates.values()
+            ]
+            floor = _id_floor(Song)
+            Song.objects.bulk_create(songs, batch_size=self.chunk_size)
+            if any(song.pk is None for song in songs):
+                # Không có id sau bulk_create: đọc lại theo nghệ sĩ và tên trong các bài còn sống
+                # mới hơn `floor` (không lấy nhầm bài cũ hay bài đã xóa mềm), id lớn nhất thắng
+                found = Song.objects.filter(
+                    id__gt=floor, is_deleted=False,
+                    artist_id__in={key[0] for key in creates}, song_name__in={key[1] for key in creates},
+                ).order_by('id').values_list('artist_id', 'song_name', 'id')
+                ids = {(artist_id, song_name): song_id for artist_id, song_name, song_id in found}
+                for song in songs:
+                    song.pk = song.id = ids[(song.artist_id, song.song_name)]
+            created_ids = [song.pk for song in songs]
+            for song, attrs in zip(songs, creates.values()):
+                if 'genres' in attrs:
+                    genres[song.pk] = attrs['genres']
+            self.created += len(songs)
+
+        if updates:
+            fields = {'updated_at'}
+            for attrs in updates.values():
+                fields.update(field for field in SONG_FIELDS if field in attrs)
+                if 'artist' in attrs:
+                    fields.add('artist')
+            songs = list(Song.objects.filter(pk__in=updates).only(*fields))
+            now = timezone.now()
+            for song in songs:
+                attrs = updates[song.pk]
+                for field in fields & set(SONG_FIELDS):
+                    if field in attrs:
+                        setattr(song, field, attrs[field])
+                if 'artist' in attrs:
+                    song.artist_id = attrs['artist']
+                # bulk_update không chạy auto_now; updated_at dùng cho ETag
+                song.updated_at = now
+                if 'genres' in attrs:
+                    genres[song.pk] = attrs['genres']
+            Song.objects.bulk_update(songs, sorted(fields), batch_size=self.chunk_size)
+            self.updated += len(songs)
+
+        if genres:
+            Through = Song.genres.through
+            replaced = [song_id for song_id in genres if song_id in updates]
+            if replaced:
+                Through.objects.filter(song_id__in=replaced).delete()
+            Through.objects.bulk_create([
+                Through(song_id=song_id, genres_id=genre_id)
+                for song_id, genre_ids in genres.items()
+                for genre_id in genre_ids
+            ], batch_size=self.chunk_size)
+
+        touched = [*created_ids, *updates]
+        if touched:
+            index.index_queryset('song', Song.objects.filter(pk__in=touched))
+        tags = ['song']
+        tags += ['artist'] if self.artists_created else []
+        tags += ['genre'] if self.genres_created else []
+        genres_created = self.genres_created
+
+        def committed():
+            query_cache.bump(*tags)
+            if touched:
+                catalog.refresh_songs(touched)
+            if genres_created:
+                catalog.refresh_genres()
+
+        transaction.on_commit(committed)
@@ -0,0 +1,46 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from songs.importer import FORMATS, SongImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Nhập/cập nhật bài hát theo lô từ file CSV hoặc NDJSON (dùng "-" để đọc từ stdin)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help='Mặc định đoán theo đuôi file')
+        parser.add_argument('--create-missing', action='store_true', help='Tạo nghệ sĩ và thể loại chưa có')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Mặc định SONG_IMPORT_CHUNK_SIZE')
+        parser.add_argument('--errors', help='Ghi lỗi theo dòng ra file NDJSON')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        if fmt is None:
+            raise CommandError('Không đoán được định dạng, dùng --format csv|ndjson')
+
+        importer = SongImporter(create_missing=options['create_missing'], chunk_size=options['chunk_size'])
+        if path == '-':
+            summary = importer.run(read_rows(sys.stdin, fmt))
+        else:
+            try:
+                with open(path, encoding='utf-8', newline='') as lines:
+                    summary = importer.run(read_rows(lines, fmt))
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8') as output:
+                for error in summary['errors']:
+                    output.write(json.dumps(error, ensure_ascii=False) + '\n')
+        for error in summary['errors'][:10]:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+
+        message = (
+            f"Songs imported: {summary['created']} created, {summary['updated']} updated, {summary['failed']} failed "
+            f"({summary['artists_created']} artists, {summary['genres_created']} genres created)"
+        )
+        self.stdout.write(self.style.SUCCESS(message) if not summary['failed'] else self.style.WARNING(message))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from songs.charts import refresh_charts
+
+
+class Command(BaseCommand):
+    help = 'Tính lại bảng xếp hạng bài hát (daily/weekly, toàn bộ và theo thể loại) từ điểm xu hướng'
+
+    def handle(self, *args, **options):
+        count = refresh_charts()
+        self.stdout.write(self.style.SUCCESS(f'Charts refreshed: {count} entries'))
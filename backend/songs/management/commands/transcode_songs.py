@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from songs.models import Song
+from songs.transcoding import enqueue, run_pending
+
+
+class Command(BaseCommand):
+    help = 'Chạy các job chuyển mã HLS đang chờ; --missing tạo job cho bài hát có audio nhưng chưa có HLS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help='Tạo job cho bài hát chưa có hls_playlist')
+        parser.add_argument('--limit', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['missing']:
+            songs = Song.objects.filter(Q(hls_playlist='') | Q(hls_playlist__isnull=True), is_deleted=False)
+            songs = songs.exclude(Q(audio='') | Q(audio__isnull=True))
+            for song in songs.iterator():
+                enqueue(song)
+        results = run_pending(options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Transcode jobs: {results.count('done')} done, {results.count('failed')} failed, "
+            f"{results.count('cancelled')} cancelled"
+        ))
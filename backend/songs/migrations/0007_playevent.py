@@ -0,0 +1,29 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('songs', '0006_song_thumbnail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='songs.song')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['played_at'], name='songs_play_played_at_idx'), models.Index(fields=['song', 'played_at'], name='songs_play_song_time_idx')],
+            },
+        ),
+    ]
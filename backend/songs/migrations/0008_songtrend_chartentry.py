@@ -0,0 +1,42 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0007_playevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SongTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('daily', 'daily'), ('weekly', 'weekly')], max_length=10)),
+                ('log_score', models.FloatField()),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='songs.song')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', '-log_score'], name='songs_trend_rank_idx')],
+                'unique_together': {('song', 'period')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ChartEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('daily', 'daily'), ('weekly', 'weekly')], max_length=10)),
+                ('rank', models.PositiveIntegerField()),
+                ('log_score', models.FloatField()),
+                ('genre', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='songs.genres')),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='songs.song')),
+            ],
+            options={
+                'ordering': ['rank'],
+                'unique_together': {('period', 'genre', 'rank')},
+            },
+        ),
+    ]
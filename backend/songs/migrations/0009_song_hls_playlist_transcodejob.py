@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0008_songtrend_chartentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='hls_playlist',
+            field=models.FileField(blank=True, editable=False, null=True, upload_to='hls/'),
+        ),
+        migrations.CreateModel(
+            name='TranscodeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed'), ('cancelled', 'cancelled')], default='pending', max_length=10)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transcode_jobs', to='songs.song')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='songs_transcode_status_idx')],
+            },
+        ),
+    ]
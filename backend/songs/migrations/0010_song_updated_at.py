@@ -0,0 +1,20 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0009_song_hls_playlist_transcodejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0010_song_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(fields=['is_deleted', '-id'], name='songs_song_deleted_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(fields=['artist', 'is_deleted'], name='songs_song_artist_live_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('songs', '0011_song_songs_song_deleted_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcodejob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.auth.models import User
 from django.utils import timezone
 
 class Genres(models.Model):
@@ -21,7 +22,102 @@ class Song(models.Model):
     is_deleted = models.BooleanField(default=False)
     release_date = models.DateField(null=True, blank=True, default=timezone.now)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    
+    # Master playlist HLS do songs.transcoding tạo ra từ audio
+    hls_playlist = models.FileField(upload_to='hls/', null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Danh sách luôn lọc is_deleted = False và sắp theo -id (cursor pagination): index ghép
+        # (is_deleted, id) dùng được trên mọi database (MySQL không hỗ trợ index có điều kiện).
+        indexes = [
+            models.Index(fields=['is_deleted', '-id'], name='songs_song_deleted_id_idx'),
+            models.Index(fields=['artist', 'is_deleted'], name='songs_song_artist_live_idx'),
+        ]
+
+    def __str__(self):
+        return self.song_name
+
+    def save(self, *args, **kwargs):
+        # plays chỉ được tăng bằng F('plays') + n trong songs.plays, không ghi đè giá trị đã đọc
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name != 'plays'
+            ]
+        super().save(*args, **kwargs)
+
+class PlayEvent(models.Model):
+    """Nhật ký lượt nghe thô, dùng cho thống kê và bảng xếp hạng."""
+    song = models.ForeignKey(Song, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    played_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['played_at'], name='songs_play_played_at_idx'),
+            models.Index(fields=['song', 'played_at'], name='songs_play_song_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.song_id} - {self.played_at}"
+
+chartPeriod = [
+    ('daily', 'daily'),
+    ('weekly', 'weekly'),
+]
+
+class SongTrend(models.Model):
+    """
+    Điểm xu hướng của bài hát, giảm dần theo thời gian (xem songs.charts).
+
+    Lưu dưới dạng log của tổng trọng số lượt nghe quy về một mốc cố định, nên có thể
+    cộng dồn từng lô lượt nghe và sắp xếp trực tiếp mà không cần tính lại.
+    """
+    song = models.ForeignKey(Song, on_delete=models.CASCADE)
+    period = models.CharField(max_length=10, choices=chartPeriod)
+    log_score = models.FloatField()
+
+    class Meta:
+        unique_together = ('song', 'period')
+        indexes = [
+            models.Index(fields=['period', '-log_score'], name='songs_trend_rank_idx'),
+        ]
+
+class ChartEntry(models.Model):
+    """Bảng xếp hạng đã tính sẵn: top bài hát theo period, toàn bộ (genre rỗng) hoặc theo thể loại."""
+    period = models.CharField(max_length=10, choices=chartPeriod)
+    genre = models.ForeignKey(Genres, on_delete=models.CASCADE, null=True, blank=True)
+    rank = models.PositiveIntegerField()
+    song = models.ForeignKey(Song, on_delete=models.CASCADE)
+    log_score = models.FloatField()
+
+    class Meta:
+        unique_together = ('period', 'genre', 'rank')
+        ordering = ['rank']
+
+transcodeStatus = [
+    ('pending', 'pending'),
+    ('running', 'running'),
+    ('done', 'done'),
+    ('failed', 'failed'),
+    ('cancelled', 'cancelled'),
+]
+
+class TranscodeJob(models.Model):
+    """Một lần chuyển mã audio của bài hát sang HLS nhiều bitrate (xem songs.transcoding)."""
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name='transcode_jobs')
+    source = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=transcodeStatus, default='pending')
+    error = models.TextField(null=True, blank=True)
+    # Số lần worker đã nhận job (job kẹt ở running được reclaim_stale_jobs đưa lại)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='songs_transcode_status_idx'),
+        ]
 
     def __str__(self):
-        return self.song_name
\ No newline at end of file
+        return f"{self.song_id} - {self.status}"
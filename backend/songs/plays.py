@@ -0,0 +1,132 @@
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from tasks.queue import enqueue as enqueue_task
+from .models import Song, PlayEvent
+from . import charts
+
+logger = logging.getLogger(__name__)
+
+
+def write_plays(events):
+    """
+    Ghi một lô lượt nghe (song_id, user_id, played_at) trong một transaction, trả về số
+    lượt đã ghi. Lượt nghe của bài hát không tồn tại bị bỏ.
+    """
+    counts = Counter(song_id for song_id, _, _ in events)
+    existing = set(Song.objects.filter(id__in=counts).values_list('id', flat=True))
+    events = [event for event in events if event[0] in existing]
+
+    by_increment = defaultdict(list)
+    for song_id in existing:
+        by_increment[counts[song_id]].append(song_id)
+
+    with transaction.atomic():
+        PlayEvent.objects.bulk_create(
+            [PlayEvent(song_id=song_id, user_id=user_id, played_at=played_at) for song_id, user_id, played_at in events],
+            batch_size=1000,
+        )
+        for increment, song_ids in by_increment.items():
+            Song.objects.filter(id__in=song_ids).update(plays=F('plays') + increment)
+        charts.record_plays([(song_id, played_at) for song_id, _, played_at in events])
+    return len(events)
+
+
+def serialize_events(events):
+    return [[song_id, user_id, played_at.isoformat()] for song_id, user_id, played_at in events]
+
+
+def deserialize_events(events):
+    return [(song_id, user_id, parse_datetime(played_at)) for song_id, user_id, played_at in events]
+
+
+class PlayBuffer:
+    """
+    Gom lượt nghe trong bộ nhớ rồi ghi xuống database theo lô.
+
+    Mỗi lần flush ghi toàn bộ PlayEvent bằng một bulk_create, cộng `plays` bằng
+    `UPDATE ... SET plays = plays + n WHERE id IN (...)`, nhóm theo n, và cộng điểm
+    xu hướng cho bảng xếp hạng (songs.charts). Nhờ vậy lượt
+    nghe không bị mất khi nhiều request cùng tăng một bài hát, và bài hát đang hot
+    không bị khóa dòng liên tục.
+
+    Buffer được flush sau mỗi PLAY_FLUSH_INTERVAL giây (thread nền, đặt 0 để tắt) và
+    khi process kết thúc. Khi đủ PLAY_BUFFER_MAX lượt nghe, cả lô được chuyển cho worker
+    (task songs.write_plays) thay vì ghi ngay trong request đang gọi record().
+    """
+
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def record(self, song_id, user_id=None, played_at=None):
+        with self._lock:
+            self._events.append((song_id, user_id, played_at or timezone.now()))
+            full = None
+            if len(self._events) >= getattr(settings, 'PLAY_BUFFER_MAX', 1000):
+                full, self._events = self._events, []
+            else:
+                self._schedule_flush()
+        if full:
+            self._hand_off(full)
+
+    def _hand_off(self, events):
+        """Đưa lô lượt nghe vào hàng đợi; lỗi chỉ được ghi log, lượt nghe trả về buffer."""
+        try:
+            enqueue_task('songs.write_plays', [serialize_events(events)])
+        except Exception:
+            logger.exception('Could not enqueue %s buffered plays', len(events))
+            self._restore(events)
+            with self._lock:
+                self._schedule_flush()
+
+    def _restore(self, events):
+        with self._lock:
+            self._events[:0] = events
+
+    def pending(self):
+        with self._lock:
+            return len(self._events)
+
+    def _schedule_flush(self):
+        interval = getattr(settings, 'PLAY_FLUSH_INTERVAL', 5)
+        if interval and self._timer is None:
+            self._timer = threading.Timer(interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Play buffer flush failed')
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Ghi các lượt nghe đang chờ, trả về số lượt đã ghi."""
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return 0
+        try:
+            return write_plays(events)
+        except Exception:
+            # Ghi thất bại: trả lượt nghe về buffer để lần flush sau thử lại
+            self._restore(events)
+            raise
+
+
+play_buffer = PlayBuffer()
@@ -1,22 +1,49 @@
 from rest_framework import serializers
-from .models import Song, Genres
-from artists.serializers import ArtistSerializer
+from .models import Song, Genres, ChartEntry
+from .charts import current_score
+from artists.serializers import ArtistSummarySerializer
+from backend.media import SignedMediaModelSerializer, SignedMediaListSerializer
+from images.fields import ImageVariantsField
+from .hls import HlsPlaylistField
 
-class SongSerializer(serializers.ModelSerializer):
-    artist = ArtistSerializer(read_only=True)
+class SongSerializer(SignedMediaModelSerializer):
+    artist = ArtistSummarySerializer(read_only=True)
+    thumbnail_variants = ImageVariantsField(source='thumbnail')
+    hls_playlist = HlsPlaylistField()
 
     class Meta:
         model = Song
         fields = '__all__'
+        list_serializer_class = SignedMediaListSerializer
+        # plays chỉ được tăng qua endpoint play (songs.plays)
+        read_only_fields = ['plays']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # Lấy artist bằng JOIN và genres bằng một query prefetch duy nhất
+        return queryset.select_related('artist').prefetch_related('genres')
+
+class SongSimpleSerializer(SignedMediaModelSerializer):
+    hls_playlist = HlsPlaylistField()
 
-class SongSimpleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Song
         fields = '__all__'
+        list_serializer_class = SignedMediaListSerializer
 
 class GenresSerializer(serializers.ModelSerializer):
     class Meta:
         model = Genres
         fields = '__all__'
 
+class ChartEntrySerializer(serializers.ModelSerializer):
+    song = SongSerializer(read_only=True)
+    score = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChartEntry
+        fields = ['rank', 'score', 'song']
+
+    def get_score(self, obj):
+        return round(current_score(obj.period, obj.log_score), 4)
 
@@ -0,0 +1,49 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from backend import query_cache
+from backend.conditional import touch_m2m
+from .models import Song, Genres
+from . import transcoding
+
+_UNKNOWN = object()
+
+
+def _audio_name(instance):
+    # Đọc trực tiếp giá trị đã load, tránh query thêm khi audio bị defer
+    value = instance.__dict__.get('audio', _UNKNOWN)
+    return getattr(value, 'name', value)
+
+
+@receiver(post_init, sender=Song)
+def remember_audio(sender, instance, **kwargs):
+    instance._original_audio = _audio_name(instance)
+
+
+@receiver(post_save, sender=Song)
+def transcode_new_audio(sender, instance, created, **kwargs):
+    original = getattr(instance, '_original_audio', _UNKNOWN)
+    current = _audio_name(instance)
+    instance._original_audio = current
+    if original is _UNKNOWN or current is _UNKNOWN or not current:
+        return
+    if created or current != original:
+        transcoding.enqueue(instance)
+
+
+@receiver(post_save, sender=Song)
+@receiver(post_delete, sender=Song)
+@receiver(m2m_changed, sender=Song.genres.through)
+def invalidate_song_lists(sender, **kwargs):
+    query_cache.bump('song')
+
+
+@receiver(post_save, sender=Genres)
+@receiver(post_delete, sender=Genres)
+def invalidate_genre_lists(sender, **kwargs):
+    query_cache.bump('genre')
+
+
+@receiver(m2m_changed, sender=Song.genres.through)
+def touch_song_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m(Song, instance, action, reverse, pk_set)
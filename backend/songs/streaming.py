@@ -0,0 +1,162 @@
+import hashlib
+import mimetypes
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe, parse_etags, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def chunk_size():
+    return getattr(settings, 'STREAM_CHUNK_SIZE', 64 * 1024)
+
+
+def file_metadata(field_file):
+    """Trả về (size, mtime hoặc None, etag) của file, chỉ hỏi storage, không mở file."""
+    storage, name = field_file.storage, field_file.name
+    size = storage.size(name)
+    try:
+        modified = storage.get_modified_time(name)
+    except (NotImplementedError, AttributeError):
+        modified = None
+    mtime = int(modified.timestamp()) if modified else None
+    digest = hashlib.md5(f'{name}:{size}:{mtime}'.encode()).hexdigest()
+    return size, mtime, quote_etag(digest)
+
+
+def parse_range(header, size):
+    """
+    Phân tích header Range, chỉ hỗ trợ một khoảng byte (đủ cho trình phát audio).
+
+    Trả về (start, end) bao gồm cả end, None nếu không có/không hỗ trợ
+    (phục vụ toàn bộ file), hoặc False nếu khoảng không thỏa mãn được (416).
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N: N byte cuối
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags or f'W/{etag}' in etags
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return bool(mtime and if_modified_since and mtime <= if_modified_since)
+
+
+def range_allowed(request, etag, mtime):
+    """If-Range: chỉ trả một phần nếu validator khớp với phiên bản hiện tại của file."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return bool(mtime and since and mtime == since)
+
+
+def _s3_chunks(storage, name, start, end):
+    # Với S3 chỉ GET đúng khoảng byte cần thiết; storage.open() sẽ tải cả file về trước khi seek.
+    body = storage.bucket.Object(storage._normalize_name(name)).get(Range=f'bytes={start}-{end}')['Body']
+    try:
+        yield from body.iter_chunks(chunk_size())
+    finally:
+        body.close()
+
+
+def _file_chunks(storage, name, start, end):
+    with storage.open(name, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = f.read(min(chunk_size(), remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def iter_range(field_file, start, end):
+    """Generator đọc file theo từng chunk trong khoảng [start, end] qua storage backend."""
+    storage, name = field_file.storage, field_file.name
+    if end < start:
+        return iter([])
+    if hasattr(storage, 'bucket'):
+        return _s3_chunks(storage, name, start, end)
+    return _file_chunks(storage, name, start, end)
+
+
+async def _aiter(iterator):
+    # Dưới ASGI, Django sẽ gom cả iterator đồng bộ vào một list trước khi gửi,
+    # nên đọc từng chunk trong thread pool để giữ bộ nhớ ở mức một chunk.
+    sentinel = object()
+    try:
+        while True:
+            chunk = await sync_to_async(next, thread_sensitive=False)(iterator, sentinel)
+            if chunk is sentinel:
+                break
+            yield chunk
+    finally:
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close, thread_sensitive=False)()
+
+
+def serve_file(request, field_file):
+    """
+    Phục vụ một FileField với hỗ trợ Range (206/416), ETag, Last-Modified và 304.
+
+    Nội dung được stream từ storage theo chunk, không nạp cả file vào bộ nhớ.
+    """
+    size, mtime, etag = file_metadata(field_file)
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': etag,
+        'Cache-Control': 'private, max-age=0, must-revalidate',
+    }
+    if mtime:
+        headers['Last-Modified'] = http_date(mtime)
+
+    if not_modified(request, etag, mtime):
+        return HttpResponse(status=304, headers=headers)
+
+    byte_range = None
+    if range_allowed(request, etag, mtime):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is False:
+        headers['Content-Range'] = f'bytes */{size}'
+        return HttpResponse(status=416, headers=headers)
+
+    status = 200
+    start, end = 0, size - 1
+    if byte_range:
+        start, end = byte_range
+        status = 206
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    content_type = mimetypes.guess_type(field_file.name)[0] or 'application/octet-stream'
+    chunks = iter_range(field_file, start, end)
+    # request có thể là Request của DRF, bọc HttpRequest gốc trong _request
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _aiter(chunks)
+    response = StreamingHttpResponse(chunks, status=status, content_type=content_type, headers=headers)
+    response['Content-Length'] = str(end - start + 1)
+    return response
@@ -0,0 +1,30 @@
+from django.conf import settings
+
+from tasks.queue import task
+from . import charts
+from .plays import deserialize_events, write_plays as write_events
+from .transcoding import process_job, reclaim_stale_jobs
+
+
+@task('songs.transcode', priority=-10, max_attempts=1)
+def transcode(job_id):
+    """Chuyển mã một TranscodeJob sang HLS; lỗi được ghi vào job nên task không thử lại."""
+    return process_job(job_id)
+
+
+@task('songs.write_plays', priority=5)
+def write_plays(events):
+    """Ghi một lô lượt nghe mà PlayBuffer chuyển sang khi buffer đầy."""
+    return write_events(deserialize_events(events))
+
+
+@task('songs.refresh_charts', every=getattr(settings, 'CHART_REFRESH_INTERVAL', 60))
+def refresh_charts():
+    """Tính lại bảng xếp hạng từ điểm xu hướng (songs.charts)."""
+    return charts.refresh_charts()
+
+
+@task('songs.reclaim_transcodes', every=getattr(settings, 'TRANSCODE_RECLAIM_INTERVAL', 300))
+def reclaim_transcodes():
+    """Chuyển mã lại các job bị bỏ dở khi worker dừng giữa chừng."""
+    return reclaim_stale_jobs()
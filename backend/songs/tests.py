@@ -1,3 +1,677 @@
-from django.test import TestCase
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile, File
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from a2a_server.catalog import catalog
+from artists.models import Artist
+from backend.media import signed_urls
+from backend.pagination import IdCursorPagination
+from backend.tests import FakeSigningStorage
+from tasks.models import Task
+from tasks.worker import Worker
+from search.models import SearchToken
+from .models import Song, Genres, PlayEvent, SongTrend, TranscodeJob
+from . import charts, transcoding
+from .plays import play_buffer
+
+
+class SongListQueryCountTest(TestCase):
+    """Số query khi liệt kê bài hát không được tăng theo số bài hát."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        self.genres = [Genres.objects.create(genre_name=f'Genre {i}') for i in range(3)]
+        self.artists = [Artist.objects.create(artist_name=f'Artist {i}') for i in range(4)]
+
+    def create_songs(self, count):
+        for i in range(count):
+            song = Song.objects.create(artist=self.artists[i % len(self.artists)], song_name=f'Song {i}')
+            song.genres.set(self.genres[: i % len(self.genres) + 1])
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/songs/', {'page_size': 100})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data['results']
+
+    def test_song_list_query_count_is_constant(self):
+        self.create_songs(5)
+        small_count, _ = self.count_list_queries()
+
+        self.create_songs(50)
+        large_count, data = self.count_list_queries()
+
+        self.assertEqual(len(data), 55)
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, 2)
+
+    def test_song_list_uses_artist_summary(self):
+        self.create_songs(2)
+        _, data = self.count_list_queries()
+
+        artist = data[0]['artist']
+        self.assertEqual(set(artist), {'id', 'artist_name', 'artist_picture_url', 'artist_picture_variants', 'user'})
+        self.assertNotIn('songs', artist)
+
+
+class ArtistListQueryCountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        genre = Genres.objects.create(genre_name='Pop')
+        for i in range(10):
+            artist = Artist.objects.create(artist_name=f'Artist {i}')
+            for j in range(3):
+                Song.objects.create(artist=artist, song_name=f'Song {i}-{j}').genres.add(genre)
+
+    def test_artist_list_prefetches_songs(self):
+        with self.assertNumQueries(4):
+            response = self.client.get('/artists/')
+        results = response.data['results']
+        self.assertEqual(len(results), 10)
+        self.assertEqual(len(results[0]['songs']), 3)
+
+
+class SongListPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        artist = Artist.objects.create(artist_name='Artist')
+        Song.objects.bulk_create([Song(artist=artist, song_name=f'Song {i}') for i in range(25)])
+
+    def test_cursor_pages_cover_every_song_once(self):
+        seen = []
+        response = self.client.get('/songs/', {'page_size': 10})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen.extend(song['id'] for song in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(IdCursorPagination, 'max_page_size', 5):
+            response = self.client.get('/songs/', {'page_size': 10000})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNotNone(response.data['next'])
+
+
+@override_settings(PLAY_FLUSH_INTERVAL=0, PLAY_BUFFER_MAX=1000)
+class PlayPipelineTest(TestCase):
+    def setUp(self):
+        play_buffer.flush()
+        self.user = User.objects.create_user('listener', password='secret123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        artist = Artist.objects.create(artist_name='Artist')
+        self.hit = Song.objects.create(artist=artist, song_name='Hit')
+        self.other = Song.objects.create(artist=artist, song_name='Other')
+
+    def test_play_endpoint_buffers_without_writing(self):
+        with self.assertNumQueries(0):
+            response = self.client.post(f'/songs/{self.hit.id}/play/')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(play_buffer.pending(), 1)
+        self.hit.refresh_from_db()
+        self.assertEqual(self.hit.plays, 0)
+
+    def test_flush_aggregates_increments_and_logs_events(self):
+        for _ in range(5):
+            play_buffer.record(self.hit.id, self.user.id)
+        play_buffer.record(self.other.id)
+        play_buffer.record(999999)
+
+        # kiểm tra bài hát, bulk insert, 2 UPDATE (n=5 và n=1), đọc và tạo SongTrend cho 2 period,
+        # cộng SAVEPOINT/RELEASE của transaction
+        with self.assertNumQueries(10):
+            self.assertEqual(play_buffer.flush(), 6)
+
+        self.hit.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.hit.plays, self.other.plays), (5, 1))
+        self.assertEqual(PlayEvent.objects.filter(song=self.hit, user=self.user).count(), 5)
+        self.assertEqual(play_buffer.pending(), 0)
+
+    @override_settings(PLAY_BUFFER_MAX=3)
+    def test_full_buffer_is_written_by_the_worker(self):
+        for _ in range(2):
+            play_buffer.record(self.hit.id)
+        with self.assertNumQueries(1):
+            response = self.client.post(f'/songs/{self.hit.id}/play/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((play_buffer.pending(), Task.objects.get().name), (0, 'songs.write_plays'))
+
+        Worker().run(burst=True)
+        self.hit.refresh_from_db()
+        self.assertEqual(self.hit.plays, 3)
+        self.assertEqual(PlayEvent.objects.filter(song=self.hit, user=self.user).count(), 1)
+
+    @override_settings(PLAY_BUFFER_MAX=2)
+    def test_failed_hand_off_keeps_plays_without_failing_the_request(self):
+        play_buffer.record(self.hit.id)
+        with mock.patch('songs.plays.enqueue_task', side_effect=DatabaseError('down')):
+            with self.assertLogs('songs.plays', 'ERROR'):
+                response = self.client.post(f'/songs/{self.hit.id}/play/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(play_buffer.pending(), 2)
+
+    def test_saving_a_stale_song_does_not_overwrite_plays(self):
+        stale = Song.objects.get(id=self.hit.id)
+        play_buffer.record(self.hit.id)
+        play_buffer.flush()
+
+        stale.song_name = 'Renamed'
+        stale.save()
+
+        self.hit.refresh_from_db()
+        self.assertEqual((self.hit.song_name, self.hit.plays), ('Renamed', 1))
+
+    def test_plays_cannot_be_set_through_the_api(self):
+        response = self.client.patch(f'/songs/{self.hit.id}/', {'plays': 1000}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.hit.refresh_from_db()
+        self.assertEqual(self.hit.plays, 0)
+
+
+@override_settings(PLAY_FLUSH_INTERVAL=0)
+class ChartsTest(TestCase):
+    def setUp(self):
+        play_buffer.flush()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        self.pop = Genres.objects.create(genre_name='Pop')
+        self.rock = Genres.objects.create(genre_name='Rock')
+        self.artist = Artist.objects.create(artist_name='Artist')
+
+    def make_song(self, name, genre):
+        song = Song.objects.create(artist=self.artist, song_name=name)
+        song.genres.add(genre)
+        return song
+
+    def play(self, song, count, played_at=None):
+        for _ in range(count):
+            play_buffer.record(song.id, played_at=played_at)
+
+    def chart(self, **params):
+        response = self.client.get('/songs/charts/', params)
+        self.assertEqual(response.status_code, 200)
+        return [entry['song']['song_name'] for entry in response.data]
+
+    def test_recent_plays_outrank_older_plays(self):
+        now = timezone.now()
+        old_hit = self.make_song('Old hit', self.pop)
+        new_hit = self.make_song('New hit', self.pop)
+        self.play(old_hit, 6, now - timedelta(days=3))
+        self.play(new_hit, 2, now)
+        play_buffer.flush()
+        charts.refresh_charts()
+
+        # 6 lượt nghe cách đây 3 ngày = 0.75 lượt hôm nay trong bảng daily
+        self.assertEqual(self.chart(period='daily'), ['New hit', 'Old hit'])
+        self.assertEqual(self.chart(period='weekly'), ['Old hit', 'New hit'])
+
+    def test_charts_are_refreshed_by_the_worker_not_by_flush(self):
+        self.play(self.make_song('Hit', self.pop), 1)
+        play_buffer.flush()
+        self.assertEqual(self.chart(), [])
+
+        worker = Worker()
+        worker.schedule_periodic()
+        self.assertTrue(Task.objects.filter(name='songs.refresh_charts', status='queued').exists())
+        worker.run(burst=True)
+        self.assertEqual(self.chart(), ['Hit'])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({'period': 'monthly'}, {'genre_id': 'abc'}):
+            with self.subTest(params=params):
+                response = self.client.get('/songs/charts/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.data)
+
+    def test_incremental_scores_match_single_batch(self):
+        song = self.make_song('Song', self.pop)
+        now = timezone.now()
+        self.play(song, 2, now - timedelta(hours=5))
+        play_buffer.flush()
+        self.play(song, 3, now)
+        play_buffer.flush()
+
+        trend = SongTrend.objects.get(song=song, period='daily')
+        expected = 3 + 2 * 0.5 ** (5 / 24)
+        self.assertAlmostEqual(charts.current_score('daily', trend.log_score, now), expected, places=6)
+
+    def test_genre_charts_and_deleted_songs(self):
+        pop_song = self.make_song('Pop song', self.pop)
+        rock_song = self.make_song('Rock song', self.rock)
+        gone = self.make_song('Deleted', self.rock)
+        self.play(pop_song, 1)
+        self.play(rock_song, 2)
+        self.play(gone, 5)
+        play_buffer.flush()
+        gone.is_deleted = True
+        gone.save()
+        charts.refresh_charts()
+
+        self.assertEqual(self.chart(genre_id=self.rock.id), ['Rock song'])
+        self.assertEqual(self.chart(genre_id=self.pop.id), ['Pop song'])
+        self.assertEqual(self.chart(limit=1), ['Rock song'])
+
+    def test_chart_query_count_is_independent_of_catalog_size(self):
+        def serve_chart():
+            with CaptureQueriesContext(connection) as ctx:
+                self.chart()
+            return len(ctx.captured_queries)
+
+        songs = [self.make_song(f'Song {i}', self.pop) for i in range(5)]
+        for i, song in enumerate(songs):
+            self.play(song, i + 1)
+        play_buffer.flush()
+        charts.refresh_charts()
+        small = serve_chart()
+
+        more = Song.objects.bulk_create([Song(artist=self.artist, song_name=f'More {i}') for i in range(300)])
+        for song in more:
+            self.play(song, 1)
+        play_buffer.flush()
+        charts.refresh_charts()
+
+        self.assertEqual(serve_chart(), small)
+
+
+class SongStreamTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, STREAM_CHUNK_SIZE=1000)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user('listener', password='secret123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = bytes(range(256)) * 40
+        artist = Artist.objects.create(artist_name='Artist')
+        self.song = Song.objects.create(artist=artist, song_name='Song')
+        self.song.audio.save('track.mp3', ContentFile(self.data))
+        self.url = f'/songs/{self.song.id}/stream/'
+
+    def test_full_response(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+
+    def test_range_requests(self):
+        cases = {
+            'bytes=100-199': (100, 199),
+            'bytes=10000-': (10000, len(self.data) - 1),
+            'bytes=-24': (len(self.data) - 24, len(self.data) - 1),
+            'bytes=5000-999999': (5000, len(self.data) - 1),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{len(self.data)}')
+                self.assertEqual(b''.join(response.streaming_content), self.data[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=20000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+    def test_conditional_requests(self):
+        response = self.client.get(self.url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+        # If-Range khớp thì trả một phần, không khớp thì trả toàn bộ file
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"other"').status_code, 200)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=http_date(0)).status_code, 200
+        )
+
+    def test_reads_only_requested_chunks(self):
+        from django.core.files.storage import FileSystemStorage
+        original_open = FileSystemStorage._open
+        reads = []
+
+        class TrackingFile(File):
+            def read(self, size=-1):
+                reads.append(size)
+                return super().read(size)
+
+        def tracking_open(storage, name, mode='rb'):
+            return TrackingFile(original_open(storage, name, mode).file)
+
+        with mock.patch.object(FileSystemStorage, '_open', tracking_open):
+            response = self.client.get(self.url, HTTP_RANGE='bytes=9000-9499')
+            body = b''.join(response.streaming_content)
+
+        self.assertEqual(body, self.data[9000:9500])
+        self.assertTrue(reads and all(0 < size <= 1000 for size in reads))
+
+    def test_missing_audio(self):
+        song = Song.objects.create(artist=self.song.artist, song_name='Silent')
+        self.assertEqual(self.client.get(f'/songs/{song.id}/stream/').status_code, 404)
+
+    async def test_async_streaming(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(
+            self.url, headers={'Range': 'bytes=0-2499', 'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual([len(c) for c in chunks], [1000, 1000, 500])
+        self.assertEqual(b''.join(chunks), self.data[:2500])
+
+
+def fake_ffmpeg(args):
+    """Thay cho ffmpeg/ffprobe: ffprobe trả thời lượng, ffmpeg ghi playlist và hai segment."""
+    if 'ffprobe' in args[0]:
+        return mock.Mock(stdout='187.6\n')
+    playlist = args[-1]
+    segment_pattern = args[args.index('-hls_segment_filename') + 1]
+    lines = ['#EXTM3U', '#EXT-X-TARGETDURATION:6']
+    for i in range(2):
+        with open(segment_pattern % i, 'wb') as f:
+            f.write(b'segment')
+        lines += ['#EXTINF:6.0,', os.path.basename(segment_pattern % i)]
+    with open(playlist, 'w') as f:
+        f.write('\n'.join(lines + ['#EXT-X-ENDLIST']) + '\n')
+    return mock.Mock(stdout='')
+
+
+@override_settings(HLS_BITRATES=[64, 128], TRANSCODE_ENABLED=True)
+class TranscodeTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.artist = Artist.objects.create(artist_name='Artist')
+
+    def create_song(self):
+        song = Song(artist=self.artist, song_name='Song')
+        song.audio.save('track.mp3', ContentFile(b'audio'), save=False)
+        song.save()
+        return song
+
+    @mock.patch.object(transcoding, 'run_command', side_effect=fake_ffmpeg)
+    def test_upload_creates_hls_renditions(self, run_command):
+        song = self.create_song()
+        self.assertEqual(Task.objects.get().name, 'songs.transcode')
+        Worker().run(burst=True)
+
+        job = TranscodeJob.objects.get(song=song)
+        self.assertEqual(job.status, 'done')
+        song.refresh_from_db()
+        self.assertEqual(song.duration, 188)
+        self.assertEqual(song.hls_playlist.name, f'hls/{song.id}/{job.id}/master.m3u8')
+
+        storage = song.hls_playlist.storage
+        master = storage.open(song.hls_playlist.name).read().decode()
+        self.assertIn('64k/index.m3u8', master)
+        self.assertIn('BANDWIDTH=128000', master)
+        self.assertTrue(storage.exists(f'hls/{song.id}/{job.id}/128k/segment_001.ts'))
+        self.assertEqual(run_command.call_count, 3)
+
+    @mock.patch.object(transcoding, 'run_command', side_effect=fake_ffmpeg)
+    def test_served_playlists_use_absolute_signed_uris(self, run_command):
+        song = self.create_song()
+        Worker().run(burst=True)
+        song.refresh_from_db()
+        storage = song.hls_playlist.storage
+        directory = os.path.dirname(song.hls_playlist.name)
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        master_url = client.get(f'/songs/{song.id}/').data['hls_playlist']
+        self.assertEqual(master_url, f'http://testserver/songs/{song.id}/hls/master.m3u8')
+
+        signed = FakeSigningStorage()
+        with mock.patch.object(storage, 'url', signed.url):
+            signed_urls.clear()
+            self.addCleanup(signed_urls.clear)
+            master = client.get(master_url)
+            self.assertEqual(master['Content-Type'], 'application/vnd.apple.mpegurl')
+            variant_url = f'http://testserver/songs/{song.id}/hls/64k/index.m3u8'
+            self.assertIn(variant_url, master.content.decode().splitlines())
+
+            variant = client.get(variant_url).content.decode().splitlines()
+        self.assertIn(f'https://fake-bucket.s3.amazonaws.com/{directory}/64k/segment_001.ts?X-Amz-Signature=2', variant)
+        self.assertIn('#EXT-X-ENDLIST', variant)
+        self.assertEqual(client.get(f'/songs/{song.id}/hls/../../secret.m3u8').status_code, 404)
+        self.assertEqual(client.get(f'/songs/{song.id}/hls/512k/index.m3u8').status_code, 404)
+
+    @mock.patch.object(transcoding, 'run_command', side_effect=fake_ffmpeg)
+    def test_only_audio_changes_trigger_jobs(self, run_command):
+        song = self.create_song()
+        song = Song.objects.get(pk=song.pk)
+        song.song_name = 'Renamed'
+        song.save()
+        self.assertEqual(TranscodeJob.objects.filter(song=song).count(), 1)
+
+        song.audio.save('new.mp3', ContentFile(b'new audio'))
+        self.assertEqual(TranscodeJob.objects.filter(song=song).count(), 2)
+
+    @mock.patch.object(transcoding, 'run_command', side_effect=subprocess.CalledProcessError(1, 'ffmpeg'))
+    def test_failed_job_is_recorded(self, run_command):
+        song = self.create_song()
+        with self.assertLogs('songs.transcoding', 'ERROR'):
+            Worker().run(burst=True)
+        self.assertEqual(Task.objects.get().status, 'done')
+        job = TranscodeJob.objects.get(song=song)
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNotNone(job.finished_at)
+
+    @mock.patch.object(transcoding, 'run_command', side_effect=fake_ffmpeg)
+    def test_replaced_audio_cancels_stale_job(self, run_command):
+        song = self.create_song()
+        stale = TranscodeJob.objects.get(song=song)
+        song.audio.save('replacement.mp3', ContentFile(b'audio'))
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'cancelled')
+        self.assertEqual(transcoding.run_pending(), ['done'])
+        self.assertIn('replacement', TranscodeJob.objects.get(status='done').source)
+
+    @mock.patch.object(transcoding, 'run_command', side_effect=fake_ffmpeg)
+    def test_job_abandoned_by_dead_worker_is_reclaimed(self, run_command):
+        song = self.create_song()
+        job = TranscodeJob.objects.get(song=song)
+        # Worker nhận job rồi chết: job và task kẹt ở running
+        TranscodeJob.objects.filter(pk=job.pk).update(
+            status='running', attempts=1, started_at=timezone.now() - timedelta(hours=2),
+        )
+        Task.objects.update(status='running', attempts=1, locked_at=timezone.now() - timedelta(hours=2))
+
+        with self.assertLogs('tasks.worker', 'ERROR'):
+            Worker().run(burst=True)
+        self.assertEqual(Task.objects.get().status, 'failed')
+
+        self.assertEqual(transcoding.reclaim_stale_jobs(), 1)
+        Worker().run(burst=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('done', 2))
+
+        # Hết số lần thử: job bị đánh dấu failed thay vì chuyển mã lại mãi
+        TranscodeJob.objects.filter(pk=job.pk).update(status='running', started_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(transcoding.reclaim_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+
+class SongImportTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', password='secret123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.artist = Artist.objects.create(artist_name='Sơn Tùng')
+        self.pop = Genres.objects.create(genre_name='Pop')
+
+    def upload(self, content, name='songs.csv', query=''):
+        upload = SimpleUploadedFile(name, content.encode('utf-8'), content_type='text/csv')
+        return self.client.post(f'/songs/import/{query}', {'file': upload}, format='multipart')
+
+    def test_csv_import_creates_songs_and_reports_row_errors(self):
+        response = self.upload(
+            'song_name,artist,genres,duration,price\n'
+            'Lạc Trôi,sơn tùng,Pop,230,1.50\n'
+            'Bad Duration,Sơn Tùng,,abc,\n'
+            'Unknown,Nobody,,,\n'
+            '"Nơi này\n có anh",Sơn Tùng,Pop|Ballad,,\n'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 3))
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4, 6])
+        self.assertIn('duration', response.data['errors'][0]['errors'])
+
+        song = Song.objects.get(song_name='Lạc Trôi')
+        self.assertEqual((song.artist, song.duration, str(song.price)), (self.artist, 230, '1.50'))
+        self.assertEqual(list(song.genres.all()), [self.pop])
+        self.assertTrue(SearchToken.objects.filter(kind='song', object_id=song.id).exists())
+
+    def test_upsert_by_natural_key_and_id(self):
+        existing = Song.objects.create(artist=self.artist, song_name='Lạc Trôi', duration=100)
+        other = Song.objects.create(artist=self.artist, song_name='Other')
+        self.upload(
+            'id,song_name,artist_id,price,genres\n'
+            f',Lạc Trôi,{self.artist.id},2.00,Pop\n'
+            f'{other.id},Renamed,,,\n'
+        )
+        existing.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((existing.duration, str(existing.price)), (100, '2.00'))
+        self.assertEqual(list(existing.genres.all()), [self.pop])
+        self.assertEqual(other.song_name, 'Renamed')
+        self.assertEqual(Song.objects.count(), 2)
+
+    def test_soft_deleted_songs_are_not_import_targets(self):
+        deleted = Song.objects.create(artist=self.artist, song_name='Lạc Trôi', is_deleted=True)
+        response = self.upload(
+            'id,song_name,artist_id\n'
+            f',Lạc Trôi,{self.artist.id}\n'
+            f'{deleted.id},Renamed,\n'
+        )
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['failed']), (1, 0, 1))
+        self.assertIn('id', response.data['errors'][0]['errors'])
+        deleted.refresh_from_db()
+        self.assertEqual((deleted.song_name, deleted.is_deleted), ('Lạc Trôi', True))
+
+    @override_settings(SONG_IMPORT_MAX_ROWS=2)
+    def test_large_files_are_rejected_before_writing(self):
+        response = self.upload('song_name,artist\nA,Sơn Tùng\nB,Sơn Tùng\nC,Sơn Tùng\n')
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('import_songs', response.data['detail'])
+        self.assertFalse(Song.objects.exists())
+
+    def test_create_missing_artists_and_genres(self):
+        response = self.upload('song_name,artist,genres\nA,New Artist,Rock\n', query='?create_missing=1')
+        self.assertEqual((response.data['created'], response.data['artists_created'], response.data['genres_created']), (1, 1, 1))
+        self.assertEqual(Song.objects.get(song_name='A').genres.get().genre_name, 'Rock')
+
+    def test_rows_are_reread_when_bulk_create_returns_no_ids(self):
+        # Như MySQL: bulk_create không gán id, importer phải đọc lại đúng các dòng vừa chèn
+        deleted_artist = Artist.objects.create(artist_name='new artist', is_deleted=True)
+        deleted_song = Song.objects.create(artist=self.artist, song_name='Lạc Trôi', is_deleted=True)
+        features = type(connection.features)
+        with mock.patch.object(features, 'can_return_rows_from_bulk_insert', new_callable=mock.PropertyMock, return_value=False):
+            response = self.upload(
+                'song_name,artist,genres\nLạc Trôi,Sơn Tùng,Pop\nA,New Artist,Pop\n', query='?create_missing=1',
+            )
+        self.assertEqual((response.data['created'], response.data['artists_created']), (2, 1))
+
+        song = Song.objects.get(song_name='Lạc Trôi', is_deleted=False)
+        self.assertGreater(song.id, deleted_song.id)
+        self.assertEqual(list(song.genres.all()), [self.pop])
+        self.assertFalse(deleted_song.genres.exists())
+        self.assertTrue(SearchToken.objects.filter(kind='song', object_id=song.id).exists())
+        self.assertFalse(SearchToken.objects.filter(kind='song', object_id=deleted_song.id).exists())
+        self.assertNotEqual(Song.objects.get(song_name='A').artist_id, deleted_artist.id)
+
+    def test_query_count_grows_with_chunks_not_rows(self):
+        def import_rows(count, offset):
+            lines = ''.join(f'{{"song_name": "Song {offset + i}", "artist_id": {self.artist.id}, "genres": ["Pop"]}}\n' for i in range(count))
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    '/songs/import/', lines.encode(), content_type='application/x-ndjson'
+                )
+            self.assertEqual(response.data['created'], count)
+            return len(queries)
+
+        self.assertEqual(import_rows(5, 0), import_rows(30, 100))
+
+    def test_import_refreshes_a2a_catalog_after_commit(self):
+        catalog.invalidate()
+        self.addCleanup(catalog.invalidate)
+        existing = Song.objects.create(artist=self.artist, song_name='Lạc Trôi')
+        catalog.songs()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(
+                'id,song_name,artist,genres\n'
+                f'{existing.id},Lạc Trôi Remix,,\n'
+                ',Nơi Này Có Anh,Sơn Tùng,Indie\n',
+                query='?create_missing=1',
+            )
+
+        self.assertEqual([row[1] for row in catalog.songs()], ['Lạc Trôi Remix', 'Nơi Này Có Anh'])
+        self.assertIn('Indie', catalog.genres())
+
+    def test_artist_user_can_only_import_own_songs(self):
+        owner = User.objects.create_user('owner', password='secret123')
+        self.artist.user = owner
+        self.artist.save()
+        stranger = Artist.objects.create(artist_name='Stranger')
+        self.client.force_authenticate(owner)
+        body = (
+            f'{{"song_name": "Mine", "artist_id": {self.artist.id}}}\n'
+            f'{{"song_name": "Theirs", "artist_id": {stranger.id}}}\n'
+            'not json\n'
+        )
+        response = self.client.post('/songs/import/', body.encode(), content_type='application/x-ndjson')
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 2))
+
+        self.client.force_authenticate(User.objects.create_user('listener', password='secret123'))
+        response = self.client.post('/songs/import/', body.encode(), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 403)
+
+    def test_import_songs_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False, encoding='utf-8') as source:
+            source.write('{"song_name": "From CLI", "artist": "Sơn Tùng", "genres": "Pop|Indie"}\n')
+        out = StringIO()
+        call_command('import_songs', source.name, '--create-missing', stdout=out)
+        self.assertIn('1 created', out.getvalue())
+        self.assertEqual(Song.objects.get(song_name='From CLI').genres.count(), 2)
@@ -0,0 +1,174 @@
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from backend import query_cache
+from tasks.queue import enqueue as enqueue_task
+from .models import Song, TranscodeJob
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SECONDS = 6
+MASTER_PLAYLIST = 'master.m3u8'
+
+
+def bitrates():
+    """Các bitrate (kbps) của bản HLS, từ thấp tới cao."""
+    return sorted(getattr(settings, 'HLS_BITRATES', [64, 128, 256]))
+
+
+def run_command(args):
+    timeout = getattr(settings, 'TRANSCODE_TIMEOUT', 600)
+    return subprocess.run(args, check=True, capture_output=True, text=True, timeout=timeout)
+
+
+def probe_duration(path):
+    """Thời lượng file audio (giây, làm tròn) theo ffprobe, hoặc None nếu không đọc được."""
+    result = run_command([
+        getattr(settings, 'FFPROBE_BINARY', 'ffprobe'), '-v', 'error',
+        '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', path,
+    ])
+    try:
+        return round(float(result.stdout.strip()))
+    except ValueError:
+        return None
+
+
+def transcode_rendition(source, output_dir, bitrate):
+    """Chuyển mã sang AAC với bitrate cho trước và cắt thành segment HLS trong output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    run_command([
+        getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'), '-nostdin', '-y', '-i', source,
+        '-vn', '-c:a', 'aac', '-b:a', f'{bitrate}k',
+        '-f', 'hls', '-hls_time', str(SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', os.path.join(output_dir, 'segment_%03d.ts'),
+        os.path.join(output_dir, 'index.m3u8'),
+    ])
+
+
+def master_playlist(rates):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for bitrate in rates:
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bitrate * 1000},CODECS="mp4a.40.2"')
+        lines.append(f'{bitrate}k/index.m3u8')
+    return '\n'.join(lines) + '\n'
+
+
+def _download(field_file, directory):
+    # ffmpeg cần đường dẫn cục bộ; copy theo chunk để không nạp cả file vào bộ nhớ
+    path = os.path.join(directory, 'source' + os.path.splitext(field_file.name)[1])
+    with field_file.storage.open(field_file.name, 'rb') as src, open(path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    return path
+
+
+def _upload(storage, local_dir, prefix):
+    for root, _, files in os.walk(local_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            name = f'{prefix}/{os.path.relpath(path, local_dir)}'.replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                storage.save(name, File(f))
+
+
+def process_job(job_id):
+    """
+    Thực hiện một TranscodeJob đang chờ: đo thời lượng, chuyển mã từng bitrate, ghi
+    segment và playlist lên storage tại hls/<song>/<job>/ rồi cập nhật Song.
+
+    Job chỉ được một worker nhận (UPDATE có điều kiện status = pending). Nếu audio
+    của bài hát đã bị thay trong lúc chuyển mã, kết quả bị bỏ và job được đánh dấu cancelled.
+    """
+    claimed = TranscodeJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now(), attempts=F('attempts') + 1
+    )
+    if not claimed:
+        return None
+    job = TranscodeJob.objects.select_related('song').get(pk=job_id)
+    song = job.song
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='transcode-') as workdir:
+            source = _download(song.audio, workdir)
+            duration = probe_duration(source)
+
+            output_dir = os.path.join(workdir, 'hls')
+            rates = bitrates()
+            for bitrate in rates:
+                transcode_rendition(source, os.path.join(output_dir, f'{bitrate}k'), bitrate)
+            with open(os.path.join(output_dir, MASTER_PLAYLIST), 'w') as f:
+                f.write(master_playlist(rates))
+
+            prefix = f'hls/{song.id}/{job.id}'
+            _upload(song.hls_playlist.storage, output_dir, prefix)
+    except Exception as exc:
+        logger.exception('Transcode job %s failed', job_id)
+        TranscodeJob.objects.filter(pk=job_id).update(status='failed', error=str(exc), finished_at=timezone.now())
+        return 'failed'
+
+    with transaction.atomic():
+        current = Song.objects.select_for_update().filter(pk=song.id).values_list('audio', flat=True).first()
+        if current != job.source:
+            status = 'cancelled'
+        else:
+            status = 'done'
+            fields = {'hls_playlist': f'{prefix}/{MASTER_PLAYLIST}', 'updated_at': timezone.now()}
+            if duration is not None:
+                fields['duration'] = duration
+            # update() thay vì save() để không kích hoạt lại signal chuyển mã
+            Song.objects.filter(pk=song.id).update(**fields)
+            transaction.on_commit(lambda: query_cache.bump('song'))
+        TranscodeJob.objects.filter(pk=job_id).update(status=status, finished_at=timezone.now())
+    return status
+
+
+def enqueue(song):
+    """
+    Tạo job chuyển mã cho audio hiện tại của bài hát và đưa task songs.transcode vào hàng
+    đợi (tasks.queue); worker chỉ thấy task sau khi transaction hiện tại commit.
+    """
+    if not getattr(settings, 'TRANSCODE_ENABLED', False) or not song.audio:
+        return None
+    # Job cũ chưa chạy của bài hát không còn cần nữa
+    TranscodeJob.objects.filter(song=song, status='pending').update(status='cancelled', finished_at=timezone.now())
+    job = TranscodeJob.objects.create(song=song, source=song.audio.name)
+    enqueue_task('songs.transcode', [job.id])
+    return job
+
+
+def reclaim_stale_jobs():
+    """
+    Đưa lại vào hàng đợi các job kẹt ở running quá TRANSCODE_JOB_TIMEOUT giây (worker dừng
+    khi đang chuyển mã); job đã được nhận TRANSCODE_MAX_ATTEMPTS lần bị đánh dấu failed.
+    Trả về số job được đưa lại.
+    """
+    now = timezone.now()
+    timeout = getattr(settings, 'TRANSCODE_JOB_TIMEOUT', 3600)
+    stale = TranscodeJob.objects.filter(status='running', started_at__lt=now - timedelta(seconds=timeout))
+    stale.filter(attempts__gte=getattr(settings, 'TRANSCODE_MAX_ATTEMPTS', 2)).update(
+        status='failed', error='Worker dừng khi đang chuyển mã', finished_at=now,
+    )
+    reclaimed = 0
+    for job_id in list(stale.values_list('id', flat=True)):
+        with transaction.atomic():
+            if TranscodeJob.objects.filter(pk=job_id, status='running').update(status='pending'):
+                enqueue_task('songs.transcode', [job_id])
+                reclaimed += 1
+    return reclaimed
+
+
+def run_pending(limit=None):
+    """Chạy tuần tự ngay trong process hiện tại các job đang chờ (không qua worker của task queue)."""
+    job_ids = TranscodeJob.objects.filter(status='pending').order_by('created_at').values_list('id', flat=True)
+    if limit:
+        job_ids = job_ids[:limit]
+    return [process_job(job_id) for job_id in list(job_ids)]
@@ -3,7 +3,12 @@ from .views import *
 
 urlpatterns = [
     path('', SongListCreateView.as_view(), name='song-list-create'),
+    path('import/', SongImportView.as_view(), name='song-import'),
     path('<int:pk>/', SongRetrieveUpdateDestroyView.as_view(), name='song-detail'),
+    path('<int:pk>/stream/', SongStreamView.as_view(), name='song-stream'),
+    path('<int:pk>/hls/<path:name>', SongHlsView.as_view(), name='song-hls'),
+    path('<int:pk>/play/', SongPlayView.as_view(), name='song-play'),
+    path('charts/', ChartView.as_view(), name='song-charts'),
     path('genres/', GenresListCreateView.as_view(), name='genres-list-create'),
     path('genres/<int:pk>/', GenresRetrieveUpdateDestroyView.as_view(), name='genres-detail'),
 ]
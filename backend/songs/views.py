@@ -1,14 +1,30 @@
+import posixpath
+from itertools import islice
+
+from django.conf import settings
 from django.shortcuts import render
 from rest_framework import generics
-from .models import Song, Genres
-from .serializers import SongSerializer, GenresSerializer
+from .models import Song, Genres, ChartEntry
+from .serializers import SongSerializer, GenresSerializer, ChartEntrySerializer
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import filters
+from rest_framework.views import APIView
+from .plays import play_buffer
+from .charts import HALF_LIVES
+from .importer import SongImporter, detect_format, read_rows
+from artists.models import Artist
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from .streaming import serve_file
+from .hls import CONTENT_TYPE, PLAYLIST_NAME_RE, playlist_path, rewrite_playlist
+from django.http import Http404, HttpResponse
+from backend.query_cache import CachedListMixin
+from backend.conditional import ConditionalGetMixin, make_etag
 
-class SongListCreateView(generics.ListCreateAPIView):
+class SongListCreateView(ConditionalGetMixin, CachedListMixin, generics.ListCreateAPIView):
     queryset = Song.objects.filter(is_deleted=False)
     serializer_class = SongSerializer
+    cache_dependencies = ('song', 'artist')
     filter_backends = [filters.SearchFilter]
     search_fields = ['song_name']
 
@@ -17,21 +33,147 @@ class SongListCreateView(generics.ListCreateAPIView):
         genre_id = self.request.query_params.get('genre_id', None)
         if genre_id:
             queryset = queryset.filter(genres__id=genre_id)
-        return queryset
+        return SongSerializer.setup_eager_loading(queryset)
     
-class SongRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Song.objects.filter(is_deleted=False)
+class SongRetrieveUpdateDestroyView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = SongSerializer.setup_eager_loading(Song.objects.filter(is_deleted=False))
     serializer_class = SongSerializer
 
+    def get_object_etag(self):
+        row = Song.objects.filter(pk=self.kwargs['pk'], is_deleted=False).values_list(
+            'updated_at', 'plays', 'artist__updated_at'
+        ).first()
+        return make_etag('song', self.kwargs['pk'], *row) if row else None
+
     def destroy(self, request, *args, **kwargs):
         song = self.get_object()
         song.is_deleted = True
         song.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class GenresListCreateView(generics.ListCreateAPIView):
+class SongPlayView(APIView):
+    """
+    Ghi nhận một lượt nghe. Lượt nghe được gom trong bộ nhớ và ghi xuống database
+    theo lô, nên endpoint trả về 202 ngay mà không cập nhật dòng Song.
+    """
+    def post(self, request, pk):
+        user_id = request.user.id if request.user.is_authenticated else None
+        play_buffer.record(pk, user_id)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+class SongImportView(APIView):
+    """
+    Nhập/cập nhật bài hát theo lô từ file CSV hoặc NDJSON (xem songs.importer): body của
+    request (Content-Type text/csv hoặc application/x-ndjson) hoặc field `file` của form
+    multipart. File được đọc từng dòng; kết quả gồm số bài tạo mới, cập nhật và lỗi theo dòng.
+
+    Admin nhập được cho mọi nghệ sĩ và có thể tạo nghệ sĩ/thể loại mới (`?create_missing=1`);
+    người dùng khác chỉ nhập được cho nghệ sĩ mà họ sở hữu.
+
+    Import chạy ngay trong request nên mỗi file tối đa SONG_IMPORT_MAX_ROWS dòng; file lớn hơn
+    bị từ chối (413) trước khi ghi và cần nhập bằng lệnh `manage.py import_songs`.
+    """
+    def post(self, request):
+        if request.user.is_staff:
+            allowed_artist_ids = None
+        else:
+            allowed_artist_ids = set(
+                Artist.objects.filter(user=request.user, is_deleted=False).values_list('id', flat=True)
+            )
+            if not allowed_artist_ids:
+                raise PermissionDenied('Chỉ admin hoặc nghệ sĩ mới được nhập bài hát.')
+
+        if request.content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({'file': 'Thiếu file import.'})
+            lines, fmt = upload, detect_format(upload.name, upload.content_type)
+        else:
+            lines, fmt = request.stream or (), detect_format(content_type=request.content_type)
+        if fmt is None:
+            raise ValidationError('Chỉ hỗ trợ file CSV hoặc NDJSON.')
+
+        importer = SongImporter(
+            allowed_artist_ids=allowed_artist_ids,
+            create_missing=request.user.is_staff and request.query_params.get('create_missing') in ('1', 'true'),
+        )
+        max_rows = getattr(settings, 'SONG_IMPORT_MAX_ROWS', 5000)
+        rows = list(islice(read_rows(lines, fmt), max_rows + 1))
+        if len(rows) > max_rows:
+            return Response(
+                {'detail': f'File có hơn {max_rows} dòng, hãy nhập bằng lệnh manage.py import_songs.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        return Response(importer.run(rows))
+
+class SongStreamView(APIView):
+    """
+    Stream file audio của bài hát qua server, hỗ trợ Range để tua và bắt đầu phát nhanh,
+    cùng ETag/Last-Modified để client dùng lại bản đã cache (304).
+    """
+    def get(self, request, pk):
+        song = Song.objects.filter(pk=pk, is_deleted=False).only('id', 'audio').first()
+        if song is None or not song.audio:
+            raise Http404
+        return serve_file(request, song.audio)
+
+class SongHlsView(APIView):
+    """
+    Phục vụ playlist HLS của bài hát với URI segment đã ký (storage riêng tư trả 403
+    cho URI tương đối); segment vẫn được tải thẳng từ storage.
+    """
+    def get(self, request, pk, name):
+        if not PLAYLIST_NAME_RE.match(name):
+            raise Http404
+        song = Song.objects.filter(pk=pk, is_deleted=False).only('id', 'hls_playlist').first()
+        if song is None or not song.hls_playlist:
+            raise Http404
+        storage = song.hls_playlist.storage
+        directory = posixpath.dirname(song.hls_playlist.name)
+        try:
+            with storage.open(f'{directory}/{name}') as f:
+                text = f.read().decode()
+        except FileNotFoundError:
+            raise Http404
+        content = rewrite_playlist(
+            text, storage, directory, name,
+            lambda target: request.build_absolute_uri(playlist_path(pk, target)),
+        )
+        # URL đã ký có hạn nên không để client/proxy dùng lại playlist cũ
+        return HttpResponse(content, content_type=CONTENT_TYPE, headers={'Cache-Control': 'private, no-cache'})
+
+class ChartView(generics.ListAPIView):
+    """
+    Bảng xếp hạng bài hát đã tính sẵn (songs.charts), đọc theo index nên chi phí
+    không phụ thuộc vào số bài hát.
+
+    Tham số: period (daily | weekly, mặc định daily), genre_id (tùy chọn), limit (tối đa CHART_SIZE).
+    period hoặc genre_id không hợp lệ trả về 400.
+    """
+    serializer_class = ChartEntrySerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        period = self.request.query_params.get('period', 'daily')
+        if period not in HALF_LIVES:
+            raise ValidationError({'period': f'Chỉ hỗ trợ: {", ".join(HALF_LIVES)}.'})
+        genre_id = self.request.query_params.get('genre_id') or None
+        if genre_id is not None:
+            try:
+                genre_id = int(genre_id)
+            except ValueError:
+                raise ValidationError({'genre_id': 'genre_id phải là số nguyên.'})
+        try:
+            limit = int(self.request.query_params.get('limit', 50))
+        except ValueError:
+            limit = 50
+        queryset = ChartEntry.objects.filter(period=period, genre_id=genre_id).select_related('song__artist').prefetch_related('song__genres')
+        return queryset.order_by('rank')[:max(limit, 0)]
+
+class GenresListCreateView(CachedListMixin, generics.ListCreateAPIView):
     queryset = Genres.objects.all()
     serializer_class = GenresSerializer
+    cache_dependencies = ('genre',)
 
 class GenresRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Genres.objects.all()
@@ -0,0 +1,46 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.worker import Worker
+
+
+def _run_worker(burst):
+    worker = Worker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    return worker.run(burst=burst)
+
+
+class Command(BaseCommand):
+    help = 'Chạy worker xử lý hàng đợi task (tasks.Task)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Số process worker chạy song song')
+        parser.add_argument('--burst', action='store_true', help='Dừng khi không còn task đến hạn')
+
+    def handle(self, *args, **options):
+        processes = max(options['processes'], 1)
+        if processes == 1:
+            processed = _run_worker(options['burst'])
+            self.stdout.write(self.style.SUCCESS(f'Worker stopped, {processed} tasks processed'))
+            return
+
+        # Không chia sẻ kết nối database với process con
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=_run_worker, args=(options['burst'],), daemon=False)
+            for _ in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            for process in workers:
+                process.terminate()
+                process.join()
+        self.stdout.write(self.style.SUCCESS(f'{processes} workers stopped'))
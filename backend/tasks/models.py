@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+
+taskStatus = [
+    ('queued', 'queued'),
+    ('running', 'running'),
+    ('done', 'done'),
+    ('failed', 'failed'),
+]
+
+class Task(models.Model):
+    """Một lời gọi task trong hàng đợi (xem tasks.queue và tasks.worker)."""
+    name = models.CharField(max_length=100)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Số lớn hơn được chạy trước
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=taskStatus, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'], name='tasks_task_claim_idx'),
+            models.Index(fields=['status', 'locked_at'], name='tasks_task_locked_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} - {self.status}"
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task
+
+_registry = {}
+
+
+class TaskFunction:
+    """Hàm đã đăng ký làm task: gọi trực tiếp như hàm thường, hoặc `.delay()` để đưa vào hàng đợi."""
+
+    def __init__(self, func, name, priority=0, max_attempts=None, every=None):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.every = every
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self.name, args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, priority=None, countdown=0):
+        return enqueue(self.name, args, kwargs, priority=priority, countdown=countdown)
+
+
+def task(name=None, priority=0, max_attempts=None, every=None):
+    """
+    Đăng ký một hàm làm task. Tham số phải serialize được thành JSON.
+
+        @task('users.store_avatar', priority=5)
+        def store_avatar(user_id, path): ...
+
+        store_avatar.delay(user.id, path)
+
+    Với `every` (giây), worker tự đưa task (không tham số) vào hàng đợi theo chu kỳ đó.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        wrapped = TaskFunction(func, task_name, priority, max_attempts, every)
+        _registry[task_name] = wrapped
+        return wrapped
+    return decorator
+
+
+def get_task(name):
+    return _registry.get(name)
+
+
+def periodic_tasks():
+    return [registered for registered in _registry.values() if registered.every]
+
+
+def enqueue(name, args=(), kwargs=None, priority=None, countdown=0):
+    """
+    Tạo một Task ở trạng thái queued. Dòng Task nằm trong transaction hiện tại, nên
+    worker chỉ thấy nó sau khi transaction commit.
+    """
+    registered = _registry.get(name)
+    if registered is None:
+        raise KeyError(f'Unknown task: {name}')
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=registered.priority if priority is None else priority,
+        max_attempts=registered.max_attempts or getattr(settings, 'TASK_MAX_ATTEMPTS', 5),
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+def staging_storage():
+    """Storage trên đĩa (TASK_STAGING_ROOT) chứa file upload chờ worker xử lý."""
+    root = getattr(settings, 'TASK_STAGING_ROOT', None) or os.path.join(tempfile.gettempdir(), 'spotify-task-staging')
+    return FileSystemStorage(location=root)
+
+
+def stage_file(uploaded_file):
+    """
+    Ghi file upload vào TASK_STAGING_ROOT trên đĩa, để request không phải chờ ghi lên
+    default_storage (S3); task đẩy file lên storage sau. Trả về tên file đã stage; task có
+    trách nhiệm xóa nó (discard_staged).
+    """
+    _, ext = os.path.splitext(uploaded_file.name)
+    return staging_storage().save(f'{uuid.uuid4().hex}{ext}', uploaded_file)
+
+
+def open_staged(name):
+    """Mở file đã stage, hoặc None nếu không còn (đã được xử lý ở lần thử trước)."""
+    storage = staging_storage()
+    if not storage.exists(name):
+        return None
+    return storage.open(name, 'rb')
+
+
+def discard_staged(name):
+    staging_storage().delete(name)
@@ -0,0 +1,133 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import worker as worker_module
+from .models import Task
+from .queue import enqueue, task
+from .worker import Worker, retry_delay
+
+calls = []
+
+
+@task('tests.record', priority=1)
+def record(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@task('tests.flaky', max_attempts=3)
+def flaky(fail_times):
+    calls.append('flaky')
+    if calls.count('flaky') <= fail_times:
+        raise RuntimeError('temporary failure')
+    return 'ok'
+
+
+@task('tests.ping', every=60)
+def ping():
+    calls.append('ping')
+
+
+@override_settings(TASK_RETRY_BASE_DELAY=10, TASK_RETRY_MAX_DELAY=60)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker('test-worker')
+
+    def test_delay_runs_task_and_stores_result(self):
+        queued = record.delay('a')
+        self.assertEqual(queued.status, 'queued')
+        self.assertEqual(queued.priority, 1)
+
+        self.assertEqual(self.worker.run_once(), 'done')
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.result, queued.attempts), ('done', {'value': 'a'}, 1))
+        self.assertIsNone(self.worker.run_once())
+
+    def test_higher_priority_and_due_tasks_run_first(self):
+        record.enqueue(['low'], priority=-1)
+        record.enqueue(['later'], priority=100, countdown=60)
+        record.enqueue(['high'], priority=5)
+        record.delay('normal')
+
+        self.worker.run(burst=True)
+        self.assertEqual(calls, ['high', 'normal', 'low'])
+
+    def test_failed_task_is_retried_with_backoff(self):
+        queued = flaky.delay(1)
+        with self.assertLogs('tasks.worker', 'WARNING'):
+            self.assertEqual(self.worker.run_once(), 'failed')
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'queued')
+        self.assertIn('temporary failure', queued.last_error)
+        self.assertGreater(queued.run_at, timezone.now() + timedelta(seconds=8))
+        self.assertIsNone(self.worker.run_once())
+
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        self.assertEqual(self.worker.run_once(), 'done')
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.result), ('done', 2, 'ok'))
+
+    def test_task_fails_after_max_attempts(self):
+        queued = flaky.delay(10)
+        with self.assertLogs('tasks.worker', 'WARNING'):
+            for _ in range(3):
+                Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+                self.worker.run_once()
+
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 3))
+        self.assertIsNotNone(queued.finished_at)
+
+    def test_retry_delay_doubles_up_to_cap(self):
+        with mock.patch.object(worker_module.random, 'uniform', return_value=1):
+            self.assertEqual([retry_delay(n) for n in range(1, 6)], [10, 20, 40, 60, 60])
+
+    def test_stale_running_tasks_are_requeued(self):
+        queued = record.delay('stale')
+        Task.objects.filter(pk=queued.pk).update(status='running', locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(self.worker.requeue_stale(), 1)
+        self.assertEqual(self.worker.run_once(), 'done')
+
+    def test_stale_task_without_attempts_left_fails(self):
+        queued = record.delay('crash')
+        Task.objects.filter(pk=queued.pk).update(
+            status='running', attempts=queued.max_attempts, locked_at=timezone.now() - timedelta(hours=1),
+        )
+
+        with self.assertLogs('tasks.worker', 'ERROR'):
+            self.assertEqual(self.worker.requeue_stale(), 0)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+        self.assertIsNone(self.worker.run_once())
+
+    def test_periodic_tasks_are_scheduled_once_per_interval(self):
+        with mock.patch.object(worker_module, 'periodic_tasks', return_value=[ping]):
+            self.assertEqual(self.worker.schedule_periodic(), 1)
+            self.assertEqual(self.worker.schedule_periodic(), 0)
+            self.worker.next_runs.clear()
+            # Lần chạy trước còn trong hàng đợi: không thêm lần nữa
+            self.assertEqual(self.worker.schedule_periodic(), 0)
+            self.worker.run(burst=True)
+            self.worker.next_runs.clear()
+            self.assertEqual(self.worker.schedule_periodic(), 1)
+        self.assertEqual(calls, ['ping'])
+
+    def test_unknown_task_name_is_rejected(self):
+        with self.assertRaises(KeyError):
+            enqueue('tests.missing')
+
+    def test_run_tasks_command_in_burst_mode(self):
+        record.delay('x')
+        record.delay('y')
+        out = StringIO()
+        call_command('run_tasks', '--burst', stdout=out)
+        self.assertIn('2 tasks processed', out.getvalue())
+        self.assertEqual(sorted(calls), ['x', 'y'])
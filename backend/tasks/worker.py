@@ -0,0 +1,152 @@
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+from .queue import get_task, periodic_tasks
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts):
+    """Thời gian chờ (giây) trước lần thử tiếp theo: tăng gấp đôi sau mỗi lần lỗi, có jitter."""
+    base = getattr(settings, 'TASK_RETRY_BASE_DELAY', 5)
+    cap = getattr(settings, 'TASK_RETRY_MAX_DELAY', 600)
+    delay = min(base * 2 ** max(attempts - 1, 0), cap)
+    return delay * random.uniform(0.9, 1.1)
+
+
+class Worker:
+    """
+    Worker lấy task từ bảng Task theo priority rồi run_at và thực thi.
+
+    Task được nhận bằng SELECT ... FOR UPDATE SKIP LOCKED nếu database hỗ trợ
+    (MySQL 8, PostgreSQL), kèm UPDATE có điều kiện status = queued nên nhiều
+    worker chạy song song không nhận trùng task. Task lỗi được thử lại với
+    backoff tăng dần tới max_attempts lần; task bị kẹt ở running quá
+    TASK_LOCK_TIMEOUT giây (worker chết giữa chừng) được đưa lại vào hàng đợi,
+    kiểm tra mỗi TASK_MAINTENANCE_INTERVAL giây. Worker cũng đưa các task định kỳ
+    (task(every=...)) vào hàng đợi khi đến hạn.
+    """
+
+    def __init__(self, name=None):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopped = False
+        self.next_maintenance = 0
+        self.next_runs = {}
+
+    def claim(self):
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = Task.objects.filter(status='queued', run_at__lte=now).order_by('-priority', 'run_at', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            task = queryset.only('id').first()
+            if task is None:
+                return None
+            claimed = Task.objects.filter(pk=task.pk, status='queued').update(
+                status='running', locked_by=self.name, locked_at=now, attempts=F('attempts') + 1
+            )
+        if not claimed:
+            return None
+        return Task.objects.get(pk=task.pk)
+
+    def execute(self, task):
+        registered = get_task(task.name)
+        try:
+            if registered is None:
+                raise LookupError(f'Unknown task: {task.name}')
+            result = registered(*task.args, **task.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            if task.attempts < task.max_attempts:
+                delay = retry_delay(task.attempts)
+                logger.warning('Task %s #%s failed, retrying in %.0fs', task.name, task.id, delay)
+                Task.objects.filter(pk=task.pk).update(
+                    status='queued', last_error=error, locked_by=None, locked_at=None,
+                    run_at=timezone.now() + timedelta(seconds=delay),
+                )
+            else:
+                logger.error('Task %s #%s failed after %s attempts', task.name, task.id, task.attempts)
+                Task.objects.filter(pk=task.pk).update(
+                    status='failed', last_error=error, locked_by=None, finished_at=timezone.now()
+                )
+            return 'failed'
+        Task.objects.filter(pk=task.pk).update(
+            status='done', result=result, locked_by=None, finished_at=timezone.now()
+        )
+        return 'done'
+
+    def requeue_stale(self):
+        """
+        Đưa task kẹt ở running lại vào hàng đợi; task đã dùng hết max_attempts (ví dụ task
+        làm worker chết mỗi lần chạy) bị đánh dấu failed. Trả về số task được đưa lại.
+        """
+        timeout = getattr(settings, 'TASK_LOCK_TIMEOUT', 900)
+        now = timezone.now()
+        stale = Task.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=timeout))
+        exhausted = stale.filter(attempts__gte=F('max_attempts')).update(
+            status='failed', last_error='Worker dừng khi đang chạy task', locked_by=None, finished_at=now,
+        )
+        if exhausted:
+            logger.error('%s stale tasks failed after max attempts', exhausted)
+        return stale.update(status='queued', locked_by=None, locked_at=None)
+
+    def schedule_periodic(self):
+        """Đưa các task định kỳ đã đến hạn vào hàng đợi, bỏ qua task còn một lần chạy đang chờ."""
+        now = time.monotonic()
+        scheduled = 0
+        for registered in periodic_tasks():
+            if self.next_runs.get(registered.name, 0) > now:
+                continue
+            self.next_runs[registered.name] = now + registered.every
+            if not Task.objects.filter(name=registered.name, status__in=('queued', 'running')).exists():
+                registered.delay()
+                scheduled += 1
+        return scheduled
+
+    def maintain(self):
+        now = time.monotonic()
+        if now >= self.next_maintenance:
+            self.next_maintenance = now + getattr(settings, 'TASK_MAINTENANCE_INTERVAL', 60)
+            self.requeue_stale()
+        self.schedule_periodic()
+
+    def run_once(self):
+        """Chạy một task nếu có, trả về trạng thái của nó hoặc None nếu hàng đợi trống."""
+        task = self.claim()
+        if task is None:
+            return None
+        return self.execute(task)
+
+    def run(self, burst=False):
+        """Vòng lặp của worker; burst=True thì dừng khi hàng đợi hết task đến hạn."""
+        poll_interval = getattr(settings, 'TASK_POLL_INTERVAL', 1)
+        processed = 0
+        if burst:
+            # Chế độ burst (test, cron) chỉ đưa lại task kẹt một lần rồi xử lý các task đã có
+            self.requeue_stale()
+        while not self.stopped:
+            close_old_connections()
+            if not burst:
+                self.maintain()
+            status = self.run_once()
+            if status is not None:
+                processed += 1
+                continue
+            if burst:
+                break
+            time.sleep(poll_interval)
+        return processed
+
+    def stop(self, *args):
+        self.stopped = True
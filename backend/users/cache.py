@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+
+from backend.media import signed_urls
+
+# Cache thông tin người gửi dùng khi phát tin nhắn chat qua websocket. Nằm trong cache dùng
+# chung (Redis) chứ không trong bộ nhớ tiến trình: avatar được lưu bởi worker của task queue,
+# lệnh xóa cache của worker phải có tác dụng với mọi tiến trình web.
+PAYLOAD_PREFIX = 'user:payload:'
+
+
+def get_cache():
+    return caches[getattr(settings, 'CHAT_USER_CACHE_ALIAS', 'default')]
+
+
+def _key(user_id):
+    return f'{PAYLOAD_PREFIX}{user_id}'
+
+
+def serialize_user_payload(user):
+    """Chuyển user (kèm profile) thành dict gửi cho client trong tin nhắn chat."""
+    profile = getattr(user, 'profile', None)
+
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'avatar': signed_urls.url(profile.avatar) if profile else None,
+        'is_active': user.is_active,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'last_login': user.last_login.isoformat() if user.last_login else None,
+        'date_joined': user.date_joined.isoformat() if user.date_joined else None
+    }
+
+
+def get_cached_user_payload(user_id):
+    """Trả về payload đã cache, hoặc None nếu chưa có (không truy vấn database)."""
+    return get_cache().get(_key(user_id))
+
+
+async def aget_cached_user_payload(user_id):
+    """Phiên bản async của get_cached_user_payload."""
+    return await get_cache().aget(_key(user_id))
+
+
+def get_user_payload(user_id):
+    """Trả về payload của user, chỉ truy vấn database khi cache chưa có."""
+    payload = get_cached_user_payload(user_id)
+    if payload is None:
+        user = User.objects.select_related('profile').get(id=user_id)
+        payload = serialize_user_payload(user)
+        get_cache().set(_key(user_id), payload, timeout=getattr(settings, 'CHAT_USER_CACHE_TTL', 300))
+    return payload
+
+
+def invalidate_user_payload(user_id):
+    get_cache().delete(_key(user_id))
@@ -2,6 +2,10 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Friend, StatusFriend, UserProfile
 from django.db import transaction
+from backend.media import SignedImageField, SignedMediaModelSerializer, SignedMediaListSerializer
+from images.fields import ImageVariantsField
+from tasks.staging import stage_file
+from .tasks import store_avatar
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=6)
@@ -24,21 +28,23 @@ class RegisterSerializer(serializers.ModelSerializer):
         UserProfile.objects.create(user=user)
         return user
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SignedMediaModelSerializer):
     class Meta:
         model = UserProfile
         fields = ['avatar', 'bio']
 
 class UserSerializer(serializers.ModelSerializer):
-    avatar = serializers.ImageField(source='profile.avatar', read_only=True)
+    avatar = SignedImageField(source='profile.avatar', read_only=True)
+    avatar_variants = ImageVariantsField(source='profile.avatar')
     bio = serializers.CharField(source='profile.bio', read_only=True)
 
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'avatar', 'bio']
+        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'avatar', 'avatar_variants', 'bio']
+        list_serializer_class = SignedMediaListSerializer
 
 class UpdateUserSerializer(serializers.ModelSerializer):
-    avatar = serializers.ImageField(source='profile.avatar', required=False)
+    avatar = SignedImageField(source='profile.avatar', required=False)
     bio = serializers.CharField(source='profile.bio', required=False)
 
     class Meta:
@@ -46,7 +52,7 @@ class UpdateUserSerializer(serializers.ModelSerializer):
         fields = ['first_name', 'last_name', 'avatar', 'bio']
 
 class UpdateUserSerializer(serializers.ModelSerializer):
-    avatar = serializers.ImageField(source='profile.avatar', required=False)
+    avatar = SignedImageField(source='profile.avatar', required=False)
     bio    = serializers.CharField(   source='profile.bio',    required=False)
 
     class Meta:
@@ -63,7 +69,10 @@ class UpdateUserSerializer(serializers.ModelSerializer):
 
         profile, _ = UserProfile.objects.get_or_create(user=instance)
         if 'avatar' in profile_data:
-            profile.avatar = profile_data['avatar']
+            # Request chỉ ghi file xuống đĩa; upload lên storage chạy trong task queue,
+            # avatar mới có sau khi worker xử lý xong
+            avatar = profile_data['avatar']
+            store_avatar.delay(instance.id, stage_file(avatar), avatar.name)
         if 'bio' in profile_data:
             profile.bio = profile_data['bio']
         profile.save()
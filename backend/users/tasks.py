@@ -0,0 +1,22 @@
+from django.core.files import File
+from django.db import transaction
+
+from tasks.queue import task
+from tasks.staging import discard_staged, open_staged
+from .cache import invalidate_user_payload
+from .models import UserProfile
+
+
+@task('users.store_avatar', priority=5)
+def store_avatar(user_id, staged_name, filename):
+    """Đẩy avatar đã được UpdateUserView stage trên đĩa (tasks.staging) lên storage rồi gán cho profile."""
+    staged = open_staged(staged_name)
+    if staged is None:
+        # Đã được xử lý ở lần thử trước
+        return None
+    profile, _ = UserProfile.objects.get_or_create(user_id=user_id)
+    with staged:
+        profile.avatar.save(filename, File(staged), save=True)
+    discard_staged(staged_name)
+    transaction.on_commit(lambda: invalidate_user_payload(user_id))
+    return profile.avatar.name
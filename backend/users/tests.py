@@ -1,3 +1,87 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+from tasks.staging import staging_storage
+from tasks.worker import Worker
+
+from .cache import get_cached_user_payload, get_user_payload, invalidate_user_payload
+from .models import UserProfile
+
+
+class UserPayloadCacheTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('member', password='secret123', first_name='Old')
+        UserProfile.objects.create(user=self.user)
+        invalidate_user_payload(self.user.id)
+
+    def test_payload_is_cached_after_first_lookup(self):
+        get_user_payload(self.user.id)
+
+        with self.assertNumQueries(0):
+            payload = get_user_payload(self.user.id)
+        self.assertEqual(payload['first_name'], 'Old')
+
+    def test_update_user_invalidates_cached_payload(self):
+        get_user_payload(self.user.id)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch('/users/update-user/', {'first_name': 'New'}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(get_cached_user_payload(self.user.id))
+        self.assertEqual(get_user_payload(self.user.id)['first_name'], 'New')
+
+
+class AvatarUploadTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.staging_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.staging_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, TASK_STAGING_ROOT=self.staging_root, IMAGE_DERIVATIVES_ON_UPLOAD=False
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('member', password='secret123')
+        invalidate_user_payload(self.user.id)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_avatar_is_stored_by_worker(self):
+        image = io.BytesIO()
+        Image.new('RGB', (10, 10)).save(image, 'PNG')
+        avatar = SimpleUploadedFile('me.png', image.getvalue(), content_type='image/png')
+
+        response = self.client.patch('/users/update-user/', {'avatar': avatar, 'bio': 'hi'}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['bio'], 'hi')
+        self.assertFalse(UserProfile.objects.get(user=self.user).avatar)
+        task = Task.objects.get()
+        self.assertEqual(task.name, 'users.store_avatar')
+        staged = task.args[1]
+        self.assertTrue(staging_storage().exists(staged))
+        self.assertFalse(default_storage.exists(staged))
+
+        # Payload cache lại giữa lúc upload và lúc worker lưu avatar vẫn bị xóa bởi worker
+        get_user_payload(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Worker().run(burst=True)
+
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertTrue(profile.avatar.name.startswith('avatars/me'))
+        self.assertIsNone(get_cached_user_payload(self.user.id))
+        self.assertEqual(Task.objects.get().status, 'done')
+        self.assertFalse(staging_storage().exists(staged))
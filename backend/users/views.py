@@ -7,7 +7,8 @@ from .serializers import *
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import filters
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db import models
+from django.db import models, transaction
+from .cache import invalidate_user_payload
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
@@ -56,6 +57,12 @@ class UpdateUserView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user  # Chỉ cho phép user cập nhật chính mình
 
+    def perform_update(self, serializer):
+        user = serializer.save()
+        # Thông tin người gửi trong chat đã thay đổi, xóa bản cache cũ sau khi commit để request
+        # đọc song song không cache lại dữ liệu cũ; avatar mới được store_avatar xóa cache lần nữa
+        transaction.on_commit(lambda: invalidate_user_payload(user.id))
+
 class UserListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
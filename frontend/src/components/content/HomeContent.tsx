@@ -38,14 +38,17 @@ const localSongs: Playlist[] = [
 const HomeContent = () => {
   const navigate = useNavigate();
   const [songs, setSongs] = useState<Song[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const songsData = await SongService.getSong();
-        setSongs(Array.isArray(songsData) ? songsData : [songsData]);
+        const page = await SongService.getSong();
+        setSongs(page.results);
+        setNextPage(page.next);
 
         setLoading(false);
       } catch (err) {
@@ -58,6 +61,20 @@ const HomeContent = () => {
     fetchData();
   }, []);
 
+  const loadMoreSongs = async () => {
+    if (!nextPage || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await SongService.getSong(nextPage);
+      setSongs(prev => [...prev, ...page.results]);
+      setNextPage(page.next);
+    } catch (err) {
+      console.error('Error fetching more songs:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSongClick = (songId: string) => {
     navigate(`/song/${songId}`);
   };
@@ -98,6 +115,9 @@ const HomeContent = () => {
           playlists={apiSongs}
           onPlaylistClick={handleSongClick}
           seeAllLink="#"
+          onLoadMore={loadMoreSongs}
+          hasMore={nextPage !== null}
+          loadingMore={loadingMore}
         />
 
         {/* Display mock data */}
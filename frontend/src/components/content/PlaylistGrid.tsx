@@ -2,6 +2,7 @@ import React from 'react';
 import { Link } from 'react-router-dom';
 import PlaylistCard from './PlaylistCard';
 import SectionTitle from './SectionTitle';
+import { Button } from '@/components/ui/button';
 
 interface Playlist {
   id: string;
@@ -15,9 +16,13 @@ interface PlaylistGridProps {
   playlists: Playlist[];
   seeAllLink?: string;
   onPlaylistClick?: (id: string) => void;
+  // Paged lists: show a "Load more" button while the server has another page
+  onLoadMore?: () => void;
+  hasMore?: boolean;
+  loadingMore?: boolean;
 }
 
-const PlaylistGrid = ({ title, playlists, seeAllLink, onPlaylistClick }: PlaylistGridProps) => {
+const PlaylistGrid = ({ title, playlists, seeAllLink, onPlaylistClick, onLoadMore, hasMore, loadingMore }: PlaylistGridProps) => {
   return (
     <section className="mb-8">
       <SectionTitle title={title} seeAllLink={seeAllLink} />
@@ -32,6 +37,13 @@ const PlaylistGrid = ({ title, playlists, seeAllLink, onPlaylistClick }: Playlis
           />
         ))}
       </div>
+      {onLoadMore && hasMore && (
+        <div className="flex justify-center mt-6">
+          <Button variant="outline" onClick={onLoadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </div>
+      )}
     </section>
   );
 };
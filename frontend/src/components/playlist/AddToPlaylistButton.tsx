@@ -23,6 +23,7 @@ interface AddToPlaylistButtonProps {
 export function AddToPlaylistButton({ song }: AddToPlaylistButtonProps) {
   const [playlists, setPlaylists] = useState<Playlist[]>([])
   const [loading, setLoading] = useState(false)
+  const [nextPage, setNextPage] = useState<string | null>(null)
   const [addingToPlaylist, setAddingToPlaylist] = useState<number | null>(null)
   const [isCreateModalOpen, setIsCreateModalOpen] = useState(false)
   const { toast } = useToast()
@@ -32,8 +33,9 @@ export function AddToPlaylistButton({ song }: AddToPlaylistButtonProps) {
     try {
       setLoading(true)
       // Assuming you have a method to get user playlists
-      const userPlaylists = await PlaylistService.getPlaylist()
-      setPlaylists(userPlaylists)
+      const page = await PlaylistService.getPlaylist()
+      setPlaylists(page.results)
+      setNextPage(page.next)
     } catch (error) {
       console.error("Failed to fetch playlists:", error)
       toast({
@@ -50,17 +52,27 @@ export function AddToPlaylistButton({ song }: AddToPlaylistButtonProps) {
     fetchUserPlaylists()
   }, [toast])
 
+  const loadMorePlaylists = async () => {
+    if (!nextPage) return
+    try {
+      const page = await PlaylistService.getPlaylist(nextPage)
+      setPlaylists((prev) => [...prev, ...page.results])
+      setNextPage(page.next)
+    } catch (error) {
+      console.error("Failed to fetch playlists:", error)
+    }
+  }
+
   const addSongToPlaylistHandler = async (playlistId: number) => {
     try {
       setAddingToPlaylist(playlistId)
 
-      // Get the current playlist
-      const playlist = await PlaylistService.getPlaylistById(playlistId)
+      const playlist = playlists.find((p) => p.id === playlistId)
 
-      // Check if song is already in the playlist
-      const songExists = playlist.song.some((s) => s.id === song.id)
+      // Songs already in the playlist are skipped by the server
+      const added = await addSongToPlaylist(song.id, playlistId)
 
-      if (songExists) {
+      if (added.length === 0) {
         toast({
           title: "Already added",
           description: `"${song.song_name}" is already in this playlist`,
@@ -69,12 +81,9 @@ export function AddToPlaylistButton({ song }: AddToPlaylistButtonProps) {
         return
       }
 
-      // Add the song to the playlist
-      await addSongToPlaylist(song.id, playlist)
-
       toast({
         title: "Success",
-        description: `Added "${song.song_name}" to ${playlist.playlist_name}`,
+        description: `Added "${song.song_name}" to ${playlist?.playlist_name}`,
         variant: "default",
       })
     } catch (error) {
@@ -130,6 +139,17 @@ export function AddToPlaylistButton({ song }: AddToPlaylistButtonProps) {
               </DropdownMenuItem>
             ))
           )}
+          {nextPage && (
+            <DropdownMenuItem
+              className="cursor-pointer text-zinc-400 hover:bg-zinc-800"
+              onSelect={(event) => {
+                event.preventDefault()
+                loadMorePlaylists()
+              }}
+            >
+              Load more
+            </DropdownMenuItem>
+          )}
           <DropdownMenuSeparator className="bg-zinc-800" />
           <DropdownMenuItem className="cursor-pointer hover:bg-zinc-800" onClick={handleCreatePlaylist}>
             <PlusCircle className="h-4 w-4 mr-2" />
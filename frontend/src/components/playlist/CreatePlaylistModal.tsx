@@ -55,7 +55,6 @@ export function CreatePlaylistModal({ isOpen, onClose, onSuccess }: CreatePlayli
         created_at: new Date().toISOString(),
         is_public: true,
         playlist_cover_url: "/placeholder.svg",
-        song: [],
       })
 
       toast({
@@ -11,7 +11,7 @@ import { Artist } from '@/types/artist';
 
 const Sidebar = () => {
   const location = useLocation();
-  const { playlists } = useMusic();
+  const { playlists, hasMorePlaylists, loadMorePlaylists } = useMusic();
   const [followedArtists, setFollowedArtists] = useState<Artist[]>([]);
 
   useEffect(() => {
@@ -90,6 +90,11 @@ const Sidebar = () => {
           ) : (
             <p className="px-4 text-xs text-zinc-500">No playlists created yet.</p>
           )}
+          {hasMorePlaylists && (
+            <button className="px-4 py-1 text-xs text-zinc-400 hover:text-white" onClick={loadMorePlaylists}>
+              Load more
+            </button>
+          )}
         </div>
 
         <div className="pb-6 pt-2">
@@ -83,4 +83,31 @@ function handleAuthError() {
   window.location.href = '/login';
 }
 
-export { api };
\ No newline at end of file
+// List endpoints are cursor-paginated ({ next, previous, results }).
+// `next` is an absolute URL, which axios uses as-is instead of joining it to baseURL.
+interface Page<T> {
+  results: T[];
+  next: string | null;
+}
+
+// Fetch a single page; pass the previous page's `next` to continue where it stopped.
+async function getPage<T>(url: string): Promise<Page<T>> {
+  const response: AxiosResponse = await api.get(url);
+  return { results: response.data.results, next: response.data.next };
+}
+
+// Follow `next` until the last page. Only for small lists the UI needs in full
+// (friends, followed artists); long lists should page with getPage.
+async function getAllPages<T>(url: string): Promise<T[]> {
+  const items: T[] = [];
+  let next: string | null = url;
+  while (next) {
+    const response: AxiosResponse = await api.get(next);
+    items.push(...response.data.results);
+    next = response.data.next;
+  }
+  return items;
+}
+
+export { api, getPage, getAllPages };
+export type { Page };
\ No newline at end of file
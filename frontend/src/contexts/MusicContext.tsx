@@ -15,6 +15,8 @@ interface MusicContextType {
   purchasedSongs: Song[];
   purchases: Order[];
   playlists: Playlist[];
+  hasMorePlaylists: boolean;
+  loadMorePlaylists: () => Promise<void>;
   likedSongs: Song[];
   volume: number;
   setVolume: (volume: number) => void;
@@ -27,8 +29,8 @@ interface MusicContextType {
   isPurchased: (songId: number) => Promise<boolean>;
   getPurchases: () => Promise<Order[]>;
   createPlaylist: (name: string) => Promise<Playlist>;
-  addSongToPlaylist: (songId: number, playlist: Playlist) => Promise<Playlist>;
-  removeSongFromPlaylist: (songId: number, playlistId: number) => void;
+  addSongToPlaylist: (songId: number, playlistId: number) => Promise<number[]>;
+  removeSongFromPlaylist: (songId: number, playlistId: number) => Promise<void>;
   likeSong: (song: Song) => void;
   unlikeSong: (songId: number) => void;
   isLiked: (songId: number) => boolean;
@@ -45,6 +47,7 @@ export const MusicProvider: React.FC<{ children: React.ReactNode }> = ({ childre
   const [purchasedSongs, setPurchasedSongs] = useState<Song[]>([]);
   const [purchases, setPurchases] = useState<Order[]>([]);
   const [playlists, setPlaylists] = useState<Playlist[]>([]);
+  const [playlistsNext, setPlaylistsNext] = useState<string | null>(null);
   const [likedSongs, setLikedSongs] = useState<Song[]>(() => {
     const stored = localStorage.getItem('likedSongs');
     return stored ? JSON.parse(stored) : [];
@@ -67,12 +70,20 @@ export const MusicProvider: React.FC<{ children: React.ReactNode }> = ({ childre
   useEffect(() => {
     const fetchPlaylists = async () => {
       if (!isAuthenticated) return;
-      const playlists = await PlaylistService.getPlaylist();
-      setPlaylists(playlists);
+      const page = await PlaylistService.getPlaylist();
+      setPlaylists(page.results);
+      setPlaylistsNext(page.next);
     };
     fetchPlaylists();
   }, [isAuthenticated]);
 
+  const loadMorePlaylists = async () => {
+    if (!playlistsNext) return;
+    const page = await PlaylistService.getPlaylist(playlistsNext);
+    setPlaylists(prev => [...prev, ...page.results]);
+    setPlaylistsNext(page.next);
+  };
+
   useEffect(() => {
     const audio = audioRef.current;
     if (!audio) return;
@@ -187,7 +198,6 @@ export const MusicProvider: React.FC<{ children: React.ReactNode }> = ({ childre
       updated_at: new Date().toISOString(),
       is_deleted: false,
       playlist_cover_url: '',
-      song: [],
       price: 0,
     }
     const response = await PlaylistService.createPlaylist(playlist);
@@ -196,13 +206,22 @@ export const MusicProvider: React.FC<{ children: React.ReactNode }> = ({ childre
     return response;
   }
 
-  const addSongToPlaylist = async (songId: number, playlist: Playlist) => {
-    const updatedSongs = [...playlist.song.map(s => s.id), songId];
-    const updatedPlaylist = { ...playlist, song_id: updatedSongs };
-    const response = await PlaylistService.updatePlaylist(playlist.id, updatedPlaylist as unknown as Playlist);
-    setPlaylists([...playlists, response]);
-    toast({ title: "Bài hát đã được thêm vào playlist", description: "Bạn có thể xem playlist tại đây" });
-    return response;
+  const addSongToPlaylist = async (songId: number, playlistId: number) => {
+    const added = await PlaylistService.addSongs(playlistId, [songId]);
+    if (added.length > 0) {
+      setPlaylists(playlists.map(p =>
+        p.id === playlistId ? { ...p, song_count: (p.song_count ?? 0) + added.length } : p
+      ));
+      toast({ title: "Bài hát đã được thêm vào playlist", description: "Bạn có thể xem playlist tại đây" });
+    }
+    return added;
+  }
+
+  const removeSongFromPlaylist = async (songId: number, playlistId: number) => {
+    const removed = await PlaylistService.removeSongs(playlistId, [songId]);
+    setPlaylists(playlists.map(p =>
+      p.id === playlistId ? { ...p, song_count: Math.max((p.song_count ?? 0) - removed, 0) } : p
+    ));
   }
 
   const isPurchased = async (songId: number): Promise<boolean> => {
@@ -233,6 +252,8 @@ export const MusicProvider: React.FC<{ children: React.ReactNode }> = ({ childre
         purchasedSongs,
         purchases, 
         playlists,
+        hasMorePlaylists: playlistsNext !== null,
+        loadMorePlaylists,
         likedSongs,
         volume,
         setVolume,
@@ -246,7 +267,7 @@ export const MusicProvider: React.FC<{ children: React.ReactNode }> = ({ childre
         getPurchases,
         createPlaylist,
         addSongToPlaylist,
-        removeSongFromPlaylist: () => {},
+        removeSongFromPlaylist,
         likeSong,
         unlikeSong,
         isLiked
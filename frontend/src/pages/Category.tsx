@@ -14,25 +14,40 @@ const CategoryPage = () => {
   const categoryId = parseInt(id || '0');
   const [songs, setSongs] = useState<Song[]>([]);
   const [playlists, setPlaylists] = useState<any[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const convertToPlaylist = (songs: Song[]): any[] => {
+    return songs.map(song => ({
+      id: song.id.toString(),
+      title: song.song_name,
+      description: song.artist.artist_name,
+      image: song.thumbnail,
+    }));
+  };
 
   useEffect(() => {
     const fetchPlaylists = async () => {
-      const songs = await MusicService.getSongsByGenre(categoryId);
-      setSongs(songs);
-      const playlists = convertToPlaylist(songs);
-      setPlaylists(playlists);
-    };
-
-    const convertToPlaylist = (songs: Song[]): any[] => {
-      return songs.map(song => ({
-        id: song.id.toString(),
-        title: song.song_name,
-        description: song.artist.artist_name,
-        image: song.thumbnail,
-      }));
+      const page = await MusicService.getSongsByGenre(categoryId);
+      setSongs(page.results);
+      setPlaylists(convertToPlaylist(page.results));
+      setNextPage(page.next);
     };
     fetchPlaylists();
   }, [categoryId]);
+
+  const loadMore = async () => {
+    if (!nextPage || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await MusicService.getSongsByGenre(categoryId, nextPage);
+      setSongs(prev => [...prev, ...page.results]);
+      setPlaylists(prev => [...prev, ...convertToPlaylist(page.results)]);
+      setNextPage(page.next);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
   
   // Mock data - In a real app, this would come from an API based on the category ID
   const categories = [
@@ -69,6 +84,9 @@ const CategoryPage = () => {
                 title="Featured Playlists" 
                 playlists={playlists} 
                 seeAllLink="/featured"
+                onLoadMore={loadMore}
+                hasMore={nextPage !== null}
+                loadingMore={loadingMore}
               />
               
               {/* <PlaylistGrid 
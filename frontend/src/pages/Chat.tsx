@@ -24,9 +24,14 @@ const Chat: React.FC<ChatProps> = ({ userId: propUserId, popupMode }) => {
   const navigate = useNavigate()
   const { toast } = useToast()
   const messagesEndRef = useRef<HTMLDivElement>(null)
+  const messagesContainerRef = useRef<HTMLDivElement>(null)
+  // scrollHeight before older messages were prepended, so the view stays on the same message
+  const prependHeightRef = useRef<number | null>(null)
 
   const [chatbox, setChatbox] = useState<Chatbox | null>(null)
   const [messages, setMessages] = useState<Message[]>([])
+  const [olderPage, setOlderPage] = useState<string | null>(null)
+  const [loadingOlder, setLoadingOlder] = useState(false)
   const wsRef = useRef<ChatWebSocket | null>(null)
   const [messageText, setMessageText] = useState("")
   const [loading, setLoading] = useState(true)
@@ -82,8 +87,10 @@ const Chat: React.FC<ChatProps> = ({ userId: propUserId, popupMode }) => {
           setChatbox(currentChatbox)
 
           // Fetch messages for this chatbox
-          const chatMessages = await ChatboxService.getMessages(chatboxId)
-          setMessages(chatMessages)
+          // Fetch the newest page of messages; older ones load when scrolling up
+          const page = await ChatboxService.getMessages(chatboxId)
+          setMessages(page.results)
+          setOlderPage(page.next)
         } else {
           setError("Chatbox not found")
         }
@@ -107,11 +114,40 @@ const Chat: React.FC<ChatProps> = ({ userId: propUserId, popupMode }) => {
     }
   }, [isAuthenticated, userId, toast])
 
-  // Scroll to bottom when messages change
+  // Scroll to bottom when messages change, unless older messages were prepended
   useEffect(() => {
+    const container = messagesContainerRef.current
+    if (prependHeightRef.current !== null && container) {
+      container.scrollTop = container.scrollHeight - prependHeightRef.current
+      prependHeightRef.current = null
+      return
+    }
     scrollToBottom()
   }, [messages])
 
+  // Load the previous page of history when the user scrolls to the top
+  const loadOlderMessages = async () => {
+    if (!chatbox?.id || !olderPage || loadingOlder) return
+
+    setLoadingOlder(true)
+    try {
+      const page = await ChatboxService.getMessages(chatbox.id, olderPage)
+      prependHeightRef.current = messagesContainerRef.current?.scrollHeight ?? null
+      setMessages((prev) => [...page.results, ...prev])
+      setOlderPage(page.next)
+    } catch (err) {
+      console.error("Error loading older messages:", err)
+    } finally {
+      setLoadingOlder(false)
+    }
+  }
+
+  const handleMessagesScroll = (e: React.UIEvent<HTMLDivElement>) => {
+    if (e.currentTarget.scrollTop < 50) {
+      loadOlderMessages()
+    }
+  }
+
   // Send message
   const sendMessage = async (e: React.FormEvent) => {
     e.preventDefault()
@@ -226,7 +262,16 @@ const Chat: React.FC<ChatProps> = ({ userId: propUserId, popupMode }) => {
         )}
 
         {/* Chat Messages */}
-        <div className="flex-1 overflow-y-auto p-4 space-y-4">
+        <div
+          ref={messagesContainerRef}
+          onScroll={handleMessagesScroll}
+          className="flex-1 overflow-y-auto p-4 space-y-4"
+        >
+          {loadingOlder && (
+            <div className="flex justify-center">
+              <div className="animate-spin rounded-full h-5 w-5 border-t-2 border-b-2 border-green-500"></div>
+            </div>
+          )}
           {messages.length === 0 ? (
             <div className="flex items-center justify-center h-full">
               <p className="text-zinc-500">No messages yet. Start the conversation!</p>
@@ -1,26 +1,13 @@
-import React, { useEffect, useState } from 'react';
+import React from 'react';
 import Layout from '@/components/Layout';
 import PlaylistGrid from '@/components/content/PlaylistGrid';
 import { useMusic } from '@/contexts/MusicContext';
-import { ArtistService } from '@/services/ArtistService';
 import { useNavigate } from 'react-router-dom';
 
 const LikedSongsPage = () => {
   const { likedSongs } = useMusic();
-  const [artists, setArtists] = useState([]);
   const navigate = useNavigate();
 
-  useEffect(() => {
-    ArtistService.getArtists().then(data => {
-      setArtists(Array.isArray(data) ? data : [data]);
-    });
-  }, []);
-
-  const getArtistName = (artistId: number) => {
-    const artist = artists.find((a: any) => a.id === artistId);
-    return artist ? artist.artist_name : 'Unknown Artist';
-  };
-
   const handleSongClick = (songId: string) => {
     navigate(`/song/${songId}`);
   };
@@ -34,7 +21,7 @@ const LikedSongsPage = () => {
           playlists={likedSongs.map(song => ({
             id: song.id.toString(),
             title: song.title,
-            description: getArtistName(song.artistId),
+            description: song.artist?.artist_name ?? 'Unknown Artist',
             image: song.imageUrl || '/placeholder.svg'
           }))}
           onPlaylistClick={handleSongClick}
@@ -6,7 +6,7 @@ import { useParams } from 'react-router-dom';
 import { Clock, Heart, MoreHorizontal, Play } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import { useContext, useEffect, useState } from 'react';
-import { Playlist } from '@/types/playlist';
+import { Playlist, trackToSong } from '@/types/playlist';
 import { PlaylistService } from '@/services/PlaylistService';
 import { Song } from '@/types/music';
 import { useMusic } from '@/contexts/MusicContext';
@@ -16,6 +16,8 @@ const PlaylistPage = () => {
   const playlistId = parseInt(id || '0');
   const [playlist, setPlaylist] = useState<Playlist | null>(null);
   const [tracks, setTracks] = useState<Song[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const { play } = useMusic();
 
   const playSong = () => {
@@ -25,13 +27,29 @@ const PlaylistPage = () => {
 
   useEffect(() => {
     const fetchPlaylist = async () => {
-      const playlist = await PlaylistService.getPlaylistById(playlistId);
+      const [playlist, page] = await Promise.all([
+        PlaylistService.getPlaylistById(playlistId),
+        PlaylistService.getTracks(playlistId),
+      ]);
       setPlaylist(playlist);
-      setTracks(playlist.song);
+      setTracks(page.results.map(trackToSong));
+      setNextPage(page.next);
     };
     fetchPlaylist();
   }, [playlistId]);
 
+  const loadMore = async () => {
+    if (!nextPage || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await PlaylistService.getTracks(playlistId, nextPage);
+      setTracks(prev => [...prev, ...page.results.map(trackToSong)]);
+      setNextPage(page.next);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <div className="h-screen flex flex-col bg-spotify-base">
       <div className="flex flex-1 overflow-hidden">
@@ -43,7 +61,7 @@ const PlaylistPage = () => {
             <div className="flex flex-col md:flex-row items-center md:items-end gap-6 p-8 bg-gradient-to-b from-zinc-700 to-spotify-base">
               <div className="flex-shrink-0 h-60 w-60 shadow-2xl">
                 <img 
-                  src={playlist?.song[0]?.thumbnail || "/placeholder.svg"} 
+                  src={tracks[0]?.thumbnail || "/placeholder.svg"} 
                   alt={playlist?.playlist_name} 
                   className="h-full w-full object-cover" 
                 />
@@ -58,7 +76,7 @@ const PlaylistPage = () => {
                   <span className="mx-1">•</span>
                   <span>{playlist?.followers} likes</span>
                   <span className="mx-1">•</span>
-                  <span>{playlist?.totalSongs} songs,</span>
+                  <span>{playlist?.song_count} songs,</span>
                   <span className="ml-1 text-zinc-400">{playlist?.duration}</span>
                 </div>
               </div>
@@ -119,6 +137,13 @@ const PlaylistPage = () => {
                   ))}
                 </tbody>
               </table>
+              {nextPage !== null && (
+                <div className="flex justify-center mb-10">
+                  <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </Button>
+                </div>
+              )}
             </div>
           </ScrollArea>
         </main>
@@ -161,7 +161,7 @@ const SearchPage = () => {
                           {playlists.map(playlist => (
                             <PlaylistCard 
                               key={playlist.id}
-                              image={playlist.song?.[0]?.thumbnail? playlist.song[0].thumbnail : 'https://placehold.co/300x300'}
+                              image={playlist.playlist_cover_url || 'https://placehold.co/300x300'}
                               title={playlist.playlist_name}
                               description={playlist.description}
                               onClick={() => navigate(`/playlist/${playlist.id}`)}
@@ -213,7 +213,7 @@ const SearchPage = () => {
                       {playlists.map(playlist => (
                         <PlaylistCard 
                           key={playlist.id}
-                          image={playlist.song?.[0]?.thumbnail? playlist.song[0].thumbnail : 'https://placehold.co/300x300'}
+                          image={playlist.playlist_cover_url || 'https://placehold.co/300x300'}
                           title={playlist.playlist_name}
                           description={playlist.description}
                           onClick={() => navigate(`/playlist/${playlist.id}`)}
@@ -1,12 +1,12 @@
-import { api } from '../config/api';
+import { api, getPage, getAllPages, type Page } from '../config/api';
 import { Artist } from '@/types/artist';
 
 export class ArtistService {
-    static async getArtists(): Promise <Artist> {
+    // Each call returns one page; pass the previous page's `next` to continue
+    static async getArtists(url: string = 'artists/'): Promise<Page<Artist>> {
         try
         {
-            const response = await api.get('artists/')
-            return response.data
+            return await getPage<Artist>(url)
         }
         catch (error)
         {
@@ -18,7 +18,7 @@ export class ArtistService {
     static async searchArtist(query: string): Promise<Artist[]> {
         try {
             const response = await api.get(`artists/?search=${query}`);
-            return response.data;
+            return response.data.results;
         } catch (error) {
             throw new Error('Failed to search artists');
         }
@@ -36,8 +36,7 @@ export class ArtistService {
 
     static async followedArtist(): Promise<Artist[]> {
         try {
-            const response = await api.get('artists/followed/')
-            return response.data
+            return await getAllPages<Artist>('artists/followed/')
         }
         catch (error) {
             console.error('Followed artist error:', error)
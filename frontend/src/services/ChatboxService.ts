@@ -1,10 +1,9 @@
 import { Chatbox, Message } from '@/types/chat';
-import { api } from '../config/api';
+import { api, getPage, getAllPages, type Page } from '../config/api';
 
 export class ChatboxService {
   static async getChatboxes() {
-    const response = await api.get('/chatbox/');
-    return response.data;
+    return getAllPages<Chatbox>('/chatbox/');
   }
 
   static async createChatbox(chatbox: Chatbox) {
@@ -17,10 +16,12 @@ export class ChatboxService {
     }
   }
 
-  static async getMessages(id: number) {
+  // Loads the newest page first; pass the previous page's `next` to load older messages
+  static async getMessages(id: number, url?: string): Promise<Page<Message>> {
     try {
-      const response = await api.get(`/chatbox/${id}/messages/`);
-      return response.data;
+      // The server pages newest-first; the chat shows the oldest message at the top
+      const page = await getPage<Message>(url ?? `/chatbox/${id}/messages/`);
+      return { results: page.results.reverse(), next: page.next };
     } catch (error) {
       console.error('Error getting messages:', error);
       throw error;
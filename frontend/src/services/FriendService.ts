@@ -1,11 +1,10 @@
 import { User } from '@/types/user';
-import { api } from '../config/api';
+import { api, getAllPages } from '../config/api';
 import { Friend } from '@/types/friend';
 export class FriendService {
   static async getFriends(): Promise<Friend[]> {
     try {
-      const response = await api.get('/users/friends/');
-      return response.data;
+      return await getAllPages<Friend>('/users/friends/');
     } catch (error) {
       console.error('Error getting friends:', error);
       throw error;
@@ -14,8 +13,7 @@ export class FriendService {
 
   static async getPendingRequests(): Promise<Friend[]> {
     try {
-      const response = await api.get('/users/pending-requests/');
-      return response.data;
+      return await getAllPages<Friend>('/users/pending-requests/');
     } catch (error) {
       console.error('Error getting pending requests:', error);
       throw error;
@@ -24,8 +22,7 @@ export class FriendService {
 
   static async getSentRequests(): Promise<Friend[]> {
     try {
-      const response = await api.get('/users/sent-requests/');
-      return response.data;
+      return await getAllPages<Friend>('/users/sent-requests/');
     } catch (error) {
       console.error('Error getting sent requests:', error);
       throw error;
@@ -77,7 +74,7 @@ export class FriendService {
   static async getUser(keyword: string): Promise<User[]> {
     try {
       const response = await api.get(`/users/?search=${keyword}`);
-      return response.data;
+      return response.data.results;
     } catch (error) {
       console.error('Error getting user:', error);
       throw error;
@@ -1,5 +1,5 @@
 import { Song, Purchase } from '../types/music';
-import { api } from '@/config/api';
+import { api, getPage, type Page } from '@/config/api';
 
 // Local Storage keys
 const CURRENT_TRACK_KEY = 'spotify_current_track';
@@ -10,29 +10,10 @@ const QUEUE_KEY = 'spotify_queue';
 const PLAY_HISTORY_KEY = 'spotify_play_history';
 
 export class MusicService {
-  static async getAllSongs(): Promise<Song[]> {
+  // Each call returns one page; pass the previous page's `next` to continue
+  static async getAllSongs(url: string = '/songs/'): Promise<Page<Song>> {
     try {
-      const response = await api.get('/songs/');
-
-      if (!response || !response.data) {
-        console.warn('MusicService: No data in API response');
-        return [];
-      }
-
-      let songsData = response.data;
-
-      // If response is paginated, extract the results
-      if (songsData.results) {
-        console.log('MusicService: Found paginated data structure:', songsData);
-        songsData = songsData.results;
-      }
-
-      if (!Array.isArray(songsData)) {
-        console.warn('MusicService: Data is not an array:', typeof songsData);
-        return [];
-      }
-
-      return songsData;
+      return await getPage<Song>(url);
     } catch (error: any) {
       console.error('MusicService: Error fetching songs:', {
         message: error.message,
@@ -43,10 +24,9 @@ export class MusicService {
     }
   }
 
-  static async getSongsByGenre(genreId: number): Promise<Song[]> {
+  static async getSongsByGenre(genreId: number, url?: string): Promise<Page<Song>> {
     try {
-      const response = await api.get(`/songs/?genre_id=${genreId}`);
-      return response.data;
+      return await getPage<Song>(url ?? `/songs/?genre_id=${genreId}`);
     } catch (error: any) {
       console.error('MusicService: Error fetching songs by genre:', {
         message: error.message,
@@ -61,7 +41,7 @@ export class MusicService {
   static async searchSongs(query: string): Promise<Song[]> {
     try {
       const response = await api.get(`/songs/?search=${query}`);
-      return response.data;
+      return response.data.results;
     } catch (error: any) {
       console.error('MusicService: Error searching songs:', {
         message: error.message,
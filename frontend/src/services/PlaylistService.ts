@@ -1,11 +1,11 @@
-import { api } from '../config/api';
-import { Playlist } from '../types/playlist';
+import { api, getPage, type Page } from '../config/api';
+import { Playlist, PlaylistTrack } from '../types/playlist';
 
 export class PlaylistService {
-    static async getPlaylist(): Promise<Playlist[]> {
+    // Each call returns one page; pass the previous page's `next` to continue
+    static async getPlaylist(url: string = '/playlists/'): Promise<Page<Playlist>> {
         try {
-            const response = await api.get('/playlists/');
-            return response.data;
+            return await getPage<Playlist>(url);
         } catch (error) {
             throw new Error('Failed to fetch playlists');
         }
@@ -14,7 +14,7 @@ export class PlaylistService {
     static async searchPlaylist(query: string): Promise<Playlist[]> {
         try {
             const response = await api.get(`/playlists/?search=${query}`);
-            return response.data;
+            return response.data.results;
         } catch (error) {
             throw new Error('Failed to search playlists');
         }
@@ -28,6 +28,32 @@ export class PlaylistService {
         }
     }
 
+    static async getTracks(id: number, url?: string): Promise<Page<PlaylistTrack>> {
+        try {
+            return await getPage<PlaylistTrack>(url ?? `/playlists/${id}/tracks/`);
+        } catch (error) {
+            throw new Error('Failed to fetch playlist tracks');
+        }
+    }
+
+    static async addSongs(id: number, songIds: number[]): Promise<number[]> {
+        try {
+            const response = await api.post(`/playlists/${id}/tracks/`, { song_ids: songIds });
+            return response.data.added;
+        } catch (error) {
+            throw new Error('Failed to add songs to playlist');
+        }
+    }
+
+    static async removeSongs(id: number, songIds: number[]): Promise<number> {
+        try {
+            const response = await api.post(`/playlists/${id}/tracks/remove/`, { song_ids: songIds });
+            return response.data.removed;
+        } catch (error) {
+            throw new Error('Failed to remove songs from playlist');
+        }
+    }
+
     static async createPlaylist(playlist: Playlist): Promise<Playlist> {
         try {
             const response = await api.post('/playlists/', playlist);
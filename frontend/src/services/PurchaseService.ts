@@ -1,12 +1,11 @@
 import { Song } from '@/types/music';
-import { api } from '../config/api';
+import { api, getAllPages } from '../config/api';
 import { Order } from '@/types/purchase';
 
 export class PurchaseService {
     static async getOrders(): Promise<Order[]> {
         try {
-            const response = await api.get('/orders/');
-            return response.data;
+            return await getAllPages<Order>('/orders/');
         } catch (error) {
             console.error('Get orders error:', error);
             throw new Error('Lấy danh sách đơn hàng thất bại');
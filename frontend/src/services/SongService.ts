@@ -1,12 +1,12 @@
-import { api } from '../config/api';
+import { getPage, api, type Page } from '../config/api';
 import { Song } from '@/types/music';
 
 export class SongService {
-    static async getSong(): Promise<Song>{
+    // Pass the previous page's `next` to load the following page
+    static async getSong(url: string = 'songs/'): Promise<Page<Song>>{
     try
     {
-        const response = await api.get('songs/')
-        return response.data
+        return await getPage<Song>(url)
     }
     catch (error)
     {
@@ -8,7 +8,32 @@ export interface Playlist {
     is_public: boolean;
     playlist_cover_url: string;
     is_deleted: boolean;
-    song: Song[];
+    // The full song list is loaded page by page with PlaylistService.getTracks
+    song_count?: number;
+    preview_song_ids?: number[];
+    // Only sent when creating/updating a playlist: ordered song ids
+    song_id?: number[];
     price: number;
     [key: string]: any;
 }
+
+// A song from /playlists/<id>/tracks/: the artist is only an id and a name
+export interface PlaylistTrack {
+    id: number;
+    song_name: string;
+    artist: number;
+    artist_name: string;
+    duration: number;
+    price: number;
+    plays: number;
+    audio?: string;
+    hls_playlist?: string;
+    thumbnail?: string;
+    release_date: string;
+}
+
+export const trackToSong = (track: PlaylistTrack): Song => ({
+    ...track,
+    artist: { id: track.artist, artist_name: track.artist_name },
+    release_date: new Date(track.release_date),
+} as unknown as Song);